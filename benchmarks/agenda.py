@@ -0,0 +1,104 @@
+"""
+Benchmark da busca de horários livres
+
+Cria um banco temporário com N médicos (5 especialidades) e uma agenda de
+30 dias ocupada na proporção indicada, e mede a busca dos próximos horários
+livres de todos os médicos, de uma especialidade e de um médico. Falha se
+alguma busca passar do limite.
+
+Uso:
+    python benchmarks/agenda.py [--medicos 200] [--dias 30] [--ocupacao 0.8] [--max-ms 50]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.agenda import HORARIO_PADRAO, find_free_slots  # noqa: E402
+from medstock360.database import DatabaseManager  # noqa: E402
+
+ESPECIALIDADES = ['Clínica Geral', 'Pediatria', 'Cardiologia', 'Ortopedia', 'Dermatologia']
+
+
+def populate(conn, n_medicos, dias, ocupacao, seed=42):
+    """Inserir médicos e consultas de 30 minutos nos horários de atendimento"""
+    rng = random.Random(seed)
+    conn.execute("INSERT INTO pacientes (id, nome_completo) VALUES (1, 'Paciente')")
+    conn.executemany("""
+        INSERT INTO usuarios (id, username, password_hash, nome_completo, perfil, especialidade)
+        VALUES (?, ?, '', ?, 'Médico', ?)
+    """, [
+        (1000 + i, f"medico{i}", f"Médico {i}", ESPECIALIDADES[i % len(ESPECIALIDADES)])
+        for i in range(n_medicos)
+    ])
+
+    consultas = []
+    hoje = date.today()
+    for i in range(n_medicos):
+        for d in range(dias):
+            dia = hoje + timedelta(days=d)
+            for hora_inicio, hora_fim in HORARIO_PADRAO.get(dia.weekday(), []):
+                atual = datetime.combine(dia, datetime.strptime(hora_inicio, '%H:%M').time())
+                fim = datetime.combine(dia, datetime.strptime(hora_fim, '%H:%M').time())
+                while atual < fim:
+                    if rng.random() < ocupacao:
+                        consultas.append((1, 1000 + i, f"{atual:%Y-%m-%d %H:%M:%S}",
+                                          f"{atual + timedelta(minutes=30):%Y-%m-%d %H:%M:%S}", 30))
+                    atual += timedelta(minutes=30)
+    conn.executemany("""
+        INSERT INTO consultas (paciente_id, medico_id, data_consulta, data_fim, duracao_minutos)
+        VALUES (?, ?, ?, ?, ?)
+    """, consultas)
+    conn.commit()
+    return len(consultas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--medicos", type=int, default=200)
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--ocupacao", type=float, default=0.8,
+                        help="Fração dos horários de atendimento já ocupada")
+    parser.add_argument("--max-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "agenda.db"))
+        conn = db.get_connection()
+        n_consultas = populate(conn, args.medicos, args.dias, args.ocupacao)
+        print(f"{args.medicos} médicos, {n_consultas} consultas em {args.dias} dias")
+
+        inicio = datetime.combine(date.today(), datetime.min.time())
+        fim = inicio + timedelta(days=args.dias)
+        cenarios = [
+            ("todos os médicos", {}),
+            ("uma especialidade", {'especialidade': ESPECIALIDADES[2]}),
+            ("um médico", {'medico_id': 1000}),
+            ("60 min, 50 horários", {'limite': 50, 'duracao_minutos': 60}),
+        ]
+
+        failures = []
+        for label, kwargs in cenarios:
+            kwargs = {'duracao_minutos': 30, 'limite': 10, **kwargs}
+            find_free_slots(conn, inicio, fim, **kwargs)
+            start = time.perf_counter()
+            slots = find_free_slots(conn, inicio, fim, **kwargs)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"{label:<22} {elapsed_ms:>7.1f} ms  horários: {len(slots):>3}")
+            if elapsed_ms > args.max_ms:
+                failures.append(f"{label}: {elapsed_ms:.1f} ms (limite: {args.max_ms} ms)")
+        conn.close()
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Benchmark do ciclo de avaliação de alertas
+
+Cria um banco temporário com N medicamentos (lotes e 30 dias de saídas) e
+mede o tempo de um ciclo de avaliação completo e de um ciclo incremental
+(sem mudanças). Falha se algum ciclo passar do limite.
+
+Uso:
+    python benchmarks/alertas.py [--medicamentos 10000] [--max-ms 1000]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.alertas import evaluate_alerts  # noqa: E402
+from medstock360.database import DatabaseManager  # noqa: E402
+from medstock360.vencimentos import refresh_expiry_buckets  # noqa: E402
+
+
+def populate(conn, n_medicamentos, seed=42):
+    """Inserir medicamentos, 2 lotes por medicamento e 30 dias de saídas"""
+    rng = random.Random(seed)
+    hoje = date.today()
+    conn.executemany(
+        "INSERT INTO medicamentos (id, nome, categoria) VALUES (?, ?, ?)",
+        [(i, f"Medicamento {i}", "Outros") for i in range(1, n_medicamentos + 1)]
+    )
+    lotes = []
+    for i in range(1, n_medicamentos + 1):
+        for j in range(2):
+            validade = hoje + timedelta(days=rng.randint(-30, 400))
+            lotes.append((i, f"L{i}-{j}", validade.isoformat(), 100, rng.randint(0, 60), rng.uniform(1, 50)))
+    conn.executemany("""
+        INSERT INTO lotes (medicamento_id, numero_lote, data_validade, quantidade_inicial,
+                           quantidade_atual, preco_unitario)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, lotes)
+    movimentos = []
+    for lote_id in range(1, len(lotes) + 1, 3):
+        for d in range(0, 30, 3):
+            dia = hoje - timedelta(days=d)
+            movimentos.append((lote_id, 'Saída', rng.randint(1, 8), f"{dia} 10:00:00", 1))
+    conn.executemany("""
+        INSERT INTO movimentacoes (lote_id, tipo_movimento, quantidade, data_movimento, responsavel)
+        VALUES (?, ?, ?, ?, ?)
+    """, movimentos)
+    conn.commit()
+    refresh_expiry_buckets(conn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--medicamentos", type=int, default=10000)
+    parser.add_argument("--max-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "alertas.db"))
+        conn = db.get_connection()
+        populate(conn, args.medicamentos)
+
+        failures = []
+        for label in ("ciclo completo", "ciclo incremental"):
+            start = time.perf_counter()
+            novos, resolvidos = evaluate_alerts(conn, ['email', 'webhook'])
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"{label:<18} {elapsed_ms:>8.1f} ms  novos: {len(novos):>6}  resolvidos: {len(resolvidos)}")
+            if elapsed_ms > args.max_ms:
+                failures.append(f"{label}: {elapsed_ms:.1f} ms (limite: {args.max_ms} ms)")
+        conn.close()
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
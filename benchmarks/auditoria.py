@@ -0,0 +1,74 @@
+"""
+Benchmark do log de auditoria
+
+Mede o custo de audit_event no caminho crítico (p50/p99 por evento), a
+gravação em lote dos eventos enfileirados e a verificação da cadeia de
+hashes. Falha se o p99 de audit_event passar do limite.
+
+Uso:
+    python benchmarks/auditoria.py [--eventos 20000] [--max-ms 1]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.auditoria import audit_event, flush_audit_events, verify_chain  # noqa: E402
+from medstock360.database import DatabaseManager  # noqa: E402
+
+
+def percentile(valores, p):
+    """Percentil p (0-100) de uma lista já ordenada"""
+    return valores[min(int(len(valores) * p / 100), len(valores) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--eventos", type=int, default=20000)
+    parser.add_argument("--max-ms", type=float, default=1.0,
+                        help="Limite do p99 de audit_event em ms")
+    args = parser.parse_args()
+
+    usuario = {'id': 1, 'nome_completo': 'Administrador'}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "auditoria.db"))
+        conn = db.get_connection()
+
+        tempos = []
+        for i in range(args.eventos):
+            start = time.perf_counter()
+            audit_event(usuario, 'alterar_status', 'consultas', i,
+                        antes={'status': 'Agendada'}, depois={'status': 'Concluída'})
+            tempos.append((time.perf_counter() - start) * 1000)
+        tempos.sort()
+
+        start = time.perf_counter()
+        gravados = flush_audit_events(conn)
+        flush_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        ok, _, verificados = verify_chain(conn)
+        verify_ms = (time.perf_counter() - start) * 1000
+        conn.close()
+
+    p99 = percentile(tempos, 99)
+    print(f"audit_event        p50 {percentile(tempos, 50) * 1000:>7.1f} µs  p99 {p99 * 1000:>7.1f} µs")
+    print(f"gravação em lote   {flush_ms:>8.1f} ms  ({gravados} eventos)")
+    print(f"verificação        {verify_ms:>8.1f} ms  ({verificados} eventos, {'íntegra' if ok else 'QUEBRADA'})")
+
+    failures = []
+    if p99 > args.max_ms:
+        failures.append(f"audit_event: p99 de {p99:.3f} ms (limite: {args.max_ms} ms)")
+    if not ok or verificados != gravados:
+        failures.append("cadeia de hashes inválida após a gravação")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
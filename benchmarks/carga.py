@@ -0,0 +1,268 @@
+"""
+Teste de carga com várias sessões simultâneas do Streamlit (AppTest)
+
+Cada sessão roda app.py sem navegador (streamlit.testing AppTest) contra um
+banco gerado por gerar_dados.py: faz login pelo formulário com um usuário
+de cada perfil de AuthManager.get_user_permissions, navega pelas páginas
+liberadas e envia formulários (cadastro de paciente e de medicamento,
+agendamento de consulta, busca de paciente). As sessões rodam em um pool de
+processos: o AppTest troca um Runtime global a cada run, então duas sessões
+não podem rodar em threads do mesmo processo.
+
+Relata vazão, percentis de latência por ação e erros, separando os de
+banco bloqueado ("database is locked"). Falha se houver bloqueios acima de
+--max-bloqueios ou se o p95 geral passar de --max-p95-ms.
+
+As ações que terminam com sucesso incluem a pausa (time.sleep) que a
+própria página faz antes do st.rerun.
+
+Uso:
+    python benchmarks/gerar_dados.py /tmp/hospital.db --escala 0.01
+    python benchmarks/carga.py /tmp/hospital.db [--sessoes 50] [--acoes 20] [--processos 50]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import time as dtime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from medstock360.auth import AuthManager  # noqa: E402
+from medstock360.database import DatabaseManager  # noqa: E402
+from medstock360.paginas import get_menu_options  # noqa: E402
+
+PERFIS = ["Administrador", "Médico", "Farmacêutico", "Enfermeiro"]
+SENHA = "carga123"
+
+# Formulários: página, permissão exigida (módulo, ação) e peso no sorteio
+FORMULARIOS = {
+    'cadastrar_paciente': {'pagina': "👥 Pacientes", 'permissao': ('pacientes', 'criar'), 'peso': 2},
+    'buscar_paciente': {'pagina': "👥 Pacientes", 'permissao': ('pacientes', 'visualizar'), 'peso': 3},
+    'agendar_consulta': {'pagina': "📅 Consultas", 'permissao': ('consultas', 'criar'), 'peso': 3},
+    'cadastrar_medicamento': {'pagina': "💊 Medicamentos", 'permissao': ('medicamentos', 'criar'), 'peso': 1},
+}
+
+# Fração das ações que são envios de formulário (o resto é navegação)
+FRACAO_FORMULARIOS = 0.3
+
+
+def ensure_load_users(db_path):
+    """Criar (se preciso) um usuário carga_<perfil> por perfil, com a senha SENHA"""
+    db = DatabaseManager(db_path)
+    auth = AuthManager(db)
+    conn = db.get_connection()
+    for perfil in PERFIS:
+        conn.execute("""
+            INSERT OR IGNORE INTO usuarios (username, password_hash, nome_completo, perfil)
+            VALUES (?, ?, ?, ?)
+        """, (f"carga_{perfil.lower()}", auth.hash_password(SENHA), f"Carga {perfil}", perfil))
+    conn.commit()
+    conn.close()
+
+
+def _classify(at):
+    """Resultado de um run: 'ok', 'erro' ou 'bloqueio' (e a mensagem)"""
+    mensagens = [str(e.value) for e in at.exception] + [str(e.value) for e in at.error]
+    for mensagem in mensagens:
+        if "locked" in mensagem or "busy" in mensagem:
+            return 'bloqueio', mensagem
+    if at.exception:
+        return 'erro', mensagens[0]
+    if at.error:
+        return 'erro', mensagens[0]
+    return 'ok', None
+
+
+def _run(at, elemento=None):
+    """Rodar a sessão a partir do elemento alterado (ou da raiz)
+
+    No AppTest, um st.rerun durante o run termina em KeyError; a sessão já
+    está atualizada e basta rodar de novo.
+    """
+    try:
+        (elemento if elemento is not None else at).run()
+    except KeyError:
+        at.run()
+
+
+def _widget(elementos, prefixo):
+    return next(e for e in elementos if e.label.startswith(prefixo))
+
+
+def _fill_form(at, acao, rng, sessao, n):
+    """Preencher o formulário da ação e devolver o botão de envio"""
+    sufixo = f"{sessao}-{n}-{rng.randrange(10 ** 6)}"
+    if acao == 'cadastrar_paciente':
+        _widget(at.text_input, "Nome Completo").input(f"Paciente Carga {sufixo}")
+        _widget(at.text_input, "CPF").input(f"C{sufixo}")
+        return _widget(at.button, "💾 Cadastrar Paciente")
+    if acao == 'cadastrar_medicamento':
+        _widget(at.text_input, "Nome do Medicamento").input(f"Medicamento Carga {sufixo}")
+        return _widget(at.button, "💾 Cadastrar Medicamento")
+    if acao == 'agendar_consulta':
+        medico = _widget(at.selectbox, "Médico")
+        medico.select(rng.choice(medico.options))
+        _widget(at.time_input, "Horário da Consulta").set_value(dtime(rng.randint(8, 17), rng.choice([0, 15, 30, 45])))
+        return _widget(at.button, "📅 Agendar Consulta")
+    if acao == 'buscar_paciente':
+        _widget(at.text_input, "🔍 Buscar paciente").input(rng.choice(["Silva", "Ana", "Costa", "000"]))
+        return None
+    raise ValueError(acao)
+
+
+def run_session(db_path, perfil, acoes, semente, sessao, pausa_ms=0):
+    """Uma sessão completa; devolve [(ação, perfil, ms, status, mensagem)]"""
+    rng = random.Random(semente)
+    resultados = []
+
+    def medir(acao, funcao):
+        inicio = time.perf_counter()
+        try:
+            funcao()
+            status, mensagem = _classify(at)
+        except Exception as e:  # timeout do AppTest, widget ausente, ...
+            status = 'bloqueio' if "locked" in str(e) else 'erro'
+            mensagem = f"{type(e).__name__}: {e}"
+        resultados.append((acao, perfil, (time.perf_counter() - inicio) * 1000, status, mensagem))
+        if pausa_ms:
+            time.sleep(rng.uniform(0, 2 * pausa_ms) / 1000)
+
+    # Cada sessão real cria o seu DatabaseManager (e roda init_database)
+    at = AppTest.from_file(str(RAIZ / "app.py"), default_timeout=300)
+    at.session_state.db_manager = DatabaseManager(db_path)
+    at.session_state.auth_manager = AuthManager(at.session_state.db_manager)
+    medir('abrir', lambda: _run(at))
+
+    def login():
+        _widget(at.text_input, "👤 Usuário").input(f"carga_{perfil.lower()}")
+        _widget(at.text_input, "🔒 Senha").input(SENHA)
+        _run(at, _widget(at.button, "🚀 Entrar").click())
+    medir('login', login)
+    if not at.session_state.authenticated:
+        return resultados
+
+    permissoes = at.session_state.permissions
+    paginas = get_menu_options(permissoes)
+    formularios = [
+        nome for nome, f in FORMULARIOS.items()
+        if f['pagina'] in paginas and f['permissao'][1] in permissoes.get(f['permissao'][0], [])
+    ]
+    pesos = [FORMULARIOS[nome]['peso'] for nome in formularios]
+
+    for n in range(acoes):
+        if formularios and rng.random() < FRACAO_FORMULARIOS:
+            acao = rng.choices(formularios, pesos)[0]
+
+            def enviar():
+                _run(at, at.sidebar.selectbox[0].select(FORMULARIOS[acao]['pagina']))
+                botao = _fill_form(at, acao, rng, sessao, n)
+                _run(at, botao.click() if botao is not None else None)
+            medir(acao, enviar)
+        else:
+            pagina = rng.choice(paginas)
+            medir(f"abrir {pagina}", lambda: _run(at, at.sidebar.selectbox[0].select(pagina)))
+    return resultados
+
+
+def percentile(valores, p):
+    """Percentil p (0-100) de uma lista já ordenada"""
+    return valores[min(int(len(valores) * p / 100), len(valores) - 1)] if valores else 0.0
+
+
+def summarize(resultados, duracao_s):
+    """Vazão, percentis por ação e contagem de erros"""
+    por_acao = defaultdict(list)
+    status = Counter()
+    for acao, _, ms, situacao, _ in resultados:
+        por_acao[acao].append(ms)
+        status[situacao] += 1
+    todas = sorted(ms for _, _, ms, _, _ in resultados)
+    return {
+        'acoes': len(resultados),
+        'duracao_s': duracao_s,
+        'vazao_acoes_s': len(resultados) / duracao_s if duracao_s else 0.0,
+        'p50_ms': percentile(todas, 50), 'p95_ms': percentile(todas, 95), 'p99_ms': percentile(todas, 99),
+        'erros': status['erro'],
+        'bloqueios': status['bloqueio'],
+        'por_acao': {
+            acao: {
+                'chamadas': len(tempos),
+                'p50_ms': percentile(sorted(tempos), 50),
+                'p95_ms': percentile(sorted(tempos), 95),
+                'p99_ms': percentile(sorted(tempos), 99),
+            }
+            for acao, tempos in sorted(por_acao.items())
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("banco", help="Banco gerado por benchmarks/gerar_dados.py (será alterado)")
+    parser.add_argument("--sessoes", type=int, default=50)
+    parser.add_argument("--acoes", type=int, default=20, help="Ações por sessão, após o login")
+    parser.add_argument("--processos", type=int,
+                        help="Sessões simultâneas (padrão: todas ao mesmo tempo)")
+    parser.add_argument("--pausa-ms", type=float, default=0, help="Pausa média entre ações de uma sessão")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--json", help="Gravar o resumo neste arquivo")
+    parser.add_argument("--max-bloqueios", type=int, default=0)
+    parser.add_argument("--max-p95-ms", type=float, help="Limite do p95 geral em ms")
+    args = parser.parse_args()
+
+    if not Path(args.banco).exists():
+        print(f"❌ {args.banco} não existe; gere-o com benchmarks/gerar_dados.py")
+        return 1
+    ensure_load_users(args.banco)
+
+    # O AppTest troca o __main__ do processo: com um processo rodando várias
+    # sessões, a próxima tarefa não acharia __main__.run_session
+    from carga import run_session as sessao
+
+    inicio = time.perf_counter()
+    resultados = []
+    with ProcessPoolExecutor(args.processos or args.sessoes) as pool:
+        futuros = [
+            pool.submit(sessao, args.banco, PERFIS[i % len(PERFIS)], args.acoes,
+                        args.semente + i, i, args.pausa_ms)
+            for i in range(args.sessoes)
+        ]
+        for futuro in futuros:
+            resultados.extend(futuro.result())
+    resumo = summarize(resultados, time.perf_counter() - inicio)
+
+    print(f"{args.sessoes} sessões ({args.processos or args.sessoes} simultâneas), {resumo['acoes']} ações em {resumo['duracao_s']:.1f} s "
+          f"-> {resumo['vazao_acoes_s']:.1f} ações/s")
+    print(f"{'ação':<28} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for acao, dados in resumo['por_acao'].items():
+        print(f"{acao:<28} {dados['chamadas']:>5} {dados['p50_ms']:>9.0f} {dados['p95_ms']:>9.0f} {dados['p99_ms']:>9.0f}")
+    print(f"{'total':<28} {resumo['acoes']:>5} {resumo['p50_ms']:>9.0f} {resumo['p95_ms']:>9.0f} {resumo['p99_ms']:>9.0f}")
+    print(f"erros: {resumo['erros']}  bloqueios do banco: {resumo['bloqueios']}")
+    for mensagem, total in Counter(m for *_, s, m in resultados if s != 'ok').most_common(5):
+        print(f"  {total:>4}x {mensagem[:100]}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(dict(resumo, sessoes=args.sessoes, processos=args.processos or args.sessoes),
+                                              ensure_ascii=False, indent=2))
+
+    failures = []
+    if resumo['bloqueios'] > args.max_bloqueios:
+        failures.append(f"{resumo['bloqueios']} bloqueios do banco (limite: {args.max_bloqueios})")
+    if args.max_p95_ms is not None and resumo['p95_ms'] > args.max_p95_ms:
+        failures.append(f"p95 de {resumo['p95_ms']:.0f} ms (limite: {args.max_p95_ms:.0f} ms)")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
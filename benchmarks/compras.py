@@ -0,0 +1,77 @@
+"""
+Benchmark do planejamento de compras
+
+Cria um banco temporário com o formulário completo (gerar_dados.generate,
+só medicamentos, lotes e movimentações), zera o estoque de um quarto dos
+medicamentos, dá prazos de entrega aos fornecedores e mede procurement_plan para todo o formulário e
+purchase_order_drafts. Falha se o plano passar do limite ou se o plano de
+uma janela sem saídas (unidade nova) não sair vazio.
+
+Uso:
+    python benchmarks/compras.py [--medicamentos 10000] [--lotes 200000]
+                                 [--movimentacoes 2000000] [--max-s 10]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.compras import lead_times, procurement_plan, purchase_order_drafts, save_lead_times  # noqa: E402
+from medstock360.database import DatabaseManager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--medicamentos", type=int, default=10_000)
+    parser.add_argument("--lotes", type=int, default=200_000)
+    parser.add_argument("--movimentacoes", type=int, default=2_000_000)
+    parser.add_argument("--max-s", type=float, default=10, help="limite do plano do formulário")
+    args = parser.parse_args()
+
+    from gerar_dados import VOLUMES, generate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "compras.db"))
+        conn = db.get_connection()
+        volumes = dict.fromkeys(VOLUMES, 0)
+        volumes.update(medicamentos=args.medicamentos, lotes=args.lotes, movimentacoes=args.movimentacoes)
+        generate(conn, volumes)
+        # Um quarto do formulário sem estoque, para gerar pedidos
+        conn.execute("UPDATE lotes SET quantidade_atual = 0 WHERE medicamento_id % 4 = 0")
+        conn.commit()
+        fornecedores = lead_times(conn)['fornecedor']
+        save_lead_times(conn, {fornecedor: 5 + i % 30 for i, fornecedor in enumerate(fornecedores)})
+
+        inicio = time.perf_counter()
+        plano = procurement_plan(conn)
+        plano_s = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        rascunhos = purchase_order_drafts(plano)
+        rascunhos_s = time.perf_counter() - inicio
+
+        # Janela antes de qualquer movimentação: consumo vazio
+        sem_saidas = procurement_plan(conn, hoje=date(2000, 1, 1))
+        conn.close()
+
+    sugeridos = int((plano['quantidade_sugerida'] > 0).sum())
+    print(f"plano              {plano_s:>8.2f} s   medicamentos: {len(plano)}  abaixo do ponto de pedido: {sugeridos}")
+    print(f"rascunhos          {rascunhos_s:>8.2f} s   fornecedores: {len(rascunhos)}  "
+          f"valor: R$ {sum(r['total'] for r in rascunhos):,.2f}")
+
+    if (sem_saidas['quantidade_sugerida'] > 0).any() or (sem_saidas['consumo_medio'] != 0).any():
+        print("❌ plano sem saídas na janela sugeriu compras")
+        return 1
+    if plano_s > args.max_s:
+        print(f"❌ plano: {plano_s:.2f} s (limite: {args.max_s} s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
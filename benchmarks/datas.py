@@ -0,0 +1,123 @@
+"""
+Benchmark das datas em colunas inteiras
+
+Para cada data convertida (medstock360.datas.COLUNAS_INTEIRAS) compara, em
+um banco existente (ex.: gerado por benchmarks/gerar_dados.py):
+
+- armazenamento: bytes por linha do texto e do inteiro, e o tamanho de um
+  índice sobre a coluna de texto contra o índice sobre a coluna inteira
+  (dbstat; o índice de texto é criado e removido pelo benchmark);
+- consultas por intervalo (COUNT em janelas de --dias dias): DATE() linha a
+  linha, intervalo de texto com índice e intervalo de inteiros com índice.
+
+Uso:
+    python benchmarks/datas.py dados/benchmark.db [--janelas 20] [--dias 30]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.database import DatabaseManager  # noqa: E402
+from medstock360.datas import COLUNAS_INTEIRAS, INDICES_INTEIROS, day_number, epoch_range  # noqa: E402
+
+
+# Filtro nas colunas que precedem a data no índice (como nas telas)
+FILTROS = {'movimentacoes': "tipo_movimento = 'Saída' AND "}
+
+
+def _index_bytes(conn, indice):
+    return conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = ?", (indice,)).fetchone()[0] or 0
+
+
+def _p50_ms(conn, sql, janelas):
+    tempos = []
+    for params in janelas:
+        inicio = time.perf_counter()
+        conn.execute(sql, params).fetchone()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def bench_column(conn, tabela, nome, origem, unidade, n_janelas, dias):
+    """Armazenamento e consultas por intervalo de uma coluna"""
+    # Texto: bytes gravados; inteiro: tamanho do tipo serial do SQLite (1 a 8 bytes)
+    linhas, bytes_texto, bytes_inteiro, minimo, maximo = conn.execute(f"""
+        SELECT COUNT(*), AVG(length(CAST({origem} AS BLOB))),
+               AVG(CASE WHEN abs({nome}) < 128 THEN 1 WHEN abs({nome}) < 32768 THEN 2
+                        WHEN abs({nome}) < 8388608 THEN 3 WHEN abs({nome}) < 2147483648 THEN 4
+                        WHEN abs({nome}) < 140737488355328 THEN 6 ELSE 8 END),
+               MIN({origem}), MAX({origem})
+        FROM {tabela}
+    """).fetchone()
+    if not linhas:
+        return None
+
+    # Índice de texto com as mesmas colunas do índice inteiro, só para comparar o tamanho
+    indice, colunas = next((i, c) for i, (t, c) in INDICES_INTEIROS.items() if t == tabela)
+    conn.execute(f"CREATE INDEX bench_texto ON {tabela} ({colunas.replace(nome, origem)})")
+    texto_idx = _index_bytes(conn, 'bench_texto')
+    inteiro_idx = _index_bytes(conn, indice)
+
+    rng = random.Random(42)
+    primeiro, ultimo = date.fromisoformat(minimo[:10]), date.fromisoformat(maximo[:10])
+    inicios = [primeiro + timedelta(days=rng.randrange(max(1, (ultimo - primeiro).days - dias)))
+               for _ in range(n_janelas)]
+    janelas_data = [(i.isoformat(), (i + timedelta(days=dias - 1)).isoformat()) for i in inicios]
+    janelas_texto = [(i.isoformat(), (i + timedelta(days=dias)).isoformat()) for i in inicios]
+    if unidade == 's':
+        janelas_inteiro = [epoch_range(i, i + timedelta(days=dias - 1)) for i in inicios]
+    else:
+        janelas_inteiro = [(day_number(i), day_number(i) + dias) for i in inicios]
+
+    filtro = FILTROS.get(tabela, "")
+    tempos = {
+        'DATE() por linha': _p50_ms(conn, f"SELECT COUNT(*) FROM {tabela} NOT INDEXED "
+                                          f"WHERE {filtro}DATE({origem}) BETWEEN ? AND ?", janelas_data),
+        'texto + índice': _p50_ms(conn, f"SELECT COUNT(*) FROM {tabela} INDEXED BY bench_texto "
+                                        f"WHERE {filtro}{origem} >= ? AND {origem} < ?", janelas_texto),
+        'inteiro + índice': _p50_ms(conn, f"SELECT COUNT(*) FROM {tabela} INDEXED BY {indice} "
+                                          f"WHERE {filtro}{nome} >= ? AND {nome} < ?", janelas_inteiro),
+    }
+    conn.execute("DROP INDEX bench_texto")
+    return {
+        'linhas': linhas, 'bytes_texto': bytes_texto, 'bytes_inteiro': bytes_inteiro,
+        'indice_texto': texto_idx, 'indice_inteiro': inteiro_idx, 'tempos': tempos,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("banco")
+    parser.add_argument("--janelas", type=int, default=20)
+    parser.add_argument("--dias", type=int, default=30)
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.banco)
+    conn = db.get_connection()
+    try:
+        for tabela, colunas in COLUNAS_INTEIRAS.items():
+            for nome, origem, unidade in colunas:
+                resultado = bench_column(conn, tabela, nome, origem, unidade, args.janelas, args.dias)
+                if resultado is None:
+                    continue
+                print(f"\n{tabela}.{origem} -> {nome} ({resultado['linhas']:,} linhas)")
+                print(f"  bytes por linha    texto {resultado['bytes_texto']:>6.1f}   "
+                      f"inteiro {resultado['bytes_inteiro']:>6.1f}")
+                print(f"  índice             texto {resultado['indice_texto'] / 2**20:>6.1f} MiB  "
+                      f"inteiro {resultado['indice_inteiro'] / 2**20:>6.1f} MiB")
+                for rotulo, ms in resultado['tempos'].items():
+                    print(f"  {rotulo:<18} p50 {ms:>9.2f} ms  (janelas de {args.dias} dias)")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Benchmark de redução de séries temporais (MinMax + LTTB)
+
+Gera séries de 10 anos (diária e horária), mede o tamanho do JSON enviado ao
+navegador com e sem redução e falha se o payload reduzido passar do limite.
+
+Uso:
+    python benchmarks/downsampling.py [--max-kb 64]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.utils
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.graficos import _build_figure, downsample_series  # noqa: E402
+
+
+def make_series(freq, years=10, seed=42):
+    """Série sintética de consultas com tendência, sazonalidade e ruído"""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize()
+    index = pd.date_range(end=end, periods=int(years * 365.25 * (24 if freq == 'h' else 1)), freq=freq)
+    t = np.arange(len(index))
+    quantidade = 20 + 0.001 * t + 5 * np.sin(2 * np.pi * t / len(index) * years) + rng.poisson(3, len(index))
+    return pd.DataFrame({'data': index.strftime('%Y-%m-%d %H:%M:%S'), 'quantidade': quantidade.astype(int)})
+
+
+def payload_kb(df):
+    """Tamanho do gráfico de linha serializado (como o st.plotly_chart faz) em KB"""
+    fig = _build_figure('line', df, None, None, {'x': 'data', 'y': 'quantidade', 'markers': True})
+    return len(json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder).encode()) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-kb", type=float, default=64,
+                        help="Tamanho máximo do payload reduzido em KB")
+    args = parser.parse_args()
+
+    failures = []
+    for freq, label in (('D', "10 anos diário"), ('h', "10 anos horário")):
+        df = make_series(freq)
+        start = time.perf_counter()
+        reduced = downsample_series(df, 'data', 'quantidade')
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        raw_kb, reduced_kb = payload_kb(df), payload_kb(reduced)
+        print(f"{label:<16} {len(df):>7} → {len(reduced):>4} pontos  "
+              f"{raw_kb:>9.1f} KB → {reduced_kb:>6.1f} KB  ({elapsed_ms:.1f} ms)")
+        if reduced_kb > args.max_kb:
+            failures.append(f"{label}: payload de {reduced_kb:.1f} KB (limite: {args.max_kb} KB)")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
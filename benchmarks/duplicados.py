@@ -0,0 +1,127 @@
+"""
+Benchmark da detecção de pacientes duplicados
+
+Cria um banco temporário com N pacientes (nomes, datas e telefones
+aleatórios) e uma fração de cópias sem CPF com erros de digitação, mede o
+relatório completo (find_duplicate_candidates), a quantidade de cópias
+encontradas e a verificação de um cadastro novo (check_new_patient). Falha
+se algum tempo passar do limite.
+
+Uso:
+    python benchmarks/duplicados.py [--pacientes 500000] [--max-s 300] [--max-ms 50]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.database import DatabaseManager  # noqa: E402
+from medstock360.duplicados import check_new_patient, find_duplicate_candidates, refresh_patient_keys  # noqa: E402
+
+NOMES = ["Ana", "João", "Maria", "José", "Paula", "Carlos", "Fernanda", "Lucas", "Juliana", "Pedro",
+         "Luiz", "Thiago", "Felipe", "Gabriela", "Rafael", "Beatriz", "Mateus", "Larissa", "Vinícius", "Camila"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Almeida", "Ferreira",
+              "Rodrigues", "Gomes", "Martins", "Araújo", "Barbosa", "Ribeiro", "Carvalho", "Rocha", "Moura"]
+
+# Erros de digitação das cópias
+VARIACOES = [("s", "z"), ("z", "s"), ("i", "y"), ("th", "t"), ("ph", "f"), ("ç", "ss"), ("ll", "l")]
+
+
+def _typo(rng, nome):
+    """Uma variação de grafia, acento ou partícula do nome"""
+    escolha = rng.random()
+    if escolha < 0.3:
+        for de, para in rng.sample(VARIACOES, len(VARIACOES)):
+            if de in nome:
+                return nome.replace(de, para, 1)
+    if escolha < 0.6:
+        partes = nome.split()
+        return " ".join(partes[:1] + ["da"] + partes[1:])
+    return nome.upper().replace("Ã", "A").replace("É", "E").replace("Ú", "U").replace("Í", "I")
+
+
+def populate(conn, n_pacientes, fracao_copias=0.01, seed=42):
+    """Inserir os pacientes e as cópias; devolve os pares (original, cópia)"""
+    rng = random.Random(seed)
+    hoje = date.today()
+    pacientes = []
+    for i in range(1, n_pacientes + 1):
+        nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+        nascimento = (hoje - timedelta(days=rng.randrange(365 * 90))).isoformat()
+        telefone = f"119{rng.randrange(10 ** 8):08d}" if rng.random() < 0.5 else None
+        pacientes.append((i, nome, f"{i:011d}", nascimento, rng.choice(["Masculino", "Feminino"]), telefone))
+    copias, pares = [], set()
+    for j, original in enumerate(rng.sample(pacientes, int(n_pacientes * fracao_copias))):
+        copia_id = n_pacientes + j + 1
+        copias.append((copia_id, _typo(rng, original[1]), None, original[3], original[4], original[5]))
+        pares.add((original[0], copia_id))
+    conn.executemany("""
+        INSERT INTO pacientes (id, nome_completo, cpf, data_nascimento, sexo, telefone)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, pacientes + copias)
+    conn.commit()
+    return pares
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pacientes", type=int, default=500_000)
+    parser.add_argument("--max-s", type=float, default=300, help="limite do relatório completo")
+    parser.add_argument("--max-ms", type=float, default=50, help="limite (p95) da verificação no cadastro")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / "duplicados.db"))
+        conn = db.get_connection()
+        pares = populate(conn, args.pacientes)
+
+        inicio = time.perf_counter()
+        candidatos = find_duplicate_candidates(conn)
+        relatorio_s = time.perf_counter() - inicio
+        achados = set(zip(candidatos['id_a'], candidatos['id_b']))
+        encontrados = sum(1 for par in pares if par in achados)
+        print(f"relatório          {relatorio_s:>8.1f} s   pares: {len(candidatos):>7}  "
+              f"cópias encontradas: {encontrados}/{len(pares)}")
+
+        inicio = time.perf_counter()
+        indexados = refresh_patient_keys(conn)
+        print(f"chaves de bloqueio {time.perf_counter() - inicio:>8.1f} s   pacientes: {indexados}")
+        conn.close()
+
+        rng = random.Random(7)
+        amostra = rng.sample(sorted(pares), min(200, len(pares)))
+        conn = db.get_connection()
+        originais = {row[0]: row for row in conn.execute(
+            f"SELECT id, nome_completo, data_nascimento, telefone, sexo FROM pacientes "
+            f"WHERE id IN ({', '.join(str(a) for a, _ in amostra)})"
+        )}
+        conn.close()
+        tempos, acertos = [], 0
+        for original_id, _ in amostra:
+            _, nome, nascimento, telefone, sexo = originais[original_id]
+            inicio = time.perf_counter()
+            parecidos = check_new_patient(db, _typo(rng, nome), nascimento, telefone, sexo=sexo)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+            acertos += any(p['id'] == original_id for p in parecidos)
+        p95 = statistics.quantiles(tempos, n=20)[-1]
+        print(f"cadastro (p95)     {p95:>8.1f} ms  original sugerido: {acertos}/{len(amostra)}")
+
+    failures = []
+    if relatorio_s > args.max_s:
+        failures.append(f"relatório: {relatorio_s:.1f} s (limite: {args.max_s} s)")
+    if p95 > args.max_ms:
+        failures.append(f"cadastro: {p95:.1f} ms (limite: {args.max_ms} ms)")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
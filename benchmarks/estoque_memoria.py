@@ -0,0 +1,100 @@
+"""
+Benchmark de memória do relatório "Estoque Atual"
+
+Cria um banco temporário com N lotes (gerar_dados.generate, só medicamentos
+e lotes) e carrega o comando 'estoque.lotes' pelos dois caminhos, cada um
+em um subprocesso para isolar o pico de memória:
+
+- pandas: read_sql (colunas object) + a conversão que st.dataframe faz;
+- arrow: read_arrow (dicionários e date32) + a serialização da Table.
+
+Mede o tempo, o pico de RSS acima do processo já com tudo importado e o
+tamanho do resultado em memória (memory_usage(deep=True) / Table.nbytes).
+
+Uso:
+    python benchmarks/estoque_memoria.py [--lotes 1000000] [--medicamentos 10000]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.database import DatabaseManager  # noqa: E402
+from medstock360.vencimentos import FAIXA_ATE_30_DIAS  # noqa: E402
+
+MODOS = ['pandas', 'arrow']
+
+
+def _rss_pico_mib():
+    # ru_maxrss em KiB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(banco, modo):
+    """Carregar o relatório por um caminho e devolver tempo, pico de RSS e tamanho"""
+    import pandas as pd  # noqa: F401  (importados antes da linha de base)
+    import pyarrow  # noqa: F401
+    from streamlit import type_util
+
+    from medstock360.comandos import read_arrow, read_sql
+
+    conn = DatabaseManager(banco).get_connection()
+    params = {'faixa_vencendo': FAIXA_ATE_30_DIAS}
+    base = _rss_pico_mib()
+    inicio = time.perf_counter()
+    if modo == 'pandas':
+        resultado = read_sql(conn, 'estoque.lotes', params)
+        tamanho = resultado.memory_usage(deep=True).sum()
+        enviado = type_util.data_frame_to_bytes(resultado)
+    else:
+        resultado = read_arrow(conn, 'estoque.lotes', params)
+        tamanho = resultado.nbytes
+        enviado = type_util.pyarrow_table_to_bytes(resultado)
+    segundos = time.perf_counter() - inicio
+    conn.close()
+    return {
+        'linhas': len(resultado), 'segundos': segundos, 'pico_mib': _rss_pico_mib() - base,
+        'resultado_mib': tamanho / 2**20, 'enviado_mib': len(enviado) / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lotes", type=int, default=1_000_000)
+    parser.add_argument("--medicamentos", type=int, default=10_000)
+    parser.add_argument("--medir", nargs=2, metavar=("BANCO", "MODO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(measure(*args.medir)))
+        return 0
+
+    from gerar_dados import VOLUMES, generate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        banco = str(Path(tmp) / "estoque.db")
+        conn = DatabaseManager(banco).get_connection()
+        volumes = dict.fromkeys(VOLUMES, 0)
+        volumes.update(medicamentos=args.medicamentos, lotes=args.lotes)
+        generate(conn, volumes)
+        conn.close()
+
+        print(f"\n{'caminho':<8} {'linhas':>10} {'tempo':>8} {'pico RSS':>10} {'resultado':>10} {'enviado':>10}")
+        for modo in MODOS:
+            saida = subprocess.run([sys.executable, __file__, "--medir", banco, modo],
+                                   capture_output=True, text=True, check=True).stdout
+            r = json.loads(saida.strip().splitlines()[-1])
+            print(f"{modo:<8} {r['linhas']:>10,} {r['segundos']:>7.1f}s {r['pico_mib']:>6.0f} MiB "
+                  f"{r['resultado_mib']:>6.0f} MiB {r['enviado_mib']:>6.0f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Gerador determinístico de dados sintéticos em escala hospitalar
+
+Cria (ou completa) um banco com o schema de DatabaseManager.init_database e
+insere volumes configuráveis de pacientes, medicamentos, lotes,
+movimentações, consultas e receitas. A mesma semente, escala e data de
+referência produzem sempre os mesmos registros.
+
+Volumes padrão (--escala 1): 200 médicos, 500 mil pacientes, 10 mil medicamentos,
+200 mil lotes, 20 milhões de movimentações e 2 milhões de consultas e de
+receitas. Use --escala 0.01 para um banco pequeno em segundos.
+
+Uso:
+    python benchmarks/gerar_dados.py dados/benchmark.db [--escala 0.01] [--semente 42]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from medstock360.database import DatabaseManager  # noqa: E402
+from medstock360.vencimentos import refresh_expiry_buckets  # noqa: E402
+
+VOLUMES = {
+    'medicos': 200,
+    'pacientes': 500_000,
+    'medicamentos': 10_000,
+    'lotes': 200_000,
+    'movimentacoes': 20_000_000,
+    'consultas': 2_000_000,
+    'receitas': 2_000_000,
+}
+
+# Período coberto pelo histórico (consultas também têm 30 dias futuros)
+ANOS_HISTORICO = 3
+CHUNK = 50_000
+
+CATEGORIAS = ["Analgésicos", "Anti-inflamatórios", "Antibióticos", "Antidepressivos",
+              "Anti-hipertensivos", "Vitaminas", "Controlados", "Outros"]
+APRESENTACOES = ["Comprimido", "Cápsula", "Ampola", "Frasco", "Xarope", "Pomada"]
+VIAS = ["Oral", "Intravenosa", "Intramuscular", "Subcutânea", "Tópica"]
+ESPECIALIDADES = ["Clínica Geral", "Pediatria", "Cardiologia", "Ortopedia", "Dermatologia"]
+TIPOS_CONSULTA = ["Consulta inicial", "Retorno", "Emergência", "Exame", "Procedimento", "Teleconsulta"]
+STATUS_RECEITA = ["Ativa", "Dispensada", "Dispensada", "Dispensada", "Cancelada"]
+ESTADOS = ["SP", "RJ", "MG", "RS", "PR", "BA", "PE", "CE", "SC", "GO"]
+NOMES = ["Ana", "João", "Maria", "José", "Paula", "Carlos", "Fernanda", "Lucas", "Juliana", "Pedro"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Almeida", "Ferreira"]
+
+
+def _insert(conn, sql, linhas, label, total):
+    """Inserir em blocos de CHUNK linhas, mostrando o progresso"""
+    inicio = time.perf_counter()
+    inseridas = 0
+    linhas = iter(linhas)
+    while True:
+        bloco = list(islice(linhas, CHUNK))
+        if not bloco:
+            break
+        conn.executemany(sql, bloco)
+        inseridas += len(bloco)
+        print(f"\r{label:<15} {inseridas:>11,}/{total:,}", end="", flush=True)
+    conn.commit()
+    print(f"  ({time.perf_counter() - inicio:.1f} s)")
+
+
+def _nome(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def generate(conn, volumes, semente=42, hoje=None):
+    """Inserir os dados sintéticos (determinísticos para a mesma semente e data)"""
+    hoje = hoje or date.today()
+    inicio_historico = datetime.combine(hoje - timedelta(days=365 * ANOS_HISTORICO), datetime.min.time())
+    segundos_historico = 365 * ANOS_HISTORICO * 86400
+    # Colunas com DEFAULT CURRENT_TIMESTAMP recebem a data de referência
+    carimbo = f"{hoje.isoformat()} 00:00:00"
+
+    def momento(rng, futuro_dias=0):
+        segundos = rng.randrange(segundos_historico + futuro_dias * 86400)
+        return (inicio_historico + timedelta(seconds=segundos)).strftime('%Y-%m-%d %H:%M:%S')
+
+    # Médicos (ids a partir de 1000 para não colidir com o admin padrão)
+    rng = random.Random(semente)
+    medicos = list(range(1000, 1000 + volumes['medicos']))
+    _insert(conn, """
+        INSERT OR IGNORE INTO usuarios (id, username, password_hash, nome_completo, perfil, crm_crf,
+                                        especialidade, data_criacao)
+        VALUES (?, ?, '', ?, 'Médico', ?, ?, ?)
+    """, ((m, f"medico{m}", f"Dr(a). {_nome(rng)}", f"CRM{m}", rng.choice(ESPECIALIDADES), carimbo)
+          for m in medicos), "médicos", len(medicos))
+
+    rng = random.Random(semente + 1)
+    _insert(conn, """
+        INSERT INTO pacientes (nome_completo, cpf, data_nascimento, sexo, cidade, estado, plano_saude,
+                               data_cadastro)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, ((_nome(rng), f"{i:011d}", (hoje - timedelta(days=rng.randrange(365 * 90))).isoformat(),
+           rng.choice(["Masculino", "Feminino"]), "Cidade", rng.choice(ESTADOS),
+           rng.choice([None, "Plano A", "Plano B"]), carimbo)
+          for i in range(volumes['pacientes'])), "pacientes", volumes['pacientes'])
+
+    rng = random.Random(semente + 2)
+    _insert(conn, """
+        INSERT INTO medicamentos (nome, principio_ativo, categoria, apresentacao, concentracao,
+                                  controlado, via_administracao, data_cadastro)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, ((f"Medicamento {i}", f"Princípio {i % 2000}", rng.choice(CATEGORIAS), rng.choice(APRESENTACOES),
+           f"{rng.choice([5, 10, 20, 50, 100, 500])}mg", int(rng.random() < 0.05), rng.choice(VIAS),
+           carimbo)
+          for i in range(1, volumes['medicamentos'] + 1)), "medicamentos", volumes['medicamentos'])
+
+    rng = random.Random(semente + 3)
+    _insert(conn, """
+        INSERT INTO lotes (medicamento_id, numero_lote, data_fabricacao, data_validade,
+                           quantidade_inicial, quantidade_atual, preco_unitario, fornecedor, data_entrada)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, ((rng.randint(1, volumes['medicamentos']), f"L{i:07d}",
+           (hoje - timedelta(days=rng.randrange(720))).isoformat(),
+           (hoje + timedelta(days=rng.randint(-60, 720))).isoformat(),
+           500, rng.randint(0, 500), round(rng.uniform(0.5, 200), 2), f"Fornecedor {rng.randrange(50)}", carimbo)
+          for i in range(volumes['lotes'])), "lotes", volumes['lotes'])
+
+    rng = random.Random(semente + 4)
+    n_pacientes = volumes['pacientes']
+    _insert(conn, """
+        INSERT INTO consultas (paciente_id, medico_id, data_consulta, data_fim, duracao_minutos,
+                               tipo_consulta, status, valor, data_agendamento)
+        VALUES (?, ?, ?, datetime(?, '+30 minutes'), 30, ?, ?, ?, ?)
+    """, ((rng.randint(1, n_pacientes), rng.choice(medicos), data, data, rng.choice(TIPOS_CONSULTA),
+           "Agendada" if data > hoje.isoformat() else rng.choice(["Concluída", "Concluída", "Cancelada"]),
+           rng.choice([None, 150.0, 250.0]), carimbo)
+          for data in (momento(rng, futuro_dias=30) for _ in range(volumes['consultas']))),
+        "consultas", volumes['consultas'])
+
+    rng = random.Random(semente + 5)
+    n_consultas = volumes['consultas']
+    _insert(conn, """
+        INSERT INTO receitas (consulta_id, paciente_id, medico_id, data_emissao, status)
+        VALUES (?, ?, ?, ?, ?)
+    """, ((rng.randint(1, max(n_consultas, 1)), rng.randint(1, n_pacientes), rng.choice(medicos),
+           momento(rng), rng.choice(STATUS_RECEITA))
+          for _ in range(volumes['receitas'])), "receitas", volumes['receitas'])
+
+    rng = random.Random(semente + 6)
+    _insert(conn, """
+        INSERT INTO receita_itens (receita_id, medicamento_id, dosagem, quantidade, frequencia)
+        VALUES (?, ?, '1 unidade', ?, '8/8h')
+    """, ((receita_id, rng.randint(1, volumes['medicamentos']), rng.randint(1, 30))
+          for receita_id in range(1, volumes['receitas'] + 1)
+          for _ in range(rng.randint(1, 3))), "receita_itens", volumes['receitas'] * 2)
+
+    rng = random.Random(semente + 7)
+    _insert(conn, """
+        INSERT INTO movimentacoes (lote_id, tipo_movimento, quantidade, data_movimento, responsavel)
+        VALUES (?, ?, ?, ?, ?)
+    """, ((rng.randint(1, volumes['lotes']), "Saída" if rng.random() < 0.85 else "Entrada",
+           rng.randint(1, 20), momento(rng), 1)
+          for _ in range(volumes['movimentacoes'])), "movimentacoes", volumes['movimentacoes'])
+
+    refresh_expiry_buckets(conn, hoje)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("banco", help="Caminho do banco SQLite a criar")
+    parser.add_argument("--escala", type=float, default=1.0, help="Fator aplicado a todos os volumes")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--data-referencia", type=date.fromisoformat, default=date.today(),
+                        help="Data 'hoje' dos dados (AAAA-MM-DD)")
+    for tabela, volume in VOLUMES.items():
+        parser.add_argument(f"--{tabela}", type=int, help=f"Volume de {tabela} (padrão: {volume:,} x escala)")
+    args = parser.parse_args()
+
+    volumes = {
+        tabela: getattr(args, tabela) if getattr(args, tabela) is not None else max(int(volume * args.escala), 1)
+        for tabela, volume in VOLUMES.items()
+    }
+    # O corpo clínico não cresce com a escala (a agenda precisa de médicos suficientes)
+    if args.medicos is None:
+        volumes['medicos'] = VOLUMES['medicos']
+
+    if Path(args.banco).exists():
+        print(f"❌ {args.banco} já existe; escolha outro caminho")
+        return 1
+
+    db = DatabaseManager(args.banco)
+    conn = db.get_connection()
+    # Carga em massa: sem journal nem fsync (o banco é descartável)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+
+    inicio = time.perf_counter()
+    generate(conn, volumes, args.semente, args.data_referencia)
+    conn.close()
+    tamanho_mb = Path(args.banco).stat().st_size / 1024 / 1024
+    print(f"✅ {args.banco}: {tamanho_mb:,.0f} MB em {time.perf_counter() - inicio:.0f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark de tempo de importação (python -X importtime)
+
+Mede o custo de importar o shell da aplicação (app.py) e cada módulo de
+página, e verifica que o shell não carrega no cold start o que o app adia
+até a abertura de uma página: plotly.express, medstock360.graficos e os
+módulos de medstock360.paginas. pandas, numpy e pyarrow não entram na
+verificação porque o próprio streamlit já os importa.
+
+Uso:
+    python benchmarks/importtime.py [--json resultado.json] [--budget-ms 1500]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PAGE_MODULES = [
+    f"medstock360.paginas.{path.stem}"
+    for path in sorted((ROOT / "medstock360" / "paginas").glob("*.py"))
+    if path.stem != "__init__"
+]
+
+TARGETS = ['app'] + PAGE_MODULES
+
+# Módulos (e submódulos) que o app só deve importar quando uma página é aberta
+LAZY_MODULES = ('plotly.express', 'medstock360.graficos', *PAGE_MODULES)
+
+
+def _imported(module, loaded):
+    """O módulo ou algum submódulo dele está entre os carregados"""
+    return any(m == module or m.startswith(module + ".") for m in loaded)
+
+
+def measure_import(module):
+    """Importar o módulo em um processo novo e retornar as linhas do -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        entries.append({
+            'self_us': int(parts[0]),
+            'cumulative_us': int(parts[1]),
+            'module': parts[2].strip()
+        })
+    return entries
+
+
+def summarize(module, entries, baseline=frozenset()):
+    """Resumir o tempo total, os módulos além da linha de base e os adiados já carregados"""
+    top_level = [e for e in entries if e['module'] == module]
+    total_us = top_level[-1]['cumulative_us'] if top_level else sum(e['self_us'] for e in entries)
+    loaded = {e['module'] for e in entries}
+    return {
+        'module': module,
+        'total_ms': round(total_us / 1000, 2),
+        'modules_loaded': len(loaded - baseline),
+        # Sem descontar a linha de base: são módulos que o streamlit não importa
+        'lazy_modules_loaded': sorted(m for m in LAZY_MODULES if m != module and _imported(m, loaded)),
+        'slowest': [
+            {'module': e['module'], 'cumulative_ms': round(e['cumulative_us'] / 1000, 2)}
+            for e in sorted(entries, key=lambda e: e['cumulative_us'], reverse=True)[:5]
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", help="Arquivo para salvar os resultados em JSON")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Tempo máximo de importação do shell (app) em ms")
+    args = parser.parse_args()
+
+    # Contagem de módulos além do que o próprio streamlit importa
+    baseline = frozenset(e['module'] for e in measure_import("streamlit"))
+    results = [summarize(module, measure_import(module), baseline) for module in TARGETS]
+
+    for r in results:
+        lazy = ", ".join(r['lazy_modules_loaded']) or "-"
+        print(f"{r['module']:<40} {r['total_ms']:>10.2f} ms  {r['modules_loaded']:>5} módulos  adiados: {lazy}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+    failures = []
+    shell = results[0]
+    if shell['lazy_modules_loaded']:
+        failures.append(f"app importa {', '.join(shell['lazy_modules_loaded'])} no cold start")
+    if args.budget_ms is not None and shell['total_ms'] > args.budget_ms:
+        failures.append(f"app levou {shell['total_ms']} ms (orçamento: {args.budget_ms} ms)")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
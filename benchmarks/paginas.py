@@ -0,0 +1,165 @@
+"""
+Suíte de benchmark das páginas sobre um banco em escala hospitalar
+
+Renderiza Dashboard, Estoque, Análise Preditiva, Receitas e Relatórios com
+o AppTest do Streamlit sobre um banco gerado por gerar_dados.py e registra,
+via performance_stats, o tempo de renderização de cada página e o custo de
+cada consulta SQL que ela executa (por impressão digital).
+
+O resultado é gravado em JSON (com o commit e os volumes do banco) para ser
+comparado entre commits com --comparar: falha se alguma página ou consulta
+ficar mais lenta que a tolerância.
+
+Uso:
+    python benchmarks/gerar_dados.py /tmp/hospital.db --escala 0.05
+    python benchmarks/paginas.py /tmp/hospital.db --json base.json
+    python benchmarks/paginas.py /tmp/hospital.db --comparar base.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from medstock360.auth import AuthManager  # noqa: E402
+from medstock360.database import DatabaseManager  # noqa: E402
+from medstock360.desempenho import performance_stats  # noqa: E402
+
+PAGINAS = ["🏠 Dashboard", "📦 Estoque", "🔮 Análise Preditiva", "📝 Receitas", "📊 Relatórios"]
+TABELAS = ["pacientes", "medicamentos", "lotes", "movimentacoes", "consultas", "receitas"]
+
+# Diferenças abaixo deste valor são ruído, não regressão
+RUIDO_MS = 5.0
+
+
+def git_commit():
+    """Commit atual (ou None fora de um repositório git)"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def open_app(db_manager):
+    """AppTest já autenticado como administrador, usando o banco informado"""
+    at = AppTest.from_file(str(RAIZ / "app.py"), default_timeout=600)
+    auth_manager = AuthManager(db_manager)
+    # Com db_manager na sessão, app.py não inicia as threads de segundo plano
+    at.session_state.db_manager = db_manager
+    at.session_state.auth_manager = auth_manager
+    at.session_state.authenticated = True
+    at.session_state.user = {'id': 1, 'username': 'admin', 'nome_completo': 'Benchmark',
+                             'perfil': 'Administrador'}
+    at.session_state.permissions = auth_manager.get_user_permissions('Administrador')
+    at.run()
+    return at
+
+
+def run_suite(db_path, repeticoes):
+    """Renderizar cada página (1 aquecimento + repetições) e coletar as métricas"""
+    db_manager = DatabaseManager(db_path)
+    conn = db_manager.get_connection()
+    volumes = {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] for tabela in TABELAS}
+    conn.close()
+
+    at = open_app(db_manager)
+    paginas = {}
+    for pagina in PAGINAS:
+        menu = at.sidebar.selectbox[0]
+        menu.select(pagina).run()
+        if at.exception:
+            raise RuntimeError(f"{pagina}: {at.exception[0].value}")
+
+        performance_stats.clear()
+        for _ in range(repeticoes):
+            at.run()
+
+        resumo = next(p for p in performance_stats.page_summary() if p['pagina'] == pagina)
+        paginas[pagina] = {
+            'p50_ms': resumo['p50_ms'],
+            'max_ms': resumo['max_ms'],
+            'consultas': {
+                q['fingerprint']: {
+                    'sql': q['sql'],
+                    'chamadas_por_render': q['chamadas'] / repeticoes,
+                    'p50_ms': q['p50_ms'],
+                    'linhas_media': q['linhas_media'],
+                }
+                for q in performance_stats.query_summary() if pagina in q['paginas'].split(", ")
+            },
+        }
+        print(f"{pagina:<22} p50 {resumo['p50_ms']:>9.1f} ms  ({len(paginas[pagina]['consultas'])} consultas)")
+
+    return {
+        'commit': git_commit(),
+        'quando': datetime.now().isoformat(timespec='seconds'),
+        'repeticoes': repeticoes,
+        'volumes': volumes,
+        'paginas': paginas,
+    }
+
+
+def compare(atual, base, tolerancia):
+    """Regressões de páginas e consultas em relação ao resultado base"""
+    regressoes = []
+
+    def check(nome, valor, referencia):
+        if valor - referencia > RUIDO_MS and valor > referencia * (1 + tolerancia):
+            regressoes.append(f"{nome}: {referencia:.1f} ms -> {valor:.1f} ms")
+
+    for pagina, dados in atual['paginas'].items():
+        dados_base = base['paginas'].get(pagina)
+        if dados_base is None:
+            continue
+        check(pagina, dados['p50_ms'], dados_base['p50_ms'])
+        for fingerprint, consulta in dados['consultas'].items():
+            consulta_base = dados_base['consultas'].get(fingerprint)
+            if consulta_base is not None:
+                check(f"{pagina} [{fingerprint}] {consulta['sql'][:60]}",
+                      consulta['p50_ms'] * consulta['chamadas_por_render'],
+                      consulta_base['p50_ms'] * consulta_base['chamadas_por_render'])
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("banco", help="Banco gerado por benchmarks/gerar_dados.py")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--json", help="Gravar o resultado neste arquivo")
+    parser.add_argument("--comparar", help="Resultado JSON de referência (outro commit)")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Piora relativa aceita em relação à referência")
+    args = parser.parse_args()
+
+    if not Path(args.banco).exists():
+        print(f"❌ {args.banco} não existe; gere-o com benchmarks/gerar_dados.py")
+        return 1
+
+    resultado = run_suite(args.banco, args.repeticoes)
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultado, ensure_ascii=False, indent=2))
+
+    if not args.comparar:
+        return 0
+
+    base = json.loads(Path(args.comparar).read_text())
+    if base.get('volumes') != resultado['volumes']:
+        print("⚠️ Os volumes do banco diferem da referência; a comparação pode não ser justa")
+    regressoes = compare(resultado, base, args.tolerancia)
+    for regressao in regressoes:
+        print(f"❌ {regressao}")
+    if not regressoes:
+        print(f"✅ Sem regressões em relação a {base.get('commit')}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
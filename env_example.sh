@@ -24,6 +24,62 @@ STREAMLIT_SERVER_ENABLE_XSRF_PROTECTION=false
 # SMTP_PORT=587
 # SMTP_USERNAME=seu-email@gmail.com
 # SMTP_PASSWORD=sua-senha-app
+# SMTP_USE_TLS=true
+
+# Alertas de estoque e vencimento (opcional)
+# ALERT_EMAIL_TO=farmacia@hospital.com,compras@hospital.com
+# ALERT_EMAIL_FROM=medstock360@hospital.com
+# ALERT_WEBHOOK_URL=https://hooks.exemplo.com/medstock360
+# ALERT_INTERVAL_SECONDS=300
+# ALERT_BATCH_SIZE=100
+# ALERT_MAX_ATTEMPTS=6
+
+# Log de auditoria (opcional)
+# AUDIT_FLUSH_INTERVAL_SECONDS=1
+# AUDIT_BATCH_SIZE=500
+
+# Arquivamento de dados antigos em bancos anuais (opcional)
+# ARCHIVE_ENABLED=true
+# ARCHIVE_AFTER_DAYS=730
+# ARCHIVE_COMPRESS=false
+# ARCHIVE_DIR=/data/arquivo
+
+# Unidades hospitalares: um banco por unidade (opcional; sem isto, um único banco)
+# UNIDADES=Central,Norte,Sul
+# SHARD_FANOUT_WORKERS=8
+# DB_POOL_SIZE=8
+# DB_STATEMENT_CACHE=256
+# ARROW_LOTE=65536
+
+# Consultas pesadas: orçamento de tempo e limite de execuções simultâneas (opcional)
+# HEAVY_QUERY_BUDGET_MS=5000
+# HEAVY_QUERIES_PER_PROCESS=2
+# HEAVY_QUERIES_PER_USER=1
+# ADMISSION_WAIT_SECONDS=3
+
+# Exportações em segundo plano (opcional)
+# JOB_WORKERS=2
+# JOB_RESULT_TTL_HOURS=24
+# JOB_TIMEOUT_SECONDS=1800
+# JOB_RESULTS_DIR=/data/tarefas
+
+# Relatórios padrão pré-calculados (opcional)
+# SNAPSHOT_HOUR=2
+# SNAPSHOT_REFRESH_CHANGES=500
+
+# Detecção de pacientes duplicados (opcional)
+# DUPLICADOS_LIMIAR=0.8
+# DUPLICADOS_WORKERS=8
+
+# Planejamento de compras (opcional)
+# COMPRAS_JANELA_DIAS=90
+# COMPRAS_NIVEL_SERVICO=0.95
+# COMPRAS_COBERTURA_DIAS=60
+# COMPRAS_PRAZO_PADRAO_DIAS=7
+
+# Instrumentação de consultas (opcional)
+# SLOW_QUERY_MS=100
+# QUERY_LOG_MAX_ENTRIES=10000
 
 # Configurações de backup (opcional)
 # BACKUP_ENABLED=true
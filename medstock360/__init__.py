@@ -0,0 +1,4 @@
+"""
+🏥 MedStock360 Advanced
+Pacote com os componentes do sistema hospitalar (banco, autenticação e páginas)
+"""
@@ -0,0 +1,582 @@
+"""
+Agenda de consultas com detecção real de conflitos
+
+Cada consulta tem início (data_consulta) e fim (data_fim). As consultas não
+canceladas ficam em um índice de intervalos R*Tree (médico × minutos desde a
+época), mantido por triggers, e a verificação de sobreposição é uma busca
+O(log n) nesse índice. Sem suporte a R*Tree no SQLite, a busca usa o índice
+(medico_id, data_consulta) limitada pela duração máxima de uma consulta.
+
+O agendamento verifica e insere na mesma transação BEGIN IMMEDIATE e, dentro
+do processo, sob uma trava por médico: duas recepcionistas não conseguem
+marcar o mesmo horário.
+
+A busca de horários livres cruza o modelo semanal de atendimento de cada
+médico (medicos_horarios, ou HORARIO_PADRAO enquanto o médico não tiver um
+modelo salvo; um modelo salvo sem janelas é "sem atendimento") com as
+consultas do período.
+
+As visões de semana e mês leem o período com uma única consulta por
+intervalo, guardada em cache até a próxima escrita em consultas (a versão
+da agenda é incrementada por triggers).
+"""
+
+import heapq
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+
+from medstock360.comandos import run
+
+DURACAO_PADRAO_MINUTOS = 30
+DURACAO_MAXIMA_MINUTOS = 8 * 60
+DURACOES_MINUTOS = [15, 20, 30, 45, 60, 90, 120]
+
+# Modelo de atendimento usado para médicos sem horários cadastrados
+# (dia da semana, segunda = 0 -> janelas HH:MM)
+HORARIO_PADRAO = {dia: [('08:00', '12:00'), ('13:00', '18:00')] for dia in range(5)}
+DIAS_SEMANA = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+PASSO_SLOT_MINUTOS = 15
+
+# Limite do cache de períodos da agenda (por processo)
+CALENDAR_CACHE_MAX_ENTRIES = int(os.getenv('CALENDAR_CACHE_MAX_ENTRIES', '64'))
+
+_EPOCA = datetime(1970, 1, 1)
+_MINUTOS_DIA = 24 * 60
+
+_MINUTOS_SQL = "CAST(strftime('%s', {coluna}) AS INTEGER) / 60"
+
+_RTREE_INSERT_SQL = f"""
+    INSERT INTO consultas_intervalos (id, medico_min, medico_max, inicio, fim)
+    SELECT c.id, c.medico_id, c.medico_id,
+           {_MINUTOS_SQL.format(coluna='c.data_consulta')},
+           {_MINUTOS_SQL.format(coluna='c.data_fim')} - 1
+    FROM consultas c
+"""
+
+
+@lru_cache(maxsize=1)
+def rtree_available():
+    """Verificar (uma vez por processo) se o SQLite foi compilado com R*Tree"""
+    conn = sqlite3.connect(":memory:")
+    try:
+        return any(row[0] == 'ENABLE_RTREE' for row in conn.execute("PRAGMA compile_options"))
+    finally:
+        conn.close()
+
+
+def _format_datetime(valor):
+    """Formato de data/hora usado nas colunas TIMESTAMP de consultas"""
+    return valor.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _to_minutes(valor):
+    """Minutos desde a época (mesma escala do índice de intervalos)"""
+    return int((valor - _EPOCA).total_seconds()) // 60
+
+
+def _from_minutes(minutos):
+    """datetime a partir de minutos desde a época"""
+    return _EPOCA + timedelta(minutes=minutos)
+
+
+def _hhmm_to_minutes(texto):
+    """'HH:MM' em minutos desde a meia-noite"""
+    horas, minutos = texto.split(':')[:2]
+    return int(horas) * 60 + int(minutos)
+
+
+def init_schedule_schema(cursor):
+    """Migrar consultas para início/fim e criar o índice de intervalos"""
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(consultas)")}
+    if 'data_fim' not in colunas:
+        cursor.execute("ALTER TABLE consultas ADD COLUMN data_fim TIMESTAMP")
+    if 'duracao_minutos' not in colunas:
+        cursor.execute(f"ALTER TABLE consultas ADD COLUMN duracao_minutos INTEGER DEFAULT {DURACAO_PADRAO_MINUTOS}")
+
+    # Consultas antigas (sem fim) recebem a duração padrão
+    cursor.execute(f"""
+        UPDATE consultas
+        SET duracao_minutos = COALESCE(duracao_minutos, {DURACAO_PADRAO_MINUTOS}),
+            data_fim = datetime(data_consulta, '+' || COALESCE(duracao_minutos, {DURACAO_PADRAO_MINUTOS}) || ' minutes')
+        WHERE data_fim IS NULL
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_consultas_medico_inicio
+        ON consultas (medico_id, data_consulta)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_consultas_inicio
+        ON consultas (data_consulta)
+    """)
+
+    # Especialidade e modelo semanal de atendimento dos médicos
+    colunas_usuarios = {row[1] for row in cursor.execute("PRAGMA table_info(usuarios)")}
+    if 'especialidade' not in colunas_usuarios:
+        cursor.execute("ALTER TABLE usuarios ADD COLUMN especialidade TEXT")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS medicos_horarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            medico_id INTEGER NOT NULL,
+            dia_semana INTEGER NOT NULL CHECK (dia_semana BETWEEN 0 AND 6),
+            hora_inicio TEXT NOT NULL,
+            hora_fim TEXT NOT NULL,
+            FOREIGN KEY (medico_id) REFERENCES usuarios (id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_medicos_horarios_medico
+        ON medicos_horarios (medico_id, dia_semana)
+    """)
+    # 1 quando o modelo semanal foi salvo (mesmo sem janelas): não usa HORARIO_PADRAO
+    if 'horario_personalizado' not in colunas_usuarios:
+        cursor.execute("ALTER TABLE usuarios ADD COLUMN horario_personalizado INTEGER DEFAULT 0")
+        cursor.execute("""
+            UPDATE usuarios SET horario_personalizado = 1
+            WHERE id IN (SELECT DISTINCT medico_id FROM medicos_horarios)
+        """)
+
+    # Versão da agenda: muda a cada escrita em consultas e invalida o cache
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agenda_controle (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            versao INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO agenda_controle (id, versao) VALUES (1, 0)")
+    for evento in ('INSERT', 'UPDATE', 'DELETE'):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_consultas_versao_{evento.lower()}
+            AFTER {evento} ON consultas
+            BEGIN
+                UPDATE agenda_controle SET versao = versao + 1 WHERE id = 1;
+            END
+        """)
+
+    if not rtree_available():
+        return
+
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS consultas_intervalos
+        USING rtree_i32(id, medico_min, medico_max, inicio, fim)
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_consultas_intervalos_insert
+        AFTER INSERT ON consultas WHEN NEW.status != 'Cancelada'
+        BEGIN
+            {_RTREE_INSERT_SQL} WHERE c.id = NEW.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_consultas_intervalos_update
+        AFTER UPDATE OF medico_id, data_consulta, data_fim, status ON consultas
+        BEGIN
+            DELETE FROM consultas_intervalos WHERE id = OLD.id;
+            {_RTREE_INSERT_SQL} WHERE c.id = NEW.id AND c.status != 'Cancelada';
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_consultas_intervalos_delete
+        AFTER DELETE ON consultas
+        BEGIN
+            DELETE FROM consultas_intervalos WHERE id = OLD.id;
+        END
+    """)
+
+    # Popular o índice na primeira execução após a migração
+    vazio = cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM consultas_intervalos)").fetchone()[0]
+    if vazio:
+        cursor.execute(_RTREE_INSERT_SQL + " WHERE c.status != 'Cancelada'")
+
+
+def find_conflicts(conn, medico_id, inicio, fim, ignorar_id=None):
+    """Consultas não canceladas do médico que se sobrepõem a [inicio, fim)"""
+    if rtree_available():
+        inicio_min, fim_min = _to_minutes(inicio), _to_minutes(fim)
+        query = """
+            SELECT c.id, c.data_consulta, c.data_fim, p.nome_completo as paciente_nome
+            FROM consultas_intervalos i
+            JOIN consultas c ON c.id = i.id
+            LEFT JOIN pacientes p ON p.id = c.paciente_id
+            WHERE i.medico_min <= ? AND i.medico_max >= ?
+            AND i.inicio <= ? AND i.fim >= ?
+        """
+        params = [medico_id, medico_id, fim_min - 1, inicio_min]
+    else:
+        query = """
+            SELECT c.id, c.data_consulta, c.data_fim, p.nome_completo as paciente_nome
+            FROM consultas c
+            LEFT JOIN pacientes p ON p.id = c.paciente_id
+            WHERE c.medico_id = ?
+            AND c.data_consulta > ? AND c.data_consulta < ?
+            AND c.data_fim > ?
+            AND c.status != 'Cancelada'
+        """
+        limite = inicio - timedelta(minutes=DURACAO_MAXIMA_MINUTOS)
+        params = [medico_id, _format_datetime(limite), _format_datetime(fim), _format_datetime(inicio)]
+
+    if ignorar_id is not None:
+        query += " AND c.id != ?"
+        params.append(ignorar_id)
+
+    return conn.execute(query + " ORDER BY c.data_consulta", params).fetchall()
+
+
+_medico_locks = {}
+_medico_locks_guard = threading.Lock()
+
+
+def _medico_lock(medico_id):
+    """Trava do processo para agendamentos de um médico"""
+    with _medico_locks_guard:
+        return _medico_locks.setdefault(medico_id, threading.Lock())
+
+
+def schedule_appointment(db_manager, paciente_id, medico_id, inicio, duracao_minutos,
+                         tipo_consulta=None, motivo=None, valor=None, observacoes=None,
+                         agendado_por=None):
+    """
+    Agendar uma consulta se o intervalo estiver livre para o médico
+
+    Retorna (consulta_id, conflitos): consulta_id é None quando há conflitos.
+    """
+    medico_id = int(medico_id)
+    fim = inicio + timedelta(minutes=duracao_minutos)
+
+    with _medico_lock(medico_id):
+        conn = db_manager.get_connection()
+        try:
+            # Reserva de escrita entre processos: verificação e inserção atômicas
+            conn.execute("BEGIN IMMEDIATE")
+            conflitos = find_conflicts(conn, medico_id, inicio, fim)
+            if conflitos:
+                conn.rollback()
+                return None, conflitos
+
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO consultas (
+                    paciente_id, medico_id, data_consulta, data_fim, duracao_minutos,
+                    tipo_consulta, motivo, valor, observacoes, agendado_por
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                paciente_id, medico_id, _format_datetime(inicio), _format_datetime(fim),
+                duracao_minutos, tipo_consulta, motivo, valor, observacoes, agendado_por
+            ))
+            conn.commit()
+            return cursor.lastrowid, []
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def get_working_hours(conn, medico_id):
+    """Modelo semanal do médico: {dia_semana: [(HH:MM, HH:MM)]} ({} = sem atendimento)"""
+    row = conn.execute("SELECT horario_personalizado FROM usuarios WHERE id = ?", (medico_id,)).fetchone()
+    if not (row and row[0]):
+        return dict(HORARIO_PADRAO)
+    horarios = {}
+    for dia, hora_inicio, hora_fim in conn.execute("""
+        SELECT dia_semana, hora_inicio, hora_fim FROM medicos_horarios
+        WHERE medico_id = ? ORDER BY dia_semana, hora_inicio
+    """, (medico_id,)):
+        horarios.setdefault(dia, []).append((hora_inicio, hora_fim))
+    return horarios
+
+
+def _replace_working_hours(conn, medico_id, horarios):
+    """Gravar o modelo semanal do médico na transação corrente"""
+    conn.execute("UPDATE usuarios SET horario_personalizado = 1 WHERE id = ?", (medico_id,))
+    conn.execute("DELETE FROM medicos_horarios WHERE medico_id = ?", (medico_id,))
+    conn.executemany("""
+        INSERT INTO medicos_horarios (medico_id, dia_semana, hora_inicio, hora_fim)
+        VALUES (?, ?, ?, ?)
+    """, [
+        (medico_id, dia, hora_inicio, hora_fim)
+        for dia, janelas in horarios.items()
+        for hora_inicio, hora_fim in janelas
+    ])
+
+
+def set_working_hours(conn, medico_id, horarios):
+    """Substituir o modelo semanal do médico ({dia_semana: [(HH:MM, HH:MM)]}; sem janelas = sem atendimento)"""
+    set_doctor_profile(conn, medico_id, horarios)
+
+
+def set_doctor_profile(conn, medico_id, horarios, especialidade=None, alterar_especialidade=False):
+    """
+    Substituir o modelo semanal e, com alterar_especialidade, a especialidade
+    do médico (vazio = sem especialidade) em uma única transação
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _replace_working_hours(conn, medico_id, horarios)
+        if alterar_especialidade:
+            conn.execute("UPDATE usuarios SET especialidade = ? WHERE id = ?",
+                         ((especialidade or '').strip() or None, medico_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def parse_time_windows(texto):
+    """'08:00-12:00, 13:00-18:00' -> [('08:00', '12:00'), ('13:00', '18:00')]"""
+    janelas = []
+    for parte in texto.split(','):
+        if not parte.strip():
+            continue
+        inicio, fim = (datetime.strptime(h.strip(), '%H:%M').strftime('%H:%M') for h in parte.split('-'))
+        if inicio >= fim:
+            raise ValueError(f"Janela inválida: {parte.strip()}")
+        janelas.append((inicio, fim))
+    return janelas
+
+
+def format_time_windows(janelas):
+    """[('08:00', '12:00'), ...] -> '08:00-12:00, ...'"""
+    return ", ".join(f"{inicio}-{fim}" for inicio, fim in janelas)
+
+
+def _busy_intervals(conn, inicio_min, fim_min, medico_ids):
+    """Intervalos ocupados [início, fim) em minutos, agrupados por médico"""
+    medico_id = medico_ids[0] if len(medico_ids) == 1 else None
+    if rtree_available():
+        query = """
+            SELECT medico_min, inicio, fim + 1 FROM consultas_intervalos
+            WHERE inicio < ? AND fim >= ?
+        """
+        params = [fim_min, inicio_min]
+        if medico_id is not None:
+            query += " AND medico_min <= ? AND medico_max >= ?"
+            params += [medico_id, medico_id]
+    else:
+        query = f"""
+            SELECT medico_id, {_MINUTOS_SQL.format(coluna='data_consulta')},
+                   {_MINUTOS_SQL.format(coluna='data_fim')}
+            FROM consultas
+            WHERE data_consulta >= ? AND data_consulta < ? AND data_fim > ?
+            AND status != 'Cancelada'
+        """
+        params = [
+            _format_datetime(_from_minutes(inicio_min - DURACAO_MAXIMA_MINUTOS)),
+            _format_datetime(_from_minutes(fim_min)),
+            _format_datetime(_from_minutes(inicio_min)),
+        ]
+        if medico_id is not None:
+            query += " AND medico_id = ?"
+            params.append(medico_id)
+
+    ocupados = {medico: [] for medico in medico_ids}
+    for medico, inicio, fim in conn.execute(query, params):
+        intervalos = ocupados.get(medico)
+        if intervalos is not None:
+            intervalos.append((inicio, fim))
+    for intervalos in ocupados.values():
+        intervalos.sort()
+    return ocupados
+
+
+def _free_slots_medico(medico_id, janelas, ocupados, inicio_min, fim_min, duracao, passo):
+    """Gerar em ordem cronológica os horários livres (início, fim, médico) de um médico"""
+    k = 0
+    dia = inicio_min // _MINUTOS_DIA
+    while dia * _MINUTOS_DIA < fim_min:
+        inicio_dia = dia * _MINUTOS_DIA
+        # 01/01/1970 foi uma quinta-feira (segunda = 0)
+        for janela_inicio, janela_fim in janelas.get((dia + 3) % 7, ()):
+            limite = min(inicio_dia + janela_fim, fim_min)
+            atual = max(inicio_dia + janela_inicio, inicio_min)
+            while True:
+                atual = -(-atual // passo) * passo
+                if atual + duracao > limite:
+                    break
+                while k < len(ocupados) and ocupados[k][1] <= atual:
+                    k += 1
+                if k < len(ocupados) and ocupados[k][0] < atual + duracao:
+                    atual = ocupados[k][1]
+                    continue
+                yield atual, atual + duracao, medico_id
+                atual += duracao
+        dia += 1
+
+
+def find_free_slots(conn, inicio, fim, duracao_minutos, limite=10, especialidade=None,
+                    medico_id=None, passo_minutos=PASSO_SLOT_MINUTOS):
+    """
+    Próximos horários livres de todos os médicos ativos em [inicio, fim)
+
+    Uma consulta de intervalo busca as consultas ocupadas de todos os médicos;
+    os horários livres saem de uma varredura em memória do modelo semanal de
+    cada médico, intercalada em ordem cronológica até atingir o limite.
+
+    O período é percorrido em blocos de dias inteiros (1, 2, 4, ... dias):
+    como os próximos horários livres costumam estar nos primeiros dias, só
+    as consultas desses dias são lidas do banco.
+    """
+    filtros, params = "", []
+    if especialidade:
+        filtros += " AND u.especialidade = ?"
+        params.append(especialidade)
+    if medico_id is not None:
+        medico_id = int(medico_id)
+        filtros += " AND u.id = ?"
+        params.append(medico_id)
+
+    medicos, personalizados = {}, set()
+    for medico, nome, especialidade_medico, personalizado in conn.execute(f"""
+        SELECT u.id, u.nome_completo, u.especialidade, u.horario_personalizado FROM usuarios u
+        WHERE u.perfil = 'Médico' AND u.ativo = 1 {filtros}
+    """, params):
+        medicos[medico] = (nome, especialidade_medico)
+        if personalizado:
+            personalizados.add(medico)
+    if not medicos:
+        return []
+
+    # Modelo salvo sem janelas: médico sem atendimento (não cai no padrão)
+    modelos = {medico: {} for medico in personalizados}
+    for medico, dia, hora_inicio, hora_fim in conn.execute(f"""
+        SELECT h.medico_id, h.dia_semana, h.hora_inicio, h.hora_fim
+        FROM medicos_horarios h
+        JOIN usuarios u ON u.id = h.medico_id
+        WHERE u.perfil = 'Médico' AND u.ativo = 1 {filtros}
+        ORDER BY h.medico_id, h.dia_semana, h.hora_inicio
+    """, params):
+        modelos.setdefault(medico, {}).setdefault(dia, []).append(
+            (_hhmm_to_minutes(hora_inicio), _hhmm_to_minutes(hora_fim))
+        )
+    padrao = {
+        dia: [(_hhmm_to_minutes(a), _hhmm_to_minutes(b)) for a, b in janelas]
+        for dia, janelas in HORARIO_PADRAO.items()
+    }
+
+    medico_ids = sorted(medicos)
+    inicio_min, fim_min = _to_minutes(inicio), _to_minutes(fim)
+    slots = []
+    bloco_inicio, dias_bloco = inicio_min, 1
+    while bloco_inicio < fim_min and len(slots) < limite:
+        # Blocos terminam à meia-noite: nenhuma janela atravessa dois blocos
+        bloco_fim = min((bloco_inicio // _MINUTOS_DIA + dias_bloco) * _MINUTOS_DIA, fim_min)
+        ocupados = _busy_intervals(conn, bloco_inicio, bloco_fim, medico_ids)
+        geradores = [
+            _free_slots_medico(medico, modelos.get(medico, padrao), ocupados[medico],
+                               bloco_inicio, bloco_fim, duracao_minutos, passo_minutos)
+            for medico in medico_ids
+        ]
+        slots.extend(islice(heapq.merge(*geradores), limite - len(slots)))
+        bloco_inicio, dias_bloco = bloco_fim, dias_bloco * 2
+
+    return [
+        {
+            'inicio': _from_minutes(slot_inicio),
+            'fim': _from_minutes(slot_fim),
+            'medico_id': medico,
+            'medico_nome': medicos[medico][0],
+            'especialidade': medicos[medico][1],
+        }
+        for slot_inicio, slot_fim, medico in slots
+    ]
+
+
+class CalendarCache:
+    """Cache LRU dos períodos da agenda, por banco e válido para a versão da agenda do banco"""
+
+    def __init__(self, max_entries=CALENDAR_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versoes = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, banco, key, versao):
+        """Obter as consultas do período (ou None se ausentes ou desatualizadas)"""
+        with self._lock:
+            chave = (banco, key)
+            if versao != self._versoes.get(banco) or chave not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(chave)
+            self.hits += 1
+            return self._entries[chave]
+
+    def put(self, banco, key, versao, rows):
+        """Guardar as consultas do período, descartando versões antigas do mesmo banco"""
+        with self._lock:
+            if versao != self._versoes.get(banco):
+                for chave in [chave for chave in self._entries if chave[0] == banco]:
+                    del self._entries[chave]
+                self._versoes[banco] = versao
+            self._entries[(banco, key)] = rows
+            self._entries.move_to_end((banco, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Esvaziar o cache"""
+        with self._lock:
+            self._entries.clear()
+            self._versoes.clear()
+
+    def stats(self):
+        """Estatísticas de uso do cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+calendar_cache = CalendarCache()
+
+
+def agenda_version(conn):
+    """Versão atual da agenda (incrementada a cada escrita em consultas)"""
+    row = conn.execute("SELECT versao FROM agenda_controle WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def database_path(conn):
+    """Arquivo do banco principal da conexão (cada unidade tem o seu)"""
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def load_calendar(conn, inicio, fim, medico_id=None, status=None):
+    """
+    Consultas com início em [inicio, fim), em ordem de médico e horário
+
+    Uma única consulta por intervalo (índice em data_consulta) por período;
+    o resultado fica em cache, por banco, até a próxima escrita em consultas.
+    """
+    medico_id = int(medico_id) if medico_id is not None else None
+    key = (_format_datetime(inicio), _format_datetime(fim), medico_id, status)
+    banco = database_path(conn)
+    versao = agenda_version(conn)
+    rows = calendar_cache.get(banco, key, versao)
+    if rows is not None:
+        return rows
+
+    params, filtros = {'inicio': _format_datetime(inicio), 'fim': _format_datetime(fim)}, []
+    if medico_id is not None:
+        params['medico_id'] = medico_id
+        filtros.append('medico')
+    if status:
+        params['status'] = status
+        filtros.append('status')
+
+    cursor = run(conn, 'consultas.calendario', params, filtros)
+    colunas = [col[0] for col in cursor.description]
+    rows = [dict(zip(colunas, row)) for row in cursor]
+    calendar_cache.put(banco, key, versao, rows)
+    return rows
@@ -0,0 +1,392 @@
+"""
+Alertas de estoque e vencimento com outbox durável e entrega em lotes
+
+Um ciclo de avaliação aplica as regras (estoque baixo, previsão de ruptura e
+vencimento) com uma consulta agregada por regra e compara o resultado com os
+alertas já ativos: só condições novas geram mensagens, e uma condição que
+desaparece pode alertar de novo no futuro. As mensagens vão para a tabela
+alertas_outbox (uma linha por destino) e são entregues em lotes por e-mail
+ou webhook, com novas tentativas e backoff exponencial.
+"""
+
+import json
+import os
+import smtplib
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from medstock360.datas import SEGUNDOS_DIA
+from medstock360.vencimentos import FAIXA_ATE_30_DIAS, get_faixa_label
+
+# Regras (mesmos limites das telas de estoque e análise preditiva)
+ESTOQUE_BAIXO_LIMITE = 10
+RUPTURA_CRITICA_DIAS = 7
+RUPTURA_ATENCAO_DIAS = 15
+CONSUMO_JANELA_DIAS = 30
+
+# Entrega
+ALERT_INTERVAL_SECONDS = int(os.getenv('ALERT_INTERVAL_SECONDS', '300'))
+ALERT_BATCH_SIZE = int(os.getenv('ALERT_BATCH_SIZE', '100'))
+ALERT_MAX_ATTEMPTS = int(os.getenv('ALERT_MAX_ATTEMPTS', '6'))
+ALERT_RETRY_BASE_SECONDS = 30
+ALERT_RETRY_MAX_SECONDS = 3600
+ALERT_LEASE_SECONDS = 120
+
+
+def init_alert_schema(cursor):
+    """Criar as tabelas de alertas ativos e da outbox"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alertas_ativos (
+            chave TEXT PRIMARY KEY,
+            tipo TEXT NOT NULL,
+            severidade TEXT NOT NULL,
+            medicamento_id INTEGER,
+            lote_id INTEGER,
+            mensagem TEXT NOT NULL,
+            desde TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alertas_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chave TEXT NOT NULL,
+            destino TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            severidade TEXT NOT NULL,
+            mensagem TEXT NOT NULL,
+            payload TEXT,
+            status TEXT DEFAULT 'pendente',
+            tentativas INTEGER DEFAULT 0,
+            proxima_tentativa TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ultimo_erro TEXT,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            enviado_em TIMESTAMP,
+            UNIQUE (chave, destino, criado_em)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_alertas_outbox_fila
+        ON alertas_outbox (status, destino, proxima_tentativa)
+    """)
+
+
+# ---------------------------------------------------------------------------
+# Avaliação das regras
+# ---------------------------------------------------------------------------
+
+def _eval_estoque_baixo(conn):
+    """Medicamentos ativos com estoque total em lotes ativos até o limite"""
+    rows = conn.execute("""
+        SELECT m.id, m.nome, COALESCE(SUM(l.quantidade_atual), 0) as estoque
+        FROM medicamentos m
+        LEFT JOIN lotes l ON l.medicamento_id = m.id AND l.ativo = 1
+        WHERE m.ativo = 1
+        GROUP BY m.id
+        HAVING estoque <= ?
+    """, (ESTOQUE_BAIXO_LIMITE,)).fetchall()
+
+    alertas = {}
+    for medicamento_id, nome, estoque in rows:
+        if estoque == 0:
+            nivel, severidade, mensagem = 'zerado', 'critico', f"{nome}: sem estoque"
+        else:
+            nivel, severidade, mensagem = 'baixo', 'atencao', f"{nome}: estoque baixo ({estoque} unidades)"
+        alertas[f"estoque_baixo:{medicamento_id}:{nivel}"] = {
+            'tipo': 'estoque_baixo', 'severidade': severidade,
+            'medicamento_id': medicamento_id, 'lote_id': None, 'mensagem': mensagem,
+            'dados': {'estoque': estoque}
+        }
+    return alertas
+
+
+def _eval_ruptura(conn):
+    """Previsão de ruptura pelo consumo médio diário dos últimos 30 dias"""
+    rows = conn.execute(f"""
+        WITH consumo AS (
+            SELECT
+                l.medicamento_id,
+                SUM(mov.quantidade) * 1.0 / COUNT(DISTINCT mov.data_movimento_ts / {SEGUNDOS_DIA}) as consumo_medio
+            FROM movimentacoes mov
+            JOIN lotes l ON mov.lote_id = l.id
+            WHERE mov.tipo_movimento = 'Saída'
+            AND mov.data_movimento_ts >= unixepoch('now', 'start of day', ?)
+            GROUP BY l.medicamento_id
+        ),
+        estoque AS (
+            SELECT medicamento_id, SUM(quantidade_atual) as estoque
+            FROM lotes
+            WHERE ativo = 1 AND quantidade_atual > 0
+            GROUP BY medicamento_id
+        )
+        SELECT m.id, m.nome, e.estoque, c.consumo_medio, e.estoque / c.consumo_medio as dias
+        FROM consumo c
+        JOIN estoque e ON e.medicamento_id = c.medicamento_id
+        JOIN medicamentos m ON m.id = c.medicamento_id
+        WHERE m.ativo = 1 AND c.consumo_medio > 0
+        AND e.estoque / c.consumo_medio < ?
+    """, (f"-{CONSUMO_JANELA_DIAS} days", RUPTURA_ATENCAO_DIAS)).fetchall()
+
+    alertas = {}
+    for medicamento_id, nome, estoque, consumo_medio, dias in rows:
+        if dias < RUPTURA_CRITICA_DIAS:
+            nivel, severidade = 'critico', 'critico'
+        else:
+            nivel, severidade = 'atencao', 'atencao'
+        alertas[f"ruptura:{medicamento_id}:{nivel}"] = {
+            'tipo': 'ruptura', 'severidade': severidade,
+            'medicamento_id': medicamento_id, 'lote_id': None,
+            'mensagem': f"{nome}: estoque acaba em {int(dias)} dias ({consumo_medio:.1f} unidades/dia)",
+            'dados': {'estoque': estoque, 'consumo_medio_diario': round(consumo_medio, 2), 'dias': int(dias)}
+        }
+    return alertas
+
+
+def _eval_vencimento(conn):
+    """Lotes com estoque vencidos ou a vencer em até 30 dias (faixas pré-calculadas)"""
+    rows = conn.execute("""
+        SELECT v.lote_id, v.medicamento_id, m.nome, l.numero_lote, v.data_validade,
+               v.faixa, v.quantidade_atual, v.valor_em_risco
+        FROM lotes_vencimento v
+        JOIN lotes l ON l.id = v.lote_id
+        JOIN medicamentos m ON m.id = v.medicamento_id
+        WHERE v.faixa <= ? AND v.quantidade_atual > 0 AND m.ativo = 1
+    """, (FAIXA_ATE_30_DIAS,)).fetchall()
+
+    alertas = {}
+    for lote_id, medicamento_id, nome, numero_lote, validade, faixa, quantidade, valor in rows:
+        alertas[f"vencimento:{lote_id}:{faixa}"] = {
+            'tipo': 'vencimento', 'severidade': 'critico' if faixa == 0 else 'atencao',
+            'medicamento_id': medicamento_id, 'lote_id': lote_id,
+            'mensagem': f"{nome} lote {numero_lote}: {get_faixa_label(faixa)} "
+                        f"(validade {validade}, {quantidade} unidades, R$ {valor:,.2f} em risco)",
+            'dados': {'validade': validade, 'quantidade': quantidade, 'valor_em_risco': valor}
+        }
+    return alertas
+
+
+ALERT_RULES = [_eval_estoque_baixo, _eval_ruptura, _eval_vencimento]
+
+
+def get_alert_targets():
+    """Destinos de entrega configurados por variáveis de ambiente"""
+    targets = {}
+    if os.getenv('SMTP_SERVER') and os.getenv('ALERT_EMAIL_TO'):
+        targets['email'] = EmailTarget(
+            host=os.getenv('SMTP_SERVER'),
+            port=int(os.getenv('SMTP_PORT', '587')),
+            username=os.getenv('SMTP_USERNAME'),
+            password=os.getenv('SMTP_PASSWORD'),
+            sender=os.getenv('ALERT_EMAIL_FROM', os.getenv('SMTP_USERNAME', 'medstock360@localhost')),
+            recipients=[r.strip() for r in os.getenv('ALERT_EMAIL_TO').split(',') if r.strip()],
+            use_tls=os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+        )
+    if os.getenv('ALERT_WEBHOOK_URL'):
+        targets['webhook'] = WebhookTarget(os.getenv('ALERT_WEBHOOK_URL'))
+    return targets
+
+
+def evaluate_alerts(conn, destinos):
+    """
+    Avaliar as regras e gravar os alertas novos na outbox
+
+    Retorna (novos, resolvidos). Alertas que continuam ativos não geram
+    novas mensagens.
+    """
+    atuais = {}
+    for rule in ALERT_RULES:
+        atuais.update(rule(conn))
+
+    # Serializar ciclos concorrentes (vários processos) no mesmo banco
+    conn.execute("BEGIN IMMEDIATE")
+    ativos = {row[0] for row in conn.execute("SELECT chave FROM alertas_ativos")}
+    novos = [chave for chave in atuais if chave not in ativos]
+    resolvidos = [chave for chave in ativos if chave not in atuais]
+
+    agora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cursor = conn.cursor()
+    cursor.executemany("DELETE FROM alertas_ativos WHERE chave = ?", [(c,) for c in resolvidos])
+    cursor.executemany("""
+        INSERT INTO alertas_ativos (chave, tipo, severidade, medicamento_id, lote_id, mensagem, desde)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (c, atuais[c]['tipo'], atuais[c]['severidade'], atuais[c]['medicamento_id'],
+         atuais[c]['lote_id'], atuais[c]['mensagem'], agora)
+        for c in novos
+    ])
+    cursor.executemany("""
+        INSERT OR IGNORE INTO alertas_outbox (chave, destino, tipo, severidade, mensagem, payload, criado_em, proxima_tentativa)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (c, destino, atuais[c]['tipo'], atuais[c]['severidade'], atuais[c]['mensagem'],
+         json.dumps(atuais[c], ensure_ascii=False, default=str), agora, agora)
+        for c in novos for destino in destinos
+    ])
+    conn.commit()
+    return novos, resolvidos
+
+
+# ---------------------------------------------------------------------------
+# Entrega
+# ---------------------------------------------------------------------------
+
+class EmailTarget:
+    """Entrega um resumo com todos os alertas do lote em um único e-mail"""
+
+    def __init__(self, host, port, recipients, sender, username=None, password=None, use_tls=True, timeout=10):
+        self.host = host
+        self.port = port
+        self.recipients = recipients
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send(self, alertas):
+        criticos = sum(1 for a in alertas if a['severidade'] == 'critico')
+        msg = EmailMessage()
+        msg['Subject'] = f"[MedStock360] {len(alertas)} alerta(s), {criticos} crítico(s)"
+        msg['From'] = self.sender
+        msg['To'] = ", ".join(self.recipients)
+        msg.set_content("\n".join(
+            f"{'🚨' if a['severidade'] == 'critico' else '⚠️'} {a['mensagem']}" for a in alertas
+        ))
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+            smtp.send_message(msg)
+
+
+class WebhookTarget:
+    """Entrega o lote de alertas como um único POST JSON"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alertas):
+        body = json.dumps({'alertas': alertas}, ensure_ascii=False, default=str).encode('utf-8')
+        request = urllib.request.Request(
+            self.url, data=body, method='POST',
+            headers={'Content-Type': 'application/json; charset=utf-8'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"Webhook respondeu {response.status}")
+
+
+def _retry_delay(tentativas):
+    """Backoff exponencial para a próxima tentativa"""
+    return min(ALERT_RETRY_BASE_SECONDS * 2 ** (tentativas - 1), ALERT_RETRY_MAX_SECONDS)
+
+
+def dispatch_alerts(conn, targets, batch_size=ALERT_BATCH_SIZE, agora=None):
+    """
+    Entregar os alertas pendentes da outbox em lotes por destino
+
+    Cada lote é reservado por ALERT_LEASE_SECONDS antes do envio, de modo que
+    uma falha no meio do caminho só adia a entrega (entrega pelo menos uma vez).
+    A reserva (leitura e atualização) roda em BEGIN IMMEDIATE, como em
+    tarefas.claim_next_job: o despachante de outro processo não reserva o
+    mesmo lote. Retorna o número de alertas entregues.
+    """
+    agora = agora or datetime.now()
+    entregues = 0
+    for destino, target in targets.items():
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute("""
+                    SELECT id, tentativas, payload FROM alertas_outbox
+                    WHERE status = 'pendente' AND destino = ? AND proxima_tentativa <= ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (destino, agora.strftime('%Y-%m-%d %H:%M:%S'), batch_size)).fetchall()
+                ids = [row[0] for row in rows]
+                lease = (agora + timedelta(seconds=ALERT_LEASE_SECONDS)).strftime('%Y-%m-%d %H:%M:%S')
+                conn.executemany("UPDATE alertas_outbox SET proxima_tentativa = ? WHERE id = ?",
+                                 [(lease, i) for i in ids])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            if not rows:
+                break
+
+            try:
+                target.send([json.loads(row[2]) for row in rows])
+            except Exception as e:
+                updates = []
+                for alerta_id, tentativas, _ in rows:
+                    tentativas += 1
+                    status = 'falhou' if tentativas >= ALERT_MAX_ATTEMPTS else 'pendente'
+                    proxima = agora + timedelta(seconds=_retry_delay(tentativas))
+                    updates.append((status, tentativas, proxima.strftime('%Y-%m-%d %H:%M:%S'), str(e)[:500], alerta_id))
+                conn.executemany("""
+                    UPDATE alertas_outbox
+                    SET status = ?, tentativas = ?, proxima_tentativa = ?, ultimo_erro = ?
+                    WHERE id = ?
+                """, updates)
+                conn.commit()
+                break
+
+            conn.executemany("""
+                UPDATE alertas_outbox
+                SET status = 'enviado', tentativas = tentativas + 1, enviado_em = ?, ultimo_erro = NULL
+                WHERE id = ?
+            """, [(agora.strftime('%Y-%m-%d %H:%M:%S'), i) for i in ids])
+            conn.commit()
+            entregues += len(ids)
+    return entregues
+
+
+def run_alert_cycle(conn, targets=None):
+    """Um ciclo completo: avaliar regras e entregar a outbox"""
+    targets = get_alert_targets() if targets is None else targets
+    novos, resolvidos = evaluate_alerts(conn, list(targets))
+    entregues = dispatch_alerts(conn, targets)
+    return {'novos': len(novos), 'resolvidos': len(resolvidos), 'entregues': entregues}
+
+
+class AlertWorker(threading.Thread):
+    """Thread que executa um ciclo de alertas a cada ALERT_INTERVAL_SECONDS"""
+
+    def __init__(self, db_manager, interval=ALERT_INTERVAL_SECONDS):
+        super().__init__(name="medstock360-alertas", daemon=True)
+        self.db = db_manager
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            conn = self.db.get_connection()
+            try:
+                run_alert_cycle(conn)
+            except Exception as e:
+                print(f"[alertas] Erro no ciclo de alertas: {e}")
+            finally:
+                conn.close()
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# Um ciclo por banco (unidade) no processo
+_workers = {}
+_worker_lock = threading.Lock()
+
+
+def start_alert_worker(db_manager):
+    """Iniciar (uma vez por processo e banco) o ciclo periódico de alertas"""
+    with _worker_lock:
+        worker = _workers.get(db_manager.db_path)
+        if worker is None or not worker.is_alive():
+            worker = _workers[db_manager.db_path] = AlertWorker(db_manager)
+            worker.start()
+    return worker
@@ -0,0 +1,158 @@
+"""
+Aquecimento na inicialização e sinal de prontidão
+
+Antes do Streamlit abrir a porta (python -m medstock360.aquecimento &&
+streamlit run app.py), warm_up cria/migra o banco, atualiza as estatísticas
+do planejador (ANALYZE na primeira vez, PRAGMA optimize depois), recalcula
+as faixas de vencimento se estiverem velhas, lê as tabelas de referência e
+os índices quentes (cache de páginas do sistema operacional) de cada
+unidade, pré-calcula os relatórios padrão que estiverem velhos, calcula as
+chaves de bloqueio dos pacientes pendentes (duplicados), importa os
+módulos das páginas e retoma as transferências entre unidades que ficaram
+pela metade. Como o endpoint /_stcore/health do
+Streamlit só responde depois disso, o healthcheck do Railway só libera
+tráfego para uma instância aquecida; uma falha no aquecimento impede o
+deploy.
+
+Dentro do processo do Streamlit, start_warm_up repete o aquecimento em
+segundo plano na primeira sessão (pandas/plotly importados enquanto o
+usuário ainda está na tela de login).
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+
+from medstock360.duplicados import refresh_patient_keys
+from medstock360.instantaneos import refresh_snapshots, stale_snapshots
+from medstock360.transferencias import recover_transfers
+from medstock360.unidades import get_shard_router
+from medstock360.vencimentos import expiry_buckets_stale, refresh_expiry_buckets
+
+# Tabelas pequenas lidas por quase todas as telas
+TABELAS_REFERENCIA = ['usuarios', 'medicamentos', 'lotes', 'lotes_vencimento', 'alertas_ativos',
+                      'medicos_horarios']
+
+# Tabelas cujos índices são usados pelas telas mais acessadas
+TABELAS_INDICES_QUENTES = ['usuarios', 'pacientes', 'lotes', 'lotes_vencimento', 'consultas',
+                           'alertas_ativos', 'medicos_horarios']
+
+# Limite de linhas amostradas por índice no ANALYZE (bancos grandes)
+ANALYSIS_LIMIT = 1000
+
+# Estado do aquecimento neste processo
+estado_aquecimento = {'pronto': False, 'etapas': {}, 'erro': None, 'concluido_em': None}
+
+
+def _touch_indexes(conn):
+    """Percorrer os índices das tabelas quentes (traz as páginas para o cache)"""
+    marcadores = ", ".join("?" for _ in TABELAS_INDICES_QUENTES)
+    indices = conn.execute(f"""
+        SELECT name, tbl_name FROM sqlite_master
+        WHERE type = 'index' AND tbl_name IN ({marcadores})
+    """, TABELAS_INDICES_QUENTES).fetchall()
+    for indice, tabela in indices:
+        conn.execute(f"SELECT COUNT(*) FROM {tabela} INDEXED BY {indice}").fetchone()
+    return len(indices)
+
+
+def _update_statistics(conn):
+    """ANALYZE se o banco nunca foi analisado; senão PRAGMA optimize"""
+    conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    analisado = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    conn.execute("PRAGMA optimize" if analisado else "ANALYZE")
+    conn.commit()
+
+
+def _import_pages():
+    """Importar os módulos de todas as páginas (pandas, plotly, ...)"""
+    from medstock360.paginas import PAGINAS, load_page
+
+    for pagina in PAGINAS.values():
+        load_page(pagina['modulo'], pagina['funcao'])
+    return len(PAGINAS)
+
+
+def warm_up(db_manager=None, importar_paginas=True):
+    """Aquecer banco e módulos; retorna {etapa: ms} e marca o processo como pronto"""
+    etapas = {}
+
+    def etapa(nome, funcao, *args):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        etapas[nome] = (time.perf_counter() - inicio) * 1000
+        return resultado
+
+    try:
+        # Criar o arquivo e aplicar as migrações (uma vez por processo)
+        db_manager = etapa('migracoes', lambda: db_manager or get_shard_router().principal)
+
+        conn = db_manager.get_connection()
+        try:
+            etapa('estatisticas', _update_statistics, conn)
+            etapa('vencimentos', lambda: expiry_buckets_stale(conn) and refresh_expiry_buckets(conn))
+            etapa('referencia', lambda: [
+                conn.execute(f"SELECT * FROM {tabela}").fetchall() for tabela in TABELAS_REFERENCIA
+            ])
+            etapa('indices', _touch_indexes, conn)
+            etapa('relatorios', lambda: refresh_snapshots(conn, stale_snapshots(conn)))
+            etapa('duplicados', refresh_patient_keys, conn)
+        finally:
+            conn.close()
+
+        if importar_paginas:
+            etapa('paginas', _import_pages)
+    except (sqlite3.Error, ImportError) as e:
+        estado_aquecimento.update(pronto=False, etapas=etapas, erro=str(e))
+        raise
+
+    estado_aquecimento.update(pronto=True, etapas=etapas, erro=None, concluido_em=time.time())
+    return etapas
+
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def start_warm_up(db_manager):
+    """Aquecer (uma vez por processo) em segundo plano"""
+    global _thread
+
+    def run():
+        try:
+            warm_up(db_manager)
+        except Exception as e:
+            print(f"[aquecimento] Erro ao aquecer: {e}")
+
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=run, name="medstock360-aquecimento", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def main():
+    """Aquecer antes de iniciar o servidor; código de saída 1 em caso de falha"""
+    inicio = time.perf_counter()
+    router = get_shard_router()
+    try:
+        for i, (unidade, db_manager) in enumerate(router.managers().items()):
+            etapas = warm_up(db_manager, importar_paginas=i == 0)
+            detalhes = ", ".join(f"{nome} {ms:.0f} ms" for nome, ms in etapas.items())
+            print(f"[aquecimento] {unidade}: {detalhes}")
+        if router.multi_unidade:
+            resultado = recover_transfers(router)
+            print(f"[aquecimento] Transferências: {resultado['concluidas']} concluídas, "
+                  f"{resultado['desfeitas']} desfeitas")
+    except Exception as e:
+        print(f"[aquecimento] ❌ Falha: {e}")
+        return 1
+    print(f"[aquecimento] ✅ Pronto em {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Arquivamento de dados frios em bancos anuais anexados
+
+Movimentações, consultas encerradas e receitas encerradas (com seus itens)
+mais antigas que ARCHIVE_AFTER_DAYS saem do banco principal e vão para um
+banco SQLite por ano (arquivo/medstock360_<ano>.db). As tabelas vivas
+ficam pequenas; o histórico completo é lido sob demanda com ATTACH e views
+temporárias historico_<tabela> (UNION ALL do banco principal e dos anos).
+
+Anos encerrados são compactados (VACUUM) e gravados somente leitura, ou
+comprimidos em .db.gz quando ARCHIVE_COMPRESS=true; nesse caso a leitura
+descomprime o ano uma vez para um cache local.
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import stat
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from medstock360.auditoria import audit_event
+from medstock360.datas import generated_columns
+from medstock360.desempenho import InstrumentedConnection
+
+ARCHIVE_ENABLED = os.getenv('ARCHIVE_ENABLED', 'false').lower() == 'true'
+ARCHIVE_AFTER_DAYS = max(int(os.getenv('ARCHIVE_AFTER_DAYS', '730')), 90)
+ARCHIVE_COMPRESS = os.getenv('ARCHIVE_COMPRESS', 'false').lower() == 'true'
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR')
+
+# SQLite anexa no máximo 10 bancos: o principal + 9 anos
+MAX_ANOS_ANEXADOS = 9
+
+# Tabelas arquivadas: coluna de data e condição de registro encerrado
+TABELAS_ARQUIVADAS = {
+    'movimentacoes': {'coluna_data': 'data_movimento', 'condicao': '1 = 1'},
+    'consultas': {'coluna_data': 'data_consulta', 'condicao': "status IN ('Concluída', 'Cancelada')"},
+    'receitas': {'coluna_data': 'data_emissao', 'condicao': "status IN ('Dispensada', 'Cancelada')"},
+}
+
+# Tabelas filhas movidas junto com o registro pai
+TABELAS_FILHAS = {
+    'receitas': [('receita_itens', 'receita_id')],
+}
+
+
+def archive_dir(db_path):
+    """Pasta dos bancos anuais (ARCHIVE_DIR ou 'arquivo' ao lado do banco)"""
+    return Path(ARCHIVE_DIR) if ARCHIVE_DIR else Path(db_path).resolve().parent / "arquivo"
+
+
+def _archive_path(pasta, ano):
+    return pasta / f"medstock360_{ano}.db"
+
+
+def list_archive_years(db_path):
+    """Anos com banco de arquivo (comprimido ou não), em ordem crescente"""
+    pasta = archive_dir(db_path)
+    if not pasta.exists():
+        return []
+    anos = set()
+    for path in pasta.glob("medstock360_*.db*"):
+        sufixo = path.name[len("medstock360_"):].split('.')[0]
+        if sufixo.isdigit():
+            anos.add(int(sufixo))
+    return sorted(anos)
+
+
+def _columns(conn, schema, tabela):
+    """Colunas da tabela no schema informado"""
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({tabela})")]
+
+
+def _sync_archive_table(conn, schema, tabela):
+    """Criar a tabela no arquivo ou acrescentar colunas novas do banco principal"""
+    colunas_main = _columns(conn, 'main', tabela)
+    colunas_arq = _columns(conn, schema, tabela)
+    if not colunas_arq:
+        # Só as colunas gravadas (as geradas são recalculadas na leitura do histórico)
+        conn.execute(f"CREATE TABLE {schema}.{tabela} AS SELECT {', '.join(colunas_main)} FROM main.{tabela} WHERE 0")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_{tabela}_id ON {tabela} (id)")
+        return colunas_main
+    for coluna in colunas_main:
+        if coluna not in colunas_arq:
+            conn.execute(f"ALTER TABLE {schema}.{tabela} ADD COLUMN {coluna}")
+    return colunas_main
+
+
+def _set_writable(path, writable):
+    """Alternar a permissão de escrita do arquivo"""
+    modo = path.stat().st_mode
+    if writable:
+        path.chmod(modo | stat.S_IWUSR)
+    else:
+        path.chmod(modo & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _open_year_for_write(pasta, ano):
+    """Caminho gravável do banco do ano (descomprime se necessário)"""
+    path = _archive_path(pasta, ano)
+    comprimido = path.with_name(path.name + ".gz")
+    if not path.exists() and comprimido.exists():
+        with gzip.open(comprimido, 'rb') as origem, open(path, 'wb') as destino:
+            shutil.copyfileobj(origem, destino)
+        comprimido.unlink()
+    if path.exists():
+        _set_writable(path, True)
+    return path
+
+
+def _finalize_year(path, compress):
+    """Compactar o ano encerrado e deixá-lo somente leitura (ou comprimido)"""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    if compress:
+        with open(path, 'rb') as origem, gzip.open(path.with_name(path.name + ".gz"), 'wb') as destino:
+            shutil.copyfileobj(origem, destino)
+        path.unlink()
+    else:
+        _set_writable(path, False)
+
+
+def archive_old_records(db_path, dias=ARCHIVE_AFTER_DAYS, hoje=None, compress=ARCHIVE_COMPRESS):
+    """
+    Mover os registros mais antigos que `dias` para os bancos anuais
+
+    Cada ano é movido em uma transação que abrange o banco principal e o
+    banco do ano (INSERT no arquivo + DELETE no principal). Retorna
+    {(tabela, ano): linhas movidas}.
+    """
+    hoje = hoje or date.today()
+    corte = (hoje - timedelta(days=dias)).isoformat()
+    pasta = archive_dir(db_path)
+    pasta.mkdir(parents=True, exist_ok=True)
+
+    movidos = {}
+    conn = sqlite3.connect(db_path, factory=InstrumentedConnection)
+    try:
+        anos = set()
+        for tabela, cfg in TABELAS_ARQUIVADAS.items():
+            anos.update(int(row[0]) for row in conn.execute(f"""
+                SELECT DISTINCT strftime('%Y', {cfg['coluna_data']}) FROM {tabela}
+                WHERE {cfg['condicao']} AND {cfg['coluna_data']} < ?
+            """, (corte,)) if row[0])
+
+        for ano in sorted(anos):
+            path = _open_year_for_write(pasta, ano)
+            conn.execute("ATTACH DATABASE ? AS arq", (str(path),))
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for tabela, cfg in TABELAS_ARQUIVADAS.items():
+                    filtro = f"""
+                        {cfg['condicao']} AND {cfg['coluna_data']} < ?
+                        AND {cfg['coluna_data']} >= ? AND {cfg['coluna_data']} < ?
+                    """
+                    params = (corte, f"{ano}-01-01", f"{ano + 1}-01-01")
+
+                    for filha, chave in TABELAS_FILHAS.get(tabela, []):
+                        colunas = ", ".join(_sync_archive_table(conn, 'arq', filha))
+                        pais = f"SELECT id FROM main.{tabela} WHERE {filtro}"
+                        conn.execute(f"""
+                            INSERT INTO arq.{filha} ({colunas})
+                            SELECT {colunas} FROM main.{filha} WHERE {chave} IN ({pais})
+                        """, params)
+                        conn.execute(f"DELETE FROM main.{filha} WHERE {chave} IN ({pais})", params)
+
+                    colunas = ", ".join(_sync_archive_table(conn, 'arq', tabela))
+                    cursor = conn.execute(f"""
+                        INSERT INTO arq.{tabela} ({colunas})
+                        SELECT {colunas} FROM main.{tabela} WHERE {filtro}
+                    """, params)
+                    if cursor.rowcount:
+                        movidos[(tabela, ano)] = cursor.rowcount
+                    conn.execute(f"DELETE FROM main.{tabela} WHERE {filtro}", params)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute("DETACH DATABASE arq")
+    finally:
+        conn.close()
+
+    # Anos inteiros antes do corte não recebem mais registros
+    for ano in list_archive_years(db_path):
+        path = _archive_path(pasta, ano)
+        if f"{ano + 1}-01-01" <= corte and path.exists() and (compress or path.stat().st_mode & stat.S_IWUSR):
+            _finalize_year(path, compress)
+
+    for (tabela, ano), linhas in movidos.items():
+        audit_event(None, 'arquivar', tabela, depois={'ano': ano, 'linhas': linhas})
+    return movidos
+
+
+def _readable_year_path(pasta, ano):
+    """Caminho legível do banco do ano (descomprime para o cache se preciso)"""
+    path = _archive_path(pasta, ano)
+    if path.exists():
+        return path
+    comprimido = path.with_name(path.name + ".gz")
+    if not comprimido.exists():
+        return None
+    cache = Path(tempfile.gettempdir()) / "medstock360_arquivo_cache"
+    cache.mkdir(exist_ok=True)
+    destino = cache / path.name
+    if not destino.exists() or destino.stat().st_mtime < comprimido.stat().st_mtime:
+        temporario = destino.with_suffix(".tmp")
+        with gzip.open(comprimido, 'rb') as origem, open(temporario, 'wb') as saida:
+            shutil.copyfileobj(origem, saida)
+        temporario.replace(destino)
+    return destino
+
+
+def get_history_connection(db_path, inicio=None, fim=None):
+    """
+    Conexão com o histórico completo para relatórios
+
+    Anexa (somente leitura) os anos de arquivo entre inicio e fim, no máximo
+    MAX_ANOS_ANEXADOS (os mais recentes), e cria as views temporárias
+    historico_<tabela>. Retorna (conexão, anos anexados).
+    """
+    pasta = archive_dir(db_path)
+    anos = [
+        ano for ano in list_archive_years(db_path)
+        if (inicio is None or ano >= inicio.year) and (fim is None or ano <= fim.year)
+    ][-MAX_ANOS_ANEXADOS:]
+
+    conn = sqlite3.connect(db_path, uri=True, factory=InstrumentedConnection)
+    anexados = []
+    for ano in anos:
+        path = _readable_year_path(pasta, ano)
+        if path is not None:
+            conn.execute("ATTACH DATABASE ? AS ?", (f"{path.resolve().as_uri()}?mode=ro", f"arq_{ano}"))
+            anexados.append(ano)
+
+    for tabela in list(TABELAS_ARQUIVADAS) + [f for filhas in TABELAS_FILHAS.values() for f, _ in filhas]:
+        colunas = _columns(conn, 'main', tabela)
+        # Colunas inteiras geradas: lidas do banco principal, calculadas nos arquivos
+        geradas = generated_columns(tabela)
+        partes = [f"SELECT {', '.join(colunas + [nome for nome, _ in geradas])} FROM main.{tabela}"]
+        for ano in anexados:
+            colunas_ano = set(_columns(conn, f"arq_{ano}", tabela))
+            if colunas_ano:
+                selecao = ", ".join([c if c in colunas_ano else f"NULL AS {c}" for c in colunas]
+                                    + [f"{expressao} AS {nome}" for nome, expressao in geradas])
+                partes.append(f"SELECT {selecao} FROM arq_{ano}.{tabela}")
+        conn.execute(f"CREATE TEMP VIEW historico_{tabela} AS " + " UNION ALL ".join(partes))
+    return conn, anexados
+
+
+class ArchiveScheduler(threading.Thread):
+    """Thread que arquiva os registros antigos uma vez por dia"""
+
+    def __init__(self, db_manager):
+        super().__init__(name="medstock360-arquivamento", daemon=True)
+        self.db = db_manager
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            # Rodar às 2h, fora do horário de uso
+            proxima = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=2)
+            if proxima <= datetime.now():
+                proxima += timedelta(days=1)
+            if self._stop_event.wait((proxima - datetime.now()).total_seconds()):
+                return
+            try:
+                archive_old_records(self.db.db_path)
+            except Exception as e:
+                print(f"[arquivamento] Erro ao arquivar registros: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# Um agendador por banco (unidade) no processo
+_schedulers = {}
+_scheduler_lock = threading.Lock()
+
+
+def start_archive_scheduler(db_manager):
+    """Iniciar (uma vez por processo e banco, se ARCHIVE_ENABLED) o arquivamento diário"""
+    if not ARCHIVE_ENABLED:
+        return None
+    with _scheduler_lock:
+        scheduler = _schedulers.get(db_manager.db_path)
+        if scheduler is None or not scheduler.is_alive():
+            scheduler = _schedulers[db_manager.db_path] = ArchiveScheduler(db_manager)
+            scheduler.start()
+    return scheduler
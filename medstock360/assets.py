@@ -0,0 +1,131 @@
+"""Recursos visuais compartilhados (CSS) pré-compilados uma vez por processo"""
+
+import re
+
+import streamlit as st
+
+# CSS personalizado otimizado para Railway
+CSS = """
+<style>
+    .main-header {
+        background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%);
+        padding: 1rem;
+        border-radius: 10px;
+        text-align: center;
+        color: white;
+        margin-bottom: 2rem;
+    }
+    .cloud-badge {
+        background: linear-gradient(45deg, #00c851, #007e33);
+        color: white;
+        padding: 0.3rem 0.8rem;
+        border-radius: 20px;
+        font-size: 0.8rem;
+        display: inline-block;
+        margin-left: 10px;
+    }
+    .user-info {
+        background: #f0f2f6;
+        padding: 0.5rem;
+        border-radius: 5px;
+        margin-bottom: 1rem;
+    }
+    .metric-card {
+        background: white;
+        padding: 1rem;
+        border-radius: 10px;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        text-align: center;
+    }
+    .alert-danger {
+        background-color: #f8d7da;
+        border-color: #f5c6cb;
+        color: #721c24;
+        padding: 1rem;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    .alert-warning {
+        background-color: #fff3cd;
+        border-color: #ffeaa7;
+        color: #856404;
+        padding: 1rem;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    .alert-success {
+        background-color: #d4edda;
+        border-color: #c3e6cb;
+        color: #155724;
+        padding: 1rem;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    .cloud-info {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        padding: 1rem;
+        border-radius: 10px;
+        margin: 1rem 0;
+        text-align: center;
+    }
+    .agenda-grid {
+        overflow-x: auto;
+        margin: 1rem 0;
+    }
+    .agenda-grid table {
+        border-collapse: collapse;
+        font-size: 0.8rem;
+        width: 100%;
+    }
+    .agenda-grid th, .agenda-grid td {
+        border: 1px solid #e6e9ef;
+        padding: 0.25rem;
+        vertical-align: top;
+        min-width: 3.5rem;
+    }
+    .agenda-grid thead th {
+        background: #f0f2f6;
+        text-align: center;
+    }
+    .agenda-grid tbody th {
+        background: #f8f9fb;
+        text-align: left;
+        white-space: nowrap;
+    }
+    .agenda-grid th.agenda-hoje {
+        background: #2a5298;
+        color: white;
+    }
+    .agenda-item {
+        display: block;
+        margin: 1px 0;
+        padding: 1px 4px;
+        border-radius: 4px;
+        white-space: nowrap;
+        overflow: hidden;
+        text-overflow: ellipsis;
+    }
+    .agenda-agendada { background: #fff3cd; }
+    .agenda-confirmada { background: #d4edda; }
+    .agenda-andamento { background: #cce5ff; }
+    .agenda-concluida { background: #e2e3e5; }
+    .agenda-cancelada { background: #f8d7da; text-decoration: line-through; }
+</style>
+"""
+
+
+def _minify_css(css):
+    """Remover espaços e quebras de linha desnecessários do CSS"""
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+# Markup compilado na importação do módulo (uma vez por processo)
+CSS_MARKUP = _minify_css(CSS)
+
+
+def inject_css():
+    """Injetar o CSS pré-compilado na página"""
+    st.markdown(CSS_MARKUP, unsafe_allow_html=True)
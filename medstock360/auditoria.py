@@ -0,0 +1,233 @@
+"""
+Log de auditoria somente inclusão, gravado em lotes e encadeado por hash
+
+As ações sensíveis chamam audit_event, que apenas acrescenta o evento a um
+buffer em memória (microssegundos no caminho crítico). Uma thread grava o
+buffer em lotes na tabela auditoria: cada linha guarda o hash SHA-256 do
+evento concatenado ao hash da linha anterior, e triggers impedem UPDATE e
+DELETE. Qualquer alteração posterior quebra a cadeia em verify_chain.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv('AUDIT_FLUSH_INTERVAL_SECONDS', '1'))
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '500'))
+
+HASH_INICIAL = '0' * 64
+
+# Eventos ainda não gravados (deque: append/popleft seguros entre threads)
+_buffer = deque()
+_buffer_event = threading.Event()
+
+
+def init_audit_schema(cursor):
+    """Criar a tabela de auditoria, seus índices e as travas de imutabilidade"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS auditoria (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            criado_em TIMESTAMP NOT NULL,
+            usuario_id INTEGER,
+            usuario_nome TEXT,
+            acao TEXT NOT NULL,
+            entidade TEXT NOT NULL,
+            entidade_id INTEGER,
+            antes TEXT,
+            depois TEXT,
+            hash_anterior TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_auditoria_usuario
+        ON auditoria (usuario_id, criado_em)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_auditoria_entidade
+        ON auditoria (entidade, entidade_id, criado_em)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_auditoria_data
+        ON auditoria (criado_em)
+    """)
+    for evento in ('UPDATE', 'DELETE'):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_auditoria_{evento.lower()}
+            BEFORE {evento} ON auditoria
+            BEGIN
+                SELECT RAISE(ABORT, 'O log de auditoria é somente inclusão');
+            END
+        """)
+
+
+def _to_json(valor):
+    """Serializar antes/depois de forma canônica (ou None)"""
+    if valor is None:
+        return None
+    return json.dumps(valor, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _event_hash(hash_anterior, criado_em, usuario_id, usuario_nome, acao, entidade,
+                entidade_id, antes, depois):
+    """Hash SHA-256 do evento encadeado ao hash anterior"""
+    conteudo = json.dumps(
+        [criado_em, usuario_id, usuario_nome, acao, entidade, entidade_id, antes, depois],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(f"{hash_anterior}|{conteudo}".encode()).hexdigest()
+
+
+def audit_event(usuario, acao, entidade, entidade_id=None, antes=None, depois=None):
+    """
+    Registrar uma ação sensível (somente enfileira; a gravação é em lote)
+
+    usuario: dicionário do usuário da sessão (id, nome_completo e, com várias
+    unidades, unidade) ou None
+    antes/depois: valores relevantes antes e depois da ação
+    """
+    nome = usuario.get('nome_completo') if usuario else None
+    if usuario and usuario.get('unidade'):
+        # Os ids de usuário se repetem entre os bancos das unidades
+        nome = f"{nome} ({usuario['unidade']})"
+    _buffer.append((
+        datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        int(usuario['id']) if usuario else None,
+        nome,
+        acao,
+        entidade,
+        int(entidade_id) if entidade_id is not None else None,
+        antes,
+        depois,
+    ))
+    if len(_buffer) >= AUDIT_BATCH_SIZE:
+        _buffer_event.set()
+
+
+def flush_audit_events(conn):
+    """Gravar os eventos pendentes do buffer; retorna quantos foram gravados"""
+    eventos = []
+    while _buffer:
+        try:
+            eventos.append(_buffer.popleft())
+        except IndexError:
+            break
+    if not eventos:
+        return 0
+
+    try:
+        # Reserva de escrita: a cadeia continua correta com vários processos
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT hash FROM auditoria ORDER BY id DESC LIMIT 1").fetchone()
+        hash_anterior = row[0] if row else HASH_INICIAL
+
+        linhas = []
+        for criado_em, usuario_id, usuario_nome, acao, entidade, entidade_id, antes, depois in eventos:
+            antes, depois = _to_json(antes), _to_json(depois)
+            hash_evento = _event_hash(hash_anterior, criado_em, usuario_id, usuario_nome,
+                                      acao, entidade, entidade_id, antes, depois)
+            linhas.append((criado_em, usuario_id, usuario_nome, acao, entidade, entidade_id,
+                           antes, depois, hash_anterior, hash_evento))
+            hash_anterior = hash_evento
+
+        conn.executemany("""
+            INSERT INTO auditoria (
+                criado_em, usuario_id, usuario_nome, acao, entidade, entidade_id,
+                antes, depois, hash_anterior, hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, linhas)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        # Devolver os eventos ao início do buffer para a próxima tentativa
+        _buffer.extendleft(reversed(eventos))
+        raise
+    return len(eventos)
+
+
+def verify_chain(conn, batch_size=5000):
+    """
+    Verificar a cadeia de hashes do log de auditoria
+
+    Retorna (ok, id da primeira linha inválida ou None, linhas verificadas).
+    """
+    hash_anterior = HASH_INICIAL
+    verificadas = 0
+    cursor = conn.execute("""
+        SELECT id, criado_em, usuario_id, usuario_nome, acao, entidade, entidade_id,
+               antes, depois, hash_anterior, hash
+        FROM auditoria ORDER BY id
+    """)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return True, None, verificadas
+        for row in rows:
+            linha_id, dados, anterior, hash_linha = row[0], row[1:9], row[9], row[10]
+            if anterior != hash_anterior or _event_hash(anterior, *dados) != hash_linha:
+                return False, linha_id, verificadas
+            hash_anterior = hash_linha
+            verificadas += 1
+
+
+class AuditWriter(threading.Thread):
+    """Thread que grava o buffer de auditoria em lotes"""
+
+    def __init__(self, db_manager, interval=AUDIT_FLUSH_INTERVAL_SECONDS):
+        super().__init__(name="medstock360-auditoria", daemon=True)
+        self.db = db_manager
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def flush(self):
+        """Gravar agora os eventos pendentes"""
+        if not _buffer:
+            return 0
+        conn = self.db.get_connection()
+        try:
+            return flush_audit_events(conn)
+        finally:
+            conn.close()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            _buffer_event.wait(self.interval)
+            _buffer_event.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[auditoria] Erro ao gravar eventos: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+        _buffer_event.set()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _flush_at_exit():
+    """Gravar os eventos pendentes ao encerrar o processo"""
+    if _writer is not None:
+        try:
+            _writer.flush()
+        except Exception as e:
+            print(f"[auditoria] Erro ao gravar eventos pendentes: {e}")
+
+
+def start_audit_writer(db_manager):
+    """Iniciar (uma vez por processo) a gravação em lote da auditoria"""
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            if _writer is None:
+                atexit.register(_flush_at_exit)
+            _writer = AuditWriter(db_manager)
+            _writer.start()
+    return _writer
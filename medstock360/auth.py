@@ -0,0 +1,77 @@
+"""Autenticação e permissões do MedStock360"""
+
+import hashlib
+
+class AuthManager:
+    """Gerenciador de autenticação"""
+    
+    def __init__(self, db_manager):
+        self.db = db_manager
+    
+    def hash_password(self, password):
+        """Criar hash da senha"""
+        return hashlib.sha256(password.encode()).hexdigest()
+    
+    def verify_password(self, password, password_hash):
+        """Verificar senha"""
+        return self.hash_password(password) == password_hash
+    
+    def authenticate(self, username, password):
+        """Autenticar usuário"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, username, password_hash, nome_completo, perfil, ativo
+            FROM usuarios WHERE username = ? AND ativo = 1
+        """, (username,))
+        
+        user = cursor.fetchone()
+        conn.close()
+        
+        if user and self.verify_password(password, user[2]):
+            return {
+                'id': user[0],
+                'username': user[1],
+                'nome_completo': user[3],
+                'perfil': user[4]
+            }
+        return None
+    
+    def get_user_permissions(self, perfil):
+        """Obter permissões do usuário"""
+        permissions = {
+            'Administrador': {
+                'usuarios': ['criar', 'editar', 'visualizar', 'excluir'],
+                'medicamentos': ['criar', 'editar', 'visualizar', 'excluir'],
+                'estoque': ['criar', 'editar', 'visualizar', 'excluir'],
+                'pacientes': ['criar', 'editar', 'visualizar', 'excluir'],
+                'consultas': ['criar', 'editar', 'visualizar', 'excluir'],
+                'receitas': ['criar', 'editar', 'visualizar', 'excluir'],
+                'relatorios': ['visualizar', 'exportar'],
+                'auditoria': ['visualizar'],
+                'desempenho': ['visualizar']
+            },
+            'Farmacêutico': {
+                'medicamentos': ['criar', 'editar', 'visualizar'],
+                'estoque': ['criar', 'editar', 'visualizar'],
+                'receitas': ['visualizar', 'dispensar'],
+                'pacientes': ['visualizar'],
+                'relatorios': ['visualizar']
+            },
+            'Médico': {
+                'pacientes': ['criar', 'editar', 'visualizar'],
+                'consultas': ['criar', 'editar', 'visualizar'],
+                'receitas': ['criar', 'editar', 'visualizar'],
+                'medicamentos': ['visualizar'],
+                'relatorios': ['visualizar']
+            },
+            'Enfermeiro': {
+                'pacientes': ['visualizar', 'editar'],
+                'consultas': ['visualizar'],
+                'medicamentos': ['visualizar'],
+                'estoque': ['visualizar'],
+                'receitas': ['visualizar']
+            }
+        }
+        return permissions.get(perfil, {})
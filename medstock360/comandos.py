@@ -0,0 +1,399 @@
+"""
+Registro central dos comandos SQL das telas
+
+Cada comando tem um nome ('estoque.lotes'), o texto com parâmetros nomeados
+(:busca) e, quando a tela tem filtros opcionais, um trecho por filtro,
+inserido no lugar de {filtros}. Uma combinação de filtros gera sempre o
+mesmo texto (filtros na ordem da declaração), então as variantes de um
+comando são um conjunto fechado (no máximo 2^filtros) e o cache de
+comandos preparados do sqlite3, que é por conexão e chaveado pelo texto
+(DB_STATEMENT_CACHE), prepara cada variante uma vez por conexão do pool em
+vez de a cada renderização.
+
+read_arrow lê o cursor direto para uma pyarrow.Table, em lotes de
+ARROW_LOTE linhas: as colunas declaradas em tipos viram dicionário
+(categoria: status, local, fornecedor...) ou date32/timestamp (datas em
+TEXT). st.dataframe serializa a Table como está, sem DataFrame de objetos
+no meio.
+
+Os comandos executados por run/read_sql/read_arrow marcam os registros da
+instrumentação com o nome e a variante (desempenho.comando_atual); a página
+de Performance mostra as chamadas por comando, inclusive os que nunca
+rodaram.
+"""
+
+import os
+
+from medstock360.desempenho import comando_atual
+
+# Linhas lidas do cursor por lote em read_arrow
+ARROW_LOTE = int(os.getenv('ARROW_LOTE', '65536'))
+
+# Tipos de coluna declaráveis (as demais têm o tipo inferido dos valores)
+TIPOS_COLUNA = ('categoria', 'data', 'data_hora')
+
+_FILTROS = '{filtros}'
+
+
+class Statement:
+    """Comando SQL nomeado e as variantes dos seus filtros opcionais"""
+
+    def __init__(self, nome, sql, filtros=None, tipos=None):
+        """
+        sql: texto com parâmetros nomeados; com filtros, contém {filtros}
+        filtros: {nome do filtro: condição}, ligadas com AND quando ativas
+        tipos: {coluna: 'categoria' | 'data' | 'data_hora'} para read_arrow
+        """
+        self.nome = nome
+        self.sql = sql
+        self.filtros = dict(filtros or {})
+        self.tipos = dict(tipos or {})
+        if self.filtros and _FILTROS not in sql:
+            raise ValueError(f"Comando {nome} tem filtros mas não tem {_FILTROS}")
+        invalidos = set(self.tipos.values()) - set(TIPOS_COLUNA)
+        if invalidos:
+            raise ValueError(f"Tipo(s) de coluna inválido(s) em {nome}: {', '.join(sorted(invalidos))}")
+        self._variantes = {}
+
+    @property
+    def max_variantes(self):
+        return 2 ** len(self.filtros)
+
+    def variant(self, filtros=()):
+        """(rótulo, texto SQL) da combinação de filtros ativos"""
+        chave = frozenset(filtros)
+        variante = self._variantes.get(chave)
+        if variante is None:
+            desconhecidos = chave - self.filtros.keys()
+            if desconhecidos:
+                raise KeyError(f"Filtro(s) desconhecido(s) em {self.nome}: {', '.join(sorted(desconhecidos))}")
+            ativos = [nome for nome in self.filtros if nome in chave]
+            sql = self.sql.replace(_FILTROS, "".join(f"\n AND {self.filtros[nome]}" for nome in ativos))
+            variante = self._variantes[chave] = ("+".join(ativos) or "base", sql)
+        return variante
+
+
+_comandos = {}
+
+
+def statement(nome, sql, filtros=None, tipos=None):
+    """Registrar um comando (o nome é único no processo)"""
+    if nome in _comandos:
+        raise ValueError(f"Comando já registrado: {nome}")
+    _comandos[nome] = Statement(nome, sql, filtros, tipos)
+    return _comandos[nome]
+
+
+def registered_statements():
+    """{nome: Statement} de todos os comandos registrados"""
+    return dict(_comandos)
+
+
+def run(conn, nome, params=None, filtros=()):
+    """Executar o comando (na variante dos filtros) e devolver o cursor"""
+    rotulo, sql = _comandos[nome].variant(filtros)
+    token = comando_atual.set((nome, rotulo))
+    try:
+        return conn.execute(sql, params or {})
+    finally:
+        comando_atual.reset(token)
+
+
+def read_sql(conn, nome, params=None, filtros=()):
+    """DataFrame com o resultado do comando (na variante dos filtros)"""
+    import pandas as pd
+
+    rotulo, sql = _comandos[nome].variant(filtros)
+    token = comando_atual.set((nome, rotulo))
+    try:
+        return pd.read_sql(sql, conn, params=params or {})
+    finally:
+        comando_atual.reset(token)
+
+
+def _arrow_chunk(valores, tipo):
+    """Um lote de valores de uma coluna como pyarrow.Array do tipo declarado"""
+    import pyarrow as pa
+
+    if tipo is None:
+        return pa.array(valores)
+    texto = pa.array(valores, pa.string())
+    if tipo == 'categoria':
+        return texto.dictionary_encode()
+    return texto.cast(pa.date32() if tipo == 'data' else pa.timestamp('s'))
+
+
+def _arrow_column(lotes, tipo):
+    """ChunkedArray dos lotes de uma coluna, com um tipo comum a todos"""
+    import pyarrow as pa
+
+    if tipo is not None:
+        return pa.chunked_array(lotes)
+    # Tipagem dinâmica do SQLite: lotes só com NULL, inteiros e reais misturados
+    tipos = {lote.type for lote in lotes} - {pa.null()}
+    if not tipos:
+        comum = pa.null()
+    elif len(tipos) == 1:
+        comum = tipos.pop()
+    elif tipos == {pa.int64(), pa.float64()}:
+        comum = pa.float64()
+    else:
+        comum = pa.string()
+    return pa.chunked_array([lote if lote.type == comum else lote.cast(comum) for lote in lotes], comum)
+
+
+def read_arrow(conn, nome, params=None, filtros=(), lote=ARROW_LOTE):
+    """pyarrow.Table com o resultado do comando, lida do cursor em lotes"""
+    import pyarrow as pa
+
+    comando = _comandos[nome]
+    cursor = run(conn, nome, params, filtros)
+    colunas = [descricao[0] for descricao in cursor.description]
+    lotes = {coluna: [] for coluna in colunas}
+    while True:
+        linhas = cursor.fetchmany(lote)
+        if not linhas:
+            break
+        for coluna, valores in zip(colunas, zip(*linhas)):
+            lotes[coluna].append(_arrow_chunk(valores, comando.tipos.get(coluna)))
+        del linhas  # um lote de tuplas por vez
+    if not lotes[colunas[0]]:
+        # Sem linhas: colunas vazias, com o tipo declarado quando houver
+        for coluna in colunas:
+            lotes[coluna].append(_arrow_chunk([], comando.tipos.get(coluna)))
+    tabela = pa.table({coluna: _arrow_column(lotes[coluna], comando.tipos.get(coluna)) for coluna in colunas})
+    # Lotes de uma coluna categórica passam a compartilhar um único dicionário
+    return tabela.unify_dictionaries()
+
+
+# Medicamentos
+
+statement('medicamentos.categorias', """
+    SELECT DISTINCT categoria FROM medicamentos WHERE categoria IS NOT NULL
+""")
+
+statement('medicamentos.ativos', """
+    SELECT id, nome FROM medicamentos WHERE ativo = 1 ORDER BY nome
+""")
+
+statement('medicamentos.lista', """
+    SELECT m.*, u.nome_completo as cadastrado_por_nome
+    FROM medicamentos m
+    LEFT JOIN usuarios u ON m.cadastrado_por = u.id
+    WHERE m.ativo = 1 {filtros}
+    ORDER BY m.nome
+""", filtros={
+    'busca': "(m.nome LIKE :busca OR m.principio_ativo LIKE :busca)",
+    'categoria': "m.categoria = :categoria",
+    'controlado': "m.controlado = :controlado",
+})
+
+# Estoque
+
+statement('estoque.locais', """
+    SELECT DISTINCT local_armazenamento FROM lotes WHERE local_armazenamento IS NOT NULL
+""")
+
+statement('estoque.lotes', """
+    SELECT
+        m.nome as medicamento,
+        m.principio_ativo,
+        l.numero_lote,
+        l.data_validade,
+        l.quantidade_atual,
+        l.local_armazenamento,
+        l.fornecedor,
+        l.preco_unitario,
+        CASE
+            WHEN l.quantidade_atual = 0 THEN 'Sem estoque'
+            WHEN l.quantidade_atual <= 10 THEN 'Estoque baixo'
+            WHEN v.faixa <= :faixa_vencendo THEN 'Próximo ao vencimento'
+            ELSE 'Normal'
+        END as status
+    FROM lotes l
+    JOIN medicamentos m ON l.medicamento_id = m.id
+    LEFT JOIN lotes_vencimento v ON v.lote_id = l.id
+    WHERE l.ativo = 1 AND m.ativo = 1 {filtros}
+    ORDER BY m.nome, l.data_validade
+""", filtros={
+    'busca': "m.nome LIKE :busca",
+    'local': "l.local_armazenamento = :local",
+    'em_estoque': "l.quantidade_atual > 10",
+    'estoque_baixo': "l.quantidade_atual > 0 AND l.quantidade_atual <= 10",
+    'sem_estoque': "l.quantidade_atual = 0",
+    'vencendo': "v.faixa <= :faixa_vencendo AND l.quantidade_atual > 0",
+}, tipos={
+    'medicamento': 'categoria', 'principio_ativo': 'categoria', 'local_armazenamento': 'categoria',
+    'fornecedor': 'categoria', 'status': 'categoria', 'data_validade': 'data',
+})
+
+statement('estoque.lotes_transferiveis', """
+    SELECT l.id, m.nome, m.concentracao, l.numero_lote, l.data_validade, l.quantidade_atual
+    FROM lotes l JOIN medicamentos m ON l.medicamento_id = m.id
+    WHERE l.ativo = 1 AND l.quantidade_atual > 0
+    ORDER BY m.nome, l.data_validade
+""")
+
+statement('estoque.transferencias', """
+    SELECT criado_em, papel, unidade_origem, unidade_destino, quantidade, status,
+           json_extract(dados, '$.nome') as medicamento, json_extract(dados, '$.numero_lote') as lote
+    FROM transferencias
+    ORDER BY id DESC
+    LIMIT 100
+""")
+
+# Pacientes
+
+statement('pacientes.planos', """
+    SELECT DISTINCT plano_saude FROM pacientes WHERE plano_saude IS NOT NULL
+""")
+
+statement('pacientes.ativos', """
+    SELECT id, nome_completo FROM pacientes WHERE ativo = 1 ORDER BY nome_completo
+""")
+
+statement('pacientes.lista', """
+    SELECT p.*, u.nome_completo as cadastrado_por_nome
+    FROM pacientes p
+    LEFT JOIN usuarios u ON p.cadastrado_por = u.id
+    WHERE p.ativo = 1 {filtros}
+    ORDER BY p.nome_completo
+""", filtros={
+    'busca': "(p.nome_completo LIKE :busca OR p.cpf LIKE :busca)",
+    'plano': "p.plano_saude = :plano",
+})
+
+# Consultas
+
+statement('consultas.medicos', """
+    SELECT id, nome_completo, especialidade FROM usuarios
+    WHERE perfil = 'Médico' AND ativo = 1 ORDER BY nome_completo
+""")
+
+statement('consultas.do_dia', """
+    SELECT
+        c.*,
+        p.nome_completo as paciente_nome,
+        m.nome_completo as medico_nome,
+        a.nome_completo as agendado_por_nome
+    FROM consultas c
+    JOIN pacientes p ON c.paciente_id = p.id
+    JOIN usuarios m ON c.medico_id = m.id
+    LEFT JOIN usuarios a ON c.agendado_por = a.id
+    WHERE c.data_consulta_ts >= :inicio AND c.data_consulta_ts < :fim {filtros}
+    ORDER BY c.data_consulta_ts
+""", filtros={
+    'medico': "c.medico_id = :medico_id",
+    'status': "c.status = :status",
+})
+
+statement('consultas.calendario', """
+    SELECT
+        c.id, c.medico_id, m.nome_completo as medico_nome,
+        c.data_consulta, c.data_fim, c.status, c.tipo_consulta,
+        p.nome_completo as paciente_nome
+    FROM consultas c
+    JOIN usuarios m ON m.id = c.medico_id
+    LEFT JOIN pacientes p ON p.id = c.paciente_id
+    WHERE c.data_consulta >= :inicio AND c.data_consulta < :fim {filtros}
+    ORDER BY m.nome_completo, c.medico_id, c.data_consulta
+""", filtros={
+    'medico': "c.medico_id = :medico_id",
+    'status': "c.status = :status",
+})
+
+# Receitas
+
+statement('receitas.lista', """
+    SELECT
+        r.*,
+        p.nome_completo as paciente_nome,
+        m.nome_completo as medico_nome,
+        COUNT(ri.id) as total_medicamentos
+    FROM receitas r
+    JOIN pacientes p ON r.paciente_id = p.id
+    JOIN usuarios m ON r.medico_id = m.id
+    LEFT JOIN receita_itens ri ON r.id = ri.receita_id
+    WHERE r.data_emissao_ts >= :inicio AND r.data_emissao_ts < :fim {filtros}
+    GROUP BY r.id ORDER BY r.data_emissao_ts DESC
+""", filtros={
+    'busca': "p.nome_completo LIKE :busca",
+    'status': "r.status = :status",
+})
+
+statement('receitas.itens', """
+    SELECT
+        ri.*,
+        m.nome as medicamento_nome
+    FROM receita_itens ri
+    JOIN medicamentos m ON ri.medicamento_id = m.id
+    WHERE ri.receita_id IN (SELECT value FROM json_each(:receitas))
+    ORDER BY ri.receita_id, ri.id
+""")
+
+# Auditoria
+
+statement('auditoria.usuarios', """
+    SELECT id, nome_completo FROM usuarios ORDER BY nome_completo
+""")
+
+statement('auditoria.entidades', """
+    SELECT DISTINCT entidade FROM auditoria ORDER BY entidade
+""")
+
+statement('auditoria.eventos', """
+    SELECT id, criado_em, usuario_nome, acao, entidade, entidade_id, antes, depois
+    FROM auditoria
+    WHERE criado_em >= :inicio AND criado_em < :fim {filtros}
+    ORDER BY id DESC LIMIT 500
+""", filtros={
+    'usuario': "usuario_id = :usuario_id",
+    'entidade': "entidade = :entidade",
+    'entidade_id': "entidade_id = :entidade_id",
+}, tipos={
+    'criado_em': 'data_hora', 'usuario_nome': 'categoria', 'acao': 'categoria', 'entidade': 'categoria',
+})
+
+# Compras (planejamento de compras)
+
+statement('compras.formulario', """
+    SELECT
+        m.id as medicamento_id, m.nome as medicamento, m.concentracao, m.apresentacao,
+        COALESCE((
+            SELECT SUM(l.quantidade_atual) FROM lotes l
+            WHERE l.medicamento_id = m.id AND l.ativo = 1 AND l.quantidade_atual > 0
+            AND l.data_validade_dia >= :hoje
+        ), 0) as estoque
+    FROM medicamentos m
+    WHERE m.ativo = 1 {filtros}
+    ORDER BY m.nome
+""", filtros={
+    'medicamento': "m.id = :medicamento_id",
+})
+
+statement('compras.consumo', """
+    SELECT l.medicamento_id, mov.data_movimento_ts / 86400 as dia, SUM(mov.quantidade) as consumo
+    FROM movimentacoes mov
+    JOIN lotes l ON l.id = mov.lote_id
+    WHERE mov.tipo_movimento = 'Saída'
+    AND mov.data_movimento_ts >= :inicio AND mov.data_movimento_ts < :fim {filtros}
+    GROUP BY l.medicamento_id, dia
+""", filtros={
+    'medicamento': "l.medicamento_id = :medicamento_id",
+})
+
+statement('compras.precos', """
+    SELECT l.medicamento_id, l.fornecedor, AVG(l.preco_unitario) as preco_unitario
+    FROM lotes l
+    WHERE l.fornecedor IS NOT NULL AND l.fornecedor != '' AND l.preco_unitario > 0 {filtros}
+    GROUP BY l.medicamento_id, l.fornecedor
+""", filtros={
+    'medicamento': "l.medicamento_id = :medicamento_id",
+})
+
+statement('compras.fornecedores', """
+    SELECT f.fornecedor, p.prazo_entrega_dias
+    FROM (SELECT DISTINCT fornecedor FROM lotes WHERE fornecedor IS NOT NULL AND fornecedor != '') f
+    LEFT JOIN fornecedores_prazos p ON p.fornecedor = f.fornecedor
+    ORDER BY f.fornecedor
+""")
@@ -0,0 +1,154 @@
+"""
+Planejamento de compras: ponto de pedido, estoque de segurança e rascunhos de pedido
+
+Para todo o formulário de uma vez (numpy sobre uma matriz medicamento x
+dia do consumo dos últimos COMPRAS_JANELA_DIAS):
+
+- demanda diária: média e desvio padrão, contando os dias sem saída como 0;
+- fornecedor: o de menor preço unitário médio no histórico de lotes do
+  medicamento (empate: menor prazo de entrega);
+- prazo de entrega (L): da tabela fornecedores_prazos, ou
+  COMPRAS_PRAZO_PADRAO_DIAS para fornecedores sem prazo cadastrado;
+- estoque de segurança = z * desvio * sqrt(L), com z do nível de serviço
+  COMPRAS_NIVEL_SERVICO;
+- ponto de pedido = média * L + estoque de segurança;
+- quando o estoque utilizável (lotes ativos e não vencidos) chega ao ponto
+  de pedido, a sugestão completa o estoque até média * (L +
+  COMPRAS_COBERTURA_DIAS) + estoque de segurança.
+
+purchase_order_drafts agrupa as sugestões em um rascunho por fornecedor.
+"""
+
+import os
+from datetime import date, timedelta
+from statistics import NormalDist
+
+from medstock360.comandos import read_sql
+from medstock360.datas import day_number, epoch
+
+COMPRAS_JANELA_DIAS = int(os.getenv('COMPRAS_JANELA_DIAS', '90'))
+COMPRAS_NIVEL_SERVICO = float(os.getenv('COMPRAS_NIVEL_SERVICO', '0.95'))
+COMPRAS_COBERTURA_DIAS = int(os.getenv('COMPRAS_COBERTURA_DIAS', '60'))
+COMPRAS_PRAZO_PADRAO_DIAS = int(os.getenv('COMPRAS_PRAZO_PADRAO_DIAS', '7'))
+
+# Rascunho dos medicamentos sem preço de fornecedor no histórico
+SEM_FORNECEDOR = "Sem fornecedor"
+
+
+def init_procurement_schema(cursor):
+    """Criar a tabela de prazos de entrega por fornecedor"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS fornecedores_prazos (
+            fornecedor TEXT PRIMARY KEY,
+            prazo_entrega_dias INTEGER NOT NULL CHECK (prazo_entrega_dias > 0),
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def save_lead_times(conn, prazos):
+    """Gravar prazos de entrega {fornecedor: dias}"""
+    conn.executemany("""
+        INSERT INTO fornecedores_prazos (fornecedor, prazo_entrega_dias) VALUES (?, ?)
+        ON CONFLICT (fornecedor) DO UPDATE SET
+            prazo_entrega_dias = excluded.prazo_entrega_dias,
+            atualizado_em = CURRENT_TIMESTAMP
+    """, [(fornecedor, int(dias)) for fornecedor, dias in prazos.items()])
+    conn.commit()
+
+
+def lead_times(conn):
+    """Fornecedores do histórico de lotes com o prazo de entrega (cadastrado ou padrão)"""
+    prazos = read_sql(conn, 'compras.fornecedores')
+    prazos['cadastrado'] = prazos['prazo_entrega_dias'].notna()
+    prazos['prazo_entrega_dias'] = prazos['prazo_entrega_dias'].fillna(COMPRAS_PRAZO_PADRAO_DIAS).astype(int)
+    return prazos
+
+
+def demand_stats(consumo, medicamento_ids, primeiro_dia, janela):
+    """
+    Média e desvio padrão diários por medicamento (arrays na ordem de medicamento_ids)
+
+    consumo: DataFrame medicamento_id, dia (dias desde 1970), consumo
+    """
+    import numpy as np
+
+    matriz = np.zeros((len(medicamento_ids), janela))
+    posicao = {medicamento_id: i for i, medicamento_id in enumerate(medicamento_ids)}
+    linhas = consumo['medicamento_id'].map(posicao)
+    validas = linhas.notna().to_numpy()
+    # Sem saídas na janela o read_sql devolve colunas vazias de tipo object
+    np.add.at(matriz, (linhas.to_numpy()[validas].astype(int),
+                       consumo['dia'].to_numpy()[validas].astype(int) - primeiro_dia),
+              consumo['consumo'].to_numpy()[validas].astype(float))
+    return matriz.mean(axis=1), matriz.std(axis=1, ddof=1)
+
+
+def procurement_plan(conn, medicamento_id=None, hoje=None, janela=COMPRAS_JANELA_DIAS,
+                     nivel_servico=COMPRAS_NIVEL_SERVICO, cobertura=COMPRAS_COBERTURA_DIAS):
+    """
+    Plano de compras do formulário (ou de um medicamento)
+
+    Uma linha por medicamento ativo: consumo médio e desvio diários, estoque
+    utilizável, fornecedor mais barato, prazo, estoque de segurança, ponto de
+    pedido, quantidade sugerida (0 acima do ponto de pedido) e valor estimado.
+    """
+    import numpy as np
+
+    hoje = hoje or date.today()
+    primeiro_dia = day_number(hoje) - janela
+    params = {'inicio': epoch(hoje - timedelta(days=janela)), 'fim': epoch(hoje),
+              'hoje': day_number(hoje), 'medicamento_id': medicamento_id}
+    filtros = ['medicamento'] if medicamento_id is not None else []
+
+    plano = read_sql(conn, 'compras.formulario', params, filtros)
+    consumo = read_sql(conn, 'compras.consumo', params, filtros)
+    precos = read_sql(conn, 'compras.precos', params, filtros)
+    prazos = lead_times(conn)
+
+    # Fornecedor mais barato por medicamento (empate: menor prazo)
+    precos = precos.merge(prazos[['fornecedor', 'prazo_entrega_dias']], on='fornecedor', how='left')
+    precos['prazo_entrega_dias'] = precos['prazo_entrega_dias'].fillna(COMPRAS_PRAZO_PADRAO_DIAS)
+    melhores = (precos.sort_values(['medicamento_id', 'preco_unitario', 'prazo_entrega_dias'])
+                .drop_duplicates('medicamento_id'))
+    plano = plano.merge(melhores, on='medicamento_id', how='left')
+    plano['fornecedor'] = plano['fornecedor'].fillna(SEM_FORNECEDOR)
+    plano['prazo_entrega_dias'] = plano['prazo_entrega_dias'].fillna(COMPRAS_PRAZO_PADRAO_DIAS).astype(int)
+
+    media, desvio = demand_stats(consumo, plano['medicamento_id'].to_numpy(), primeiro_dia, janela)
+    prazo = plano['prazo_entrega_dias'].to_numpy()
+    z = NormalDist().inv_cdf(nivel_servico)
+    seguranca = z * desvio * np.sqrt(prazo)
+    ponto_pedido = media * prazo + seguranca
+    nivel_maximo = media * (prazo + cobertura) + seguranca
+    estoque = plano['estoque'].to_numpy()
+
+    plano['consumo_medio'] = media
+    plano['desvio_consumo'] = desvio
+    plano['estoque_seguranca'] = np.ceil(seguranca).astype(int)
+    plano['ponto_pedido'] = np.ceil(ponto_pedido).astype(int)
+    plano['quantidade_sugerida'] = np.where(
+        (media > 0) & (estoque <= ponto_pedido), np.ceil(nivel_maximo - estoque), 0
+    ).astype(int)
+    plano['valor_estimado'] = plano['quantidade_sugerida'] * plano['preco_unitario'].fillna(0)
+    plano['cobertura_dias'] = np.where(media > 0, estoque / np.where(media > 0, media, 1), np.inf)
+    return plano
+
+
+def purchase_order_drafts(plano, hoje=None):
+    """Um rascunho de pedido por fornecedor com os itens sugeridos, do maior valor ao menor"""
+    hoje = hoje or date.today()
+    itens = plano[plano['quantidade_sugerida'] > 0]
+    rascunhos = []
+    for fornecedor, grupo in itens.groupby('fornecedor', sort=False):
+        prazo = int(grupo['prazo_entrega_dias'].iloc[0])
+        rascunhos.append({
+            'fornecedor': fornecedor,
+            'prazo_entrega_dias': prazo,
+            'entrega_prevista': hoje + timedelta(days=prazo),
+            'itens': grupo[['medicamento_id', 'medicamento', 'concentracao', 'apresentacao',
+                            'quantidade_sugerida', 'preco_unitario', 'valor_estimado']]
+                     .sort_values('medicamento').reset_index(drop=True),
+            'total': float(grupo['valor_estimado'].sum()),
+        })
+    return sorted(rascunhos, key=lambda rascunho: rascunho['total'], reverse=True)
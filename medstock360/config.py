@@ -0,0 +1,36 @@
+"""Configurações do MedStock360 (ambiente, banco e página)"""
+
+import os
+
+# Configurações específicas para Railway
+ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
+PORT = os.getenv('PORT', '8501')
+
+# Caminho do banco otimizado para Railway
+if ENVIRONMENT == 'production':
+    # No Railway, usar pasta temporária
+    DB_PATH = "/tmp/medstock360.db"
+else:
+    # Local, usar pasta data
+    DB_PATH = "data/medstock360.db"
+
+# Configuração da página otimizada para Railway
+if ENVIRONMENT == 'production':
+    PAGE_CONFIG = {
+        'page_title': "MedStock360 Cloud",
+        'page_icon': "🏥",
+        'layout': "wide",
+        'initial_sidebar_state': "expanded",
+        'menu_items': {
+            'Get Help': None,
+            'Report a bug': None,
+            'About': "🏥 MedStock360 - Sistema Hospitalar na Nuvem"
+        }
+    }
+else:
+    PAGE_CONFIG = {
+        'page_title': "MedStock360 Advanced",
+        'page_icon': "🏥",
+        'layout': "wide",
+        'initial_sidebar_state': "expanded"
+    }
@@ -0,0 +1,318 @@
+"""Gerenciador de banco de dados do MedStock360"""
+
+import os
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+from medstock360.config import DB_PATH
+from medstock360.vencimentos import init_expiry_schema
+from medstock360.alertas import init_alert_schema
+from medstock360.agenda import init_schedule_schema
+from medstock360.auditoria import init_audit_schema
+from medstock360.transferencias import init_transfer_schema
+from medstock360.tarefas import init_job_schema
+from medstock360.instantaneos import init_snapshot_schema
+from medstock360.linha_do_tempo import init_timeline_schema
+from medstock360.interacoes import init_interaction_schema
+from medstock360.duplicados import init_dedup_schema
+from medstock360.datas import init_date_columns
+from medstock360.compras import init_procurement_schema
+from medstock360.desempenho import InstrumentedConnection
+
+# Conexões ociosas mantidas por banco (0 desliga o pool)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+
+# Comandos preparados mantidos por conexão (variantes do registro de comandos e SQL avulso)
+DB_STATEMENT_CACHE = int(os.getenv('DB_STATEMENT_CACHE', '256'))
+
+# Bancos já inicializados neste processo (as migrações rodam uma vez, não a cada sessão)
+_bancos_inicializados = set()
+_bancos_lock = threading.Lock()
+
+
+class PooledConnection(InstrumentedConnection):
+    """Conexão que volta para o pool do seu DatabaseManager ao ser fechada"""
+
+    _pool = None
+    _emprestada = False
+
+    def close(self):
+        if self._pool is None:
+            return super().close()
+        if not self._emprestada:
+            return  # já devolvida (close repetido)
+        self._emprestada = False
+        if self.in_transaction:
+            self.rollback()
+        with self._pool_lock:
+            if len(self._pool) < DB_POOL_SIZE:
+                self._pool.append(self)
+                return
+        super().close()
+
+
+class DatabaseManager:
+    """Gerenciador de banco de dados otimizado para Railway"""
+    
+    def __init__(self, db_path=None):
+        # Caminho do banco otimizado para Railway (ou outro banco, ex.: benchmarks)
+        self.db_path = db_path or DB_PATH
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # Pool de conexões ociosas (reutilizadas entre sessões e threads)
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        
+        with _bancos_lock:
+            chave = str(Path(self.db_path).resolve())
+            if chave not in _bancos_inicializados or not Path(chave).exists():
+                self.init_database()
+                _bancos_inicializados.add(chave)
+    
+    def get_connection(self):
+        """Obter conexão com o banco (instrumentada, do pool quando houver)"""
+        with self._pool_lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            # O pool entrega a conexão a uma thread por vez
+            conn = sqlite3.connect(self.db_path, factory=PooledConnection, check_same_thread=False,
+                                   cached_statements=DB_STATEMENT_CACHE)
+            conn._pool = self._pool
+            conn._pool_lock = self._pool_lock
+        conn._emprestada = True
+        return conn
+    
+    def init_database(self):
+        """Inicializar tabelas do banco de dados"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        # WAL: relatórios longos não bloqueiam as gravações (dispensação, agenda)
+        cursor.execute("PRAGMA journal_mode = WAL")
+
+        # Tabela de usuários
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS usuarios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                nome_completo TEXT NOT NULL,
+                email TEXT,
+                perfil TEXT NOT NULL,
+                crm_crf TEXT,
+                ativo INTEGER DEFAULT 1,
+                data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                ultimo_login TIMESTAMP,
+                criado_por INTEGER,
+                FOREIGN KEY (criado_por) REFERENCES usuarios (id)
+            )
+        """)
+        
+        # Tabela de medicamentos
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS medicamentos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL,
+                principio_ativo TEXT,
+                fabricante TEXT,
+                categoria TEXT,
+                apresentacao TEXT,
+                concentracao TEXT,
+                registro_anvisa TEXT,
+                controlado INTEGER DEFAULT 0,
+                temperatura_armazenamento TEXT,
+                via_administracao TEXT,
+                observacoes TEXT,
+                ativo INTEGER DEFAULT 1,
+                data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                cadastrado_por INTEGER,
+                FOREIGN KEY (cadastrado_por) REFERENCES usuarios (id)
+            )
+        """)
+        
+        # Tabela de lotes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS lotes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                medicamento_id INTEGER NOT NULL,
+                numero_lote TEXT NOT NULL,
+                data_fabricacao DATE,
+                data_validade DATE NOT NULL,
+                quantidade_inicial INTEGER NOT NULL,
+                quantidade_atual INTEGER NOT NULL,
+                preco_unitario REAL,
+                fornecedor TEXT,
+                local_armazenamento TEXT,
+                observacoes TEXT,
+                ativo INTEGER DEFAULT 1,
+                data_entrada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                responsavel_entrada INTEGER,
+                FOREIGN KEY (medicamento_id) REFERENCES medicamentos (id),
+                FOREIGN KEY (responsavel_entrada) REFERENCES usuarios (id)
+            )
+        """)
+        
+        # Tabela de pacientes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS pacientes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome_completo TEXT NOT NULL,
+                cpf TEXT UNIQUE,
+                rg TEXT,
+                data_nascimento DATE,
+                sexo TEXT,
+                telefone TEXT,
+                email TEXT,
+                endereco TEXT,
+                cidade TEXT,
+                estado TEXT,
+                cep TEXT,
+                plano_saude TEXT,
+                numero_carteirinha TEXT,
+                contato_emergencia TEXT,
+                observacoes TEXT,
+                ativo INTEGER DEFAULT 1,
+                data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                cadastrado_por INTEGER,
+                FOREIGN KEY (cadastrado_por) REFERENCES usuarios (id)
+            )
+        """)
+        
+        # Tabela de consultas
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS consultas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                paciente_id INTEGER NOT NULL,
+                medico_id INTEGER NOT NULL,
+                data_consulta TIMESTAMP NOT NULL,
+                tipo_consulta TEXT,
+                motivo TEXT,
+                diagnostico TEXT,
+                observacoes TEXT,
+                status TEXT DEFAULT 'Agendada',
+                valor REAL,
+                data_agendamento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                agendado_por INTEGER,
+                FOREIGN KEY (paciente_id) REFERENCES pacientes (id),
+                FOREIGN KEY (medico_id) REFERENCES usuarios (id),
+                FOREIGN KEY (agendado_por) REFERENCES usuarios (id)
+            )
+        """)
+        
+        # Tabela de receitas
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS receitas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                consulta_id INTEGER,
+                paciente_id INTEGER NOT NULL,
+                medico_id INTEGER NOT NULL,
+                data_emissao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                observacoes TEXT,
+                status TEXT DEFAULT 'Ativa',
+                FOREIGN KEY (consulta_id) REFERENCES consultas (id),
+                FOREIGN KEY (paciente_id) REFERENCES pacientes (id),
+                FOREIGN KEY (medico_id) REFERENCES usuarios (id)
+            )
+        """)
+        
+        # Tabela de itens da receita
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS receita_itens (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                receita_id INTEGER NOT NULL,
+                medicamento_id INTEGER NOT NULL,
+                dosagem TEXT NOT NULL,
+                quantidade INTEGER NOT NULL,
+                frequencia TEXT NOT NULL,
+                duracao_tratamento TEXT,
+                instrucoes_uso TEXT,
+                FOREIGN KEY (receita_id) REFERENCES receitas (id),
+                FOREIGN KEY (medicamento_id) REFERENCES medicamentos (id)
+            )
+        """)
+        
+        # Tabela de movimentações de estoque
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS movimentacoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                lote_id INTEGER NOT NULL,
+                tipo_movimento TEXT NOT NULL,
+                quantidade INTEGER NOT NULL,
+                motivo TEXT,
+                receita_id INTEGER,
+                data_movimento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                responsavel INTEGER NOT NULL,
+                observacoes TEXT,
+                FOREIGN KEY (lote_id) REFERENCES lotes (id),
+                FOREIGN KEY (receita_id) REFERENCES receitas (id),
+                FOREIGN KEY (responsavel) REFERENCES usuarios (id)
+            )
+        """)
+        
+        # Índices usados pela avaliação de alertas
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_lotes_medicamento ON lotes (medicamento_id, ativo)")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_movimentacoes_tipo_data
+            ON movimentacoes (tipo_movimento, data_movimento)
+        """)
+        
+        # Datas em colunas inteiras geradas (e índices sobre elas)
+        init_date_columns(cursor)
+        
+        # Faixas de vencimento pré-calculadas por lote
+        init_expiry_schema(cursor)
+        
+        # Alertas ativos e outbox de notificações
+        init_alert_schema(cursor)
+        
+        # Início/fim das consultas e índice de intervalos por médico
+        init_schedule_schema(cursor)
+        
+        # Log de auditoria somente inclusão
+        init_audit_schema(cursor)
+        
+        # Registro de transferências entre unidades
+        init_transfer_schema(cursor)
+        
+        # Fila durável de relatórios e exportações em segundo plano
+        init_job_schema(cursor)
+        
+        # Relatórios padrão pré-calculados e contadores de alterações nas fontes
+        init_snapshot_schema(cursor)
+        
+        # Índices por paciente e versão do paciente (linha do tempo)
+        init_timeline_schema(cursor)
+        
+        # Tabela de interações medicamentosas e versão do índice em memória
+        init_interaction_schema(cursor)
+        
+        # Chaves de bloqueio para a detecção de pacientes duplicados
+        init_dedup_schema(cursor)
+        
+        # Prazos de entrega dos fornecedores (planejamento de compras)
+        init_procurement_schema(cursor)
+        
+        conn.commit()
+        conn.close()
+        
+        # Criar usuário administrador padrão
+        self.create_default_admin()
+    
+    def create_default_admin(self):
+        """Criar usuário administrador padrão"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        # Verificar se já existe um admin
+        cursor.execute("SELECT id FROM usuarios WHERE perfil = 'Administrador'")
+        if not cursor.fetchone():
+            password_hash = hashlib.sha256("admin123".encode()).hexdigest()
+            cursor.execute("""
+                INSERT INTO usuarios (username, password_hash, nome_completo, perfil)
+                VALUES ('admin', ?, 'Administrador do Sistema', 'Administrador')
+            """, (password_hash,))
+            conn.commit()
+        
+        conn.close()
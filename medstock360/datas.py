@@ -0,0 +1,105 @@
+"""
+Datas em colunas inteiras
+
+As datas continuam gravadas como TEXT (fonte da verdade durante a
+transição); cada uma ganha uma coluna gerada VIRTUAL com o valor inteiro
+(segundos desde 1970 para os carimbos, dias desde 1970 para as datas) e um
+índice sobre ela. As consultas filtram por intervalos de inteiros
+(c.data_consulta_ts >= ? AND c.data_consulta_ts < ?) em vez de aplicar
+DATE()/julianday() linha a linha, e as telas convertem a coluna inteira
+para datetime de uma vez (pd.to_datetime(..., unit='s')), sem strptime por
+linha.
+
+As colunas geradas não ocupam espaço na tabela; só os índices guardam os
+inteiros. Os valores são interpretados como UTC tanto no SQLite
+(unixepoch) quanto aqui (calendar.timegm), então os intervalos batem com o
+texto gravado.
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+
+# tabela: [(coluna inteira, coluna de texto, unidade)]; unidade 's' (segundos) ou 'D' (dias)
+COLUNAS_INTEIRAS = {
+    'lotes': [('data_validade_dia', 'data_validade', 'D')],
+    'consultas': [('data_consulta_ts', 'data_consulta', 's')],
+    'movimentacoes': [('data_movimento_ts', 'data_movimento', 's')],
+    'receitas': [('data_emissao_ts', 'data_emissao', 's')],
+}
+
+# Índices sobre as colunas inteiras (nome: tabela e colunas)
+INDICES_INTEIROS = {
+    'idx_lotes_validade_dia': ('lotes', 'data_validade_dia'),
+    'idx_consultas_data_ts': ('consultas', 'data_consulta_ts'),
+    'idx_receitas_data_ts': ('receitas', 'data_emissao_ts'),
+    'idx_movimentacoes_tipo_ts': ('movimentacoes', 'tipo_movimento, data_movimento_ts'),
+}
+
+SEGUNDOS_DIA = 86400
+
+
+def integer_date_sql(coluna, unidade):
+    """Expressão SQL com o valor inteiro da coluna de texto"""
+    return f"unixepoch({coluna})" if unidade == 's' else f"(unixepoch({coluna}) / {SEGUNDOS_DIA})"
+
+
+def generated_columns(tabela):
+    """[(coluna inteira, expressão sobre a coluna de texto)] da tabela"""
+    return [(nome, integer_date_sql(origem, unidade)) for nome, origem, unidade in COLUNAS_INTEIRAS.get(tabela, [])]
+
+
+def init_date_columns(cursor):
+    """Acrescentar as colunas inteiras geradas e os seus índices (migração idempotente)"""
+    for tabela, colunas in COLUNAS_INTEIRAS.items():
+        existentes = {row[1] for row in cursor.execute(f"PRAGMA table_xinfo({tabela})")}
+        for nome, origem, unidade in colunas:
+            if nome not in existentes:
+                cursor.execute(f"""
+                    ALTER TABLE {tabela} ADD COLUMN {nome} INTEGER
+                    GENERATED ALWAYS AS ({integer_date_sql(origem, unidade)}) VIRTUAL
+                """)
+    for indice, (tabela, colunas) in INDICES_INTEIROS.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {indice} ON {tabela} ({colunas})")
+
+
+def epoch(valor):
+    """Segundos desde 1970 (UTC) de uma data, datetime ou texto ISO"""
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor)
+    elif not isinstance(valor, datetime):
+        valor = datetime.combine(valor, datetime.min.time())
+    return calendar.timegm(valor.timetuple())
+
+
+def day_number(valor):
+    """Dias desde 1970 de uma data, datetime ou texto ISO"""
+    return epoch(valor) // SEGUNDOS_DIA
+
+
+def epoch_range(inicio, fim=None):
+    """(início, fim exclusivo) em segundos dos dias inicio a fim, inclusive"""
+    fim = fim or inicio
+    if isinstance(fim, str):
+        fim = date.fromisoformat(fim[:10])
+    if isinstance(fim, datetime):
+        fim = fim.date()
+    return epoch(inicio), epoch(fim + timedelta(days=1))
+
+
+def add_months(valor, meses):
+    """Data deslocada em meses, com o dia limitado ao fim do mês (como DATE(..., '-6 months') sem transbordar)"""
+    ano, mes = divmod(valor.year * 12 + valor.month - 1 + meses, 12)
+    return valor.replace(year=ano, month=mes + 1, day=min(valor.day, calendar.monthrange(ano, mes + 1)[1]))
+
+
+def month_range(valor):
+    """(início, fim exclusivo) em segundos do mês da data"""
+    inicio = valor.replace(day=1)
+    return epoch_range(inicio, add_months(inicio, 1) - timedelta(days=1))
+
+
+def from_integer(serie, unidade='s'):
+    """Coluna inteira (segundos ou dias) -> datetime64, convertida de uma vez"""
+    import pandas as pd
+
+    return pd.to_datetime(serie, unit=unidade)
@@ -0,0 +1,322 @@
+"""
+Instrumentação de consultas ao banco e do tempo de renderização das páginas
+
+As conexões do DatabaseManager usam InstrumentedConnection: cada comando
+SQL (execute/executemany, inclusive via pd.read_sql) registra a impressão
+digital do texto normalizado, o formato dos parâmetros, a duração
+(execução + leitura das linhas), as linhas retornadas e a página que o
+originou. render_page mede cada show_* com track_page. Comandos do
+registro (medstock360.comandos) levam também o nome e a variante.
+
+Os registros ficam em memória (janelas limitadas por processo) e alimentam
+a página de Performance e a exportação em JSON lines.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+QUERY_LOG_MAX_ENTRIES = int(os.getenv('QUERY_LOG_MAX_ENTRIES', '10000'))
+
+# Amostras por consulta/página usadas nos percentis
+_MAX_AMOSTRAS = 1000
+
+# Página em renderização na sessão atual (None em threads de segundo plano)
+pagina_atual = ContextVar('pagina_atual', default=None)
+
+# (nome, variante) do comando registrado em execução (None para SQL avulso)
+comando_atual = ContextVar('comando_atual', default=None)
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS_IN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def query_fingerprint(sql):
+    """Texto normalizado (literais -> ?, listas IN colapsadas) e seu hash curto"""
+    normalizado = _ESPACOS.sub(" ", sql).strip()
+    normalizado = _LITERAIS.sub("?", normalizado)
+    normalizado = _LISTAS_IN.sub("(?, ...)", normalizado)
+    return hashlib.blake2b(normalizado.encode(), digest_size=6).hexdigest(), normalizado
+
+
+def _params_shape(params, lote=False):
+    """Formato dos parâmetros (tipos, nunca os valores)"""
+    if lote:
+        params = list(params)
+        return f"{len(params)}x{_params_shape(params[0]) if params else '()'}"
+    if not params:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ",".join(f"{k}:{type(v).__name__}" for k, v in params.items()) + "}"
+    return "(" + ",".join(type(p).__name__ for p in params) + ")"
+
+
+def _percentis(amostras):
+    """p50, p95 e p99 de uma sequência de durações"""
+    if not amostras:
+        return 0.0, 0.0, 0.0
+    ordenadas = sorted(amostras)
+    n = len(ordenadas)
+    return tuple(ordenadas[min(int(n * p), n - 1)] for p in (0.50, 0.95, 0.99))
+
+
+class PerformanceStats:
+    """Registros de consultas e de páginas (por processo)"""
+
+    def __init__(self, max_entries=QUERY_LOG_MAX_ENTRIES, slow_ms=SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._registros = deque(maxlen=max_entries)
+        self._lentas = deque(maxlen=500)
+        self._consultas = {}
+        self._paginas = {}
+        self._comandos = {}
+
+    def record_query(self, registro):
+        """Guardar um comando SQL já concluído"""
+        with self._lock:
+            self._registros.append(registro)
+            agregado = self._consultas.get(registro['fingerprint'])
+            if agregado is None:
+                agregado = self._consultas[registro['fingerprint']] = {
+                    'sql': registro['sql'], 'chamadas': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'linhas': 0, 'paginas': set(), 'amostras': deque(maxlen=_MAX_AMOSTRAS)
+                }
+            agregado['chamadas'] += 1
+            agregado['total_ms'] += registro['duracao_ms']
+            agregado['max_ms'] = max(agregado['max_ms'], registro['duracao_ms'])
+            agregado['linhas'] += registro['linhas']
+            agregado['paginas'].add(registro['pagina'])
+            agregado['amostras'].append(registro['duracao_ms'])
+            if registro['comando'] is not None:
+                comando = self._comandos.get(registro['comando'])
+                if comando is None:
+                    comando = self._comandos[registro['comando']] = {
+                        'chamadas': 0, 'total_ms': 0.0, 'variantes': {}, 'amostras': deque(maxlen=_MAX_AMOSTRAS)
+                    }
+                comando['chamadas'] += 1
+                comando['total_ms'] += registro['duracao_ms']
+                comando['variantes'][registro['variante']] = comando['variantes'].get(registro['variante'], 0) + 1
+                comando['amostras'].append(registro['duracao_ms'])
+            if registro['duracao_ms'] >= self.slow_ms:
+                self._lentas.append(registro)
+
+    def record_page(self, pagina, duracao_ms):
+        """Guardar o tempo de renderização de uma página"""
+        with self._lock:
+            self._paginas.setdefault(pagina, deque(maxlen=_MAX_AMOSTRAS)).append(duracao_ms)
+
+    def query_summary(self):
+        """Uma linha por consulta (impressão digital) com percentis, da mais cara à mais barata"""
+        with self._lock:
+            agregados = [(fp, dict(a, amostras=list(a['amostras']), paginas=set(a['paginas'])))
+                         for fp, a in self._consultas.items()]
+        linhas = []
+        for fingerprint, agregado in agregados:
+            p50, p95, p99 = _percentis(agregado['amostras'])
+            linhas.append({
+                'fingerprint': fingerprint,
+                'sql': agregado['sql'],
+                'chamadas': agregado['chamadas'],
+                'total_ms': agregado['total_ms'],
+                'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+                'max_ms': agregado['max_ms'],
+                'linhas_media': agregado['linhas'] / agregado['chamadas'],
+                'paginas': ", ".join(sorted(str(p) for p in agregado['paginas'])),
+            })
+        return sorted(linhas, key=lambda linha: linha['total_ms'], reverse=True)
+
+    def page_summary(self):
+        """Uma linha por página com percentis do tempo de renderização"""
+        with self._lock:
+            paginas = {pagina: list(amostras) for pagina, amostras in self._paginas.items()}
+        linhas = []
+        for pagina, amostras in paginas.items():
+            p50, p95, p99 = _percentis(amostras)
+            linhas.append({
+                'pagina': pagina, 'renderizacoes': len(amostras),
+                'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': max(amostras),
+            })
+        return sorted(linhas, key=lambda linha: linha['p95_ms'], reverse=True)
+
+    def statement_summary(self, registrados=None):
+        """
+        Uma linha por comando do registro, com as variantes usadas
+
+        registrados: {nome: máximo de variantes}; os que nunca rodaram aparecem com 0 chamadas.
+        """
+        registrados = registrados or {}
+        with self._lock:
+            comandos = {nome: dict(c, variantes=dict(c['variantes']), amostras=list(c['amostras']))
+                        for nome, c in self._comandos.items()}
+        linhas = []
+        for nome in sorted(set(registrados) | set(comandos)):
+            comando = comandos.get(nome, {'chamadas': 0, 'total_ms': 0.0, 'variantes': {}, 'amostras': []})
+            p50, p95, _ = _percentis(comando['amostras'])
+            linhas.append({
+                'comando': nome,
+                'chamadas': comando['chamadas'],
+                'variantes': len(comando['variantes']),
+                'max_variantes': registrados.get(nome, 0),
+                'total_ms': comando['total_ms'],
+                'p50_ms': p50, 'p95_ms': p95,
+                'mais_usadas': ", ".join(f"{v} ({n})" for v, n in sorted(
+                    comando['variantes'].items(), key=lambda item: item[1], reverse=True)[:3]),
+            })
+        return sorted(linhas, key=lambda linha: (-linha['chamadas'], linha['comando']))
+
+    def slow_queries(self, limite=20):
+        """As consultas mais lentas do log de consultas lentas"""
+        with self._lock:
+            lentas = list(self._lentas)
+        return sorted(lentas, key=lambda r: r['duracao_ms'], reverse=True)[:limite]
+
+    def export_jsonl(self, arquivo):
+        """Gravar os registros de consultas em JSON lines (um por linha)"""
+        with self._lock:
+            registros = list(self._registros)
+        for registro in registros:
+            registro = dict(registro, quando=datetime.fromtimestamp(registro['quando']).isoformat(timespec='milliseconds'))
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        return len(registros)
+
+    def clear(self):
+        """Descartar todos os registros"""
+        with self._lock:
+            self._registros.clear()
+            self._lentas.clear()
+            self._consultas.clear()
+            self._paginas.clear()
+            self._comandos.clear()
+
+
+performance_stats = PerformanceStats()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor que mede cada comando e conta as linhas lidas
+
+    O registro de um SELECT é concluído quando as linhas acabam (fetchall,
+    fim da iteração), no próximo comando do cursor ou quando ele é fechado.
+    """
+
+    _registro = None
+
+    def _start(self, sql, params, duracao_ms, lote=False):
+        self._finish()
+        fingerprint, normalizado = query_fingerprint(sql)
+        pagina = pagina_atual.get()
+        comando, variante = comando_atual.get() or (None, None)
+        self._registro = {
+            'quando': time.time(),
+            'fingerprint': fingerprint,
+            'sql': normalizado,
+            'parametros': _params_shape(params, lote),
+            'pagina': pagina if pagina is not None else threading.current_thread().name,
+            'comando': comando,
+            'variante': variante,
+            'duracao_ms': duracao_ms,
+            'linhas': max(self.rowcount, 0),
+        }
+        # Comandos sem resultado (INSERT, UPDATE, ...) terminam aqui
+        if self.description is None:
+            self._finish()
+
+    def _finish(self):
+        if self._registro is not None:
+            registro, self._registro = self._registro, None
+            performance_stats.record_query(registro)
+
+    def _fetched(self, inicio, linhas, fim=False):
+        if self._registro is not None:
+            self._registro['duracao_ms'] += (time.perf_counter() - inicio) * 1000
+            self._registro['linhas'] += linhas
+            if fim:
+                self._finish()
+
+    def execute(self, sql, params=()):
+        inicio = time.perf_counter()
+        resultado = super().execute(sql, params)
+        self._start(sql, params, (time.perf_counter() - inicio) * 1000)
+        return resultado
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        inicio = time.perf_counter()
+        resultado = super().executemany(sql, seq_of_params)
+        self._start(sql, seq_of_params, (time.perf_counter() - inicio) * 1000, lote=True)
+        return resultado
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(inicio, row is not None, fim=row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = size if size is not None else self.arraysize
+        inicio = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(inicio, len(rows), fim=len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(inicio, len(rows), fim=True)
+        return rows
+
+    def __next__(self):
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._finish()
+            raise
+        if self._registro is not None:
+            self._registro['linhas'] += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de pd.read_sql) são instrumentados"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+@contextmanager
+def track_page(pagina):
+    """Medir a renderização de uma página e marcar suas consultas"""
+    token = pagina_atual.set(pagina)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        performance_stats.record_page(pagina, (time.perf_counter() - inicio) * 1000)
+        pagina_atual.reset(token)
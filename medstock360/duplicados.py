@@ -0,0 +1,341 @@
+"""
+Detecção de pacientes duplicados
+
+Prontuários sem CPF escapam do UNIQUE de pacientes.cpf. Cada paciente recebe
+chaves de bloqueio (código fonético do primeiro nome ou do último sobrenome
+com a data de nascimento, nome fonético completo, telefone); só pacientes
+que compartilham uma chave são comparados. Dentro de cada bloco a
+similaridade dos nomes (Dice sobre trigramas da grafia pelo som) é calculada de uma vez, em
+forma matricial, e combinada com data de nascimento e telefone.
+
+- find_duplicate_candidates: relatório de toda a base (tarefa em segundo
+  plano), com os blocos distribuídos em um pool de DUPLICADOS_WORKERS threads.
+- check_new_patient: verificação no cadastro; usa as chaves persistidas em
+  pacientes_chaves (mantidas a partir da fila pacientes_chaves_pendentes,
+  alimentada por gatilhos).
+"""
+
+import os
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+DUPLICADOS_LIMIAR = float(os.getenv('DUPLICADOS_LIMIAR', '0.8'))
+DUPLICADOS_WORKERS = int(os.getenv('DUPLICADOS_WORKERS', str(min(8, os.cpu_count() or 1))))
+
+# Blocos maiores (nomes muito comuns) não discriminam: são ignorados
+DUPLICADOS_BLOCO_MAX = 1000
+
+# Pacientes da fila processados por transação (e por verificação no cadastro)
+DUPLICADOS_LOTE_CHAVES = 5000
+
+# Pesos da pontuação: nome (0 a 1), mesma data de nascimento, mesmo telefone
+PESO_NOME, PESO_NASCIMENTO, PESO_TELEFONE = 0.7, 0.2, 0.1
+
+_PARTICULAS = {'da', 'das', 'de', 'do', 'dos', 'e'}
+
+# Regras fonéticas (português), aplicadas em ordem sobre o nome sem acentos
+_FONETICA = [(re.compile(padrao), troca) for padrao, troca in [
+    (r'ph', 'f'), (r'th', 't'), (r'[cs]h', 'x'), (r'lh', 'l'), (r'nh', 'n'),
+    (r'sc(?=[ei])', 's'), (r'c(?=[eiy])', 's'), (r'g(?=[eiy])', 'j'),
+    (r'qu|gu(?=[ei])', lambda m: 'k' if m.group() == 'qu' else 'g'),
+    (r'[ckq]', 'k'), (r'[zç]', 's'), (r'y', 'i'), (r'w', 'v'), (r'h', ''),
+    (r'm$', 'n'), (r'l(?=[^aeiou]|$)', 'u'),
+]]
+
+
+def normalize_name(nome):
+    """'  José da SILVA-Sauro ' -> 'jose silva sauro' (sem acentos nem partículas)"""
+    nome = unicodedata.normalize('NFKD', (nome or '').replace('ç', 's').replace('Ç', 's'))
+    nome = re.sub(r'[^a-z ]', ' ', nome.encode('ascii', 'ignore').decode().lower())
+    return " ".join(parte for parte in nome.split() if parte not in _PARTICULAS)
+
+
+# Nomes se repetem muito: cada palavra é convertida uma vez
+@lru_cache(maxsize=200_000)
+def _sound(palavra):
+    """Grafia pelo som, com as vogais ('thyago' -> 'tiago')"""
+    for padrao, troca in _FONETICA:
+        palavra = padrao.sub(troca, palavra)
+    return palavra
+
+
+@lru_cache(maxsize=200_000)
+def phonetic(palavra):
+    """Código fonético de uma palavra já normalizada ('souza'/'sousa' -> 's')"""
+    palavra = _sound(palavra)
+    if not palavra:
+        return ''
+    codigo = palavra[0] + re.sub(r'[aeiou]', '', palavra[1:])
+    return re.sub(r'(.)\1+', r'\1', codigo)
+
+
+def _digits(texto):
+    return re.sub(r'\D', '', texto or '')
+
+
+def blocking_keys(nome, data_nascimento=None, telefone=None):
+    """Chaves de bloqueio de um paciente"""
+    partes = normalize_name(nome).split()
+    if not partes:
+        return []
+    primeiro, ultimo = phonetic(partes[0]), phonetic(partes[-1])
+    chaves = [f"f:{' '.join(phonetic(p) for p in partes)}"]
+    if data_nascimento:
+        nascimento = str(data_nascimento)[:10]
+        chaves += [f"pn:{primeiro}|{nascimento}", f"un:{ultimo}|{nascimento}"]
+    telefone = _digits(telefone)
+    if len(telefone) >= 8:
+        chaves.append(f"t:{telefone[-8:]}")
+    return chaves
+
+
+def _trigrams(nome_normalizado):
+    texto = f"  {nome_normalizado} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+# ---------------------------------------------------------------------------
+# Pontuação vetorizada
+# ---------------------------------------------------------------------------
+
+class _Registros:
+    """Colunas dos pacientes em arrays (trigramas codificados como inteiros)"""
+
+    def __init__(self, pacientes):
+        import numpy as np
+
+        self.ids = np.array([p['id'] for p in pacientes], dtype=np.int64)
+        # Trigramas da grafia pelo som: 'Souza' e 'Sousa' têm os mesmos
+        self.nomes = [" ".join(_sound(parte) for parte in normalize_name(p['nome_completo']).split())
+                      for p in pacientes]
+        codigos, por_nome = {}, {}
+        for nome in self.nomes:
+            if nome not in por_nome:
+                por_nome[nome] = np.array(sorted(codigos.setdefault(t, len(codigos)) for t in _trigrams(nome)),
+                                          dtype=np.int64)
+        self.trigramas = [por_nome[nome] for nome in self.nomes]
+        # Códigos inteiros dos campos comparados por igualdade (0 = não informado)
+        self.nascimento = self._encode([str(p.get('data_nascimento') or '')[:10] for p in pacientes])
+        self.telefone = self._encode([_digits(p.get('telefone'))[-8:] for p in pacientes])
+        self.sexo = self._encode([p.get('sexo') if p.get('sexo') in ('Masculino', 'Feminino') else ''
+                                  for p in pacientes])
+        self.cpf = self._encode([_digits(p.get('cpf')) for p in pacientes])
+
+    @staticmethod
+    def _encode(valores):
+        import numpy as np
+
+        codigos = {'': 0}
+        return np.array([codigos.setdefault(v, len(codigos)) for v in valores], dtype=np.int64)
+
+
+def _score(registros, linhas, colunas):
+    """
+    Matriz de pontuação entre os pacientes das posições linhas x colunas
+
+    Pares com sexos diferentes ou CPFs diferentes (ambos informados) recebem 0.
+    """
+    import numpy as np
+
+    # Matriz binária paciente x trigrama (só os trigramas presentes no bloco)
+    posicoes = np.concatenate([linhas, colunas])
+    listas = [registros.trigramas[i] for i in posicoes]
+    usados, coluna = np.unique(np.concatenate(listas), return_inverse=True)
+    matriz = np.zeros((len(posicoes), len(usados)), dtype=np.float32)
+    matriz[np.repeat(np.arange(len(posicoes)), [len(t) for t in listas]), coluna] = 1.0
+    a, b = matriz[:len(linhas)], matriz[len(linhas):]
+    tamanhos_a, tamanhos_b = a.sum(axis=1), b.sum(axis=1)
+    nome = 2 * (a @ b.T) / (tamanhos_a[:, None] + tamanhos_b[None, :])
+
+    def iguais(campo):
+        x, y = campo[linhas][:, None], campo[colunas][None, :]
+        return (x == y) & (x != 0)
+
+    def conflitam(campo):
+        x, y = campo[linhas][:, None], campo[colunas][None, :]
+        return (x != y) & (x != 0) & (y != 0)
+
+    pontuacao = (PESO_NOME * nome + PESO_NASCIMENTO * iguais(registros.nascimento)
+                 + PESO_TELEFONE * iguais(registros.telefone))
+    pontuacao[conflitam(registros.sexo) | conflitam(registros.cpf)] = 0.0
+    return pontuacao
+
+
+def _score_block(registros, posicoes, limiar):
+    """Pares (i, j, pontuação) de um bloco com pontuação >= limiar"""
+    import numpy as np
+
+    pontuacao = _score(registros, posicoes, posicoes)
+    i, j = np.nonzero(np.triu(pontuacao >= limiar, k=1))
+    return [(int(posicoes[x]), int(posicoes[y]), float(pontuacao[x, y])) for x, y in zip(i, j)]
+
+
+def find_duplicate_candidates(conn, limiar=DUPLICADOS_LIMIAR, workers=DUPLICADOS_WORKERS, progresso=None):
+    """
+    Pares de pacientes ativos que provavelmente são a mesma pessoa
+
+    Retorna um DataFrame (um par por linha, maior pontuação primeiro) com os
+    dois pacientes, a pontuação e a chave do bloco em que o par foi achado.
+    progresso(fração, mensagem) é chamado a cada lote de blocos concluído.
+    """
+    import numpy as np
+    import pandas as pd
+
+    progresso = progresso or (lambda fracao, mensagem=None: None)
+    pacientes = pd.read_sql("""
+        SELECT id, nome_completo, cpf, data_nascimento, sexo, telefone
+        FROM pacientes WHERE ativo = 1 ORDER BY id
+    """, conn)
+    registros_lista = pacientes.to_dict('records')
+    registros = _Registros(registros_lista)
+
+    # Blocos: chave -> posições dos pacientes
+    blocos = {}
+    for posicao, paciente in enumerate(registros_lista):
+        for chave in blocking_keys(paciente['nome_completo'], paciente['data_nascimento'], paciente['telefone']):
+            blocos.setdefault(chave, []).append(posicao)
+    blocos = [(chave, np.array(posicoes)) for chave, posicoes in blocos.items()
+              if 2 <= len(posicoes) <= DUPLICADOS_BLOCO_MAX]
+    progresso(0.0, f"{len(registros_lista)} pacientes, {len(blocos)} blocos")
+
+    def run_batch(lote):
+        return [(i, j, pontuacao, chave) for chave, posicoes in lote
+                for i, j, pontuacao in _score_block(registros, posicoes, limiar)]
+
+    # Lotes de blocos no pool (o produto de matrizes libera o GIL)
+    tamanho_lote = max(1, len(blocos) // (workers * 20))
+    lotes = [blocos[i:i + tamanho_lote] for i in range(0, len(blocos), tamanho_lote)]
+    pares = {}
+    with ThreadPoolExecutor(max(1, workers), thread_name_prefix="medstock360-duplicados") as pool:
+        for n, resultado in enumerate(pool.map(run_batch, lotes), start=1):
+            for i, j, pontuacao, chave in resultado:
+                if pontuacao > pares.get((i, j), (0.0,))[0]:
+                    pares[(i, j)] = (pontuacao, chave)
+            progresso(n / len(lotes), f"{n} de {len(lotes)} lotes de blocos, {len(pares)} pares")
+
+    colunas = ['id', 'nome_completo', 'data_nascimento', 'cpf']
+    linhas = []
+    for (i, j), (pontuacao, chave) in pares.items():
+        a, b = registros_lista[i], registros_lista[j]
+        linhas.append([a[c] for c in colunas] + [b[c] for c in colunas] + [round(pontuacao, 3), chave])
+    return pd.DataFrame(linhas, columns=[f"{c}_a" for c in colunas] + [f"{c}_b" for c in colunas]
+                        + ['pontuacao', 'bloco']).sort_values('pontuacao', ascending=False, ignore_index=True)
+
+
+# ---------------------------------------------------------------------------
+# Chaves persistidas e verificação no cadastro
+# ---------------------------------------------------------------------------
+
+def init_dedup_schema(cursor):
+    """Criar a tabela de chaves de bloqueio, a fila de pacientes a (re)indexar e os gatilhos"""
+    nova = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pacientes_chaves'"
+    ).fetchone() is None
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pacientes_chaves (
+            chave TEXT NOT NULL,
+            paciente_id INTEGER NOT NULL,
+            PRIMARY KEY (chave, paciente_id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pacientes_chaves_paciente ON pacientes_chaves (paciente_id)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS pacientes_chaves_pendentes (paciente_id INTEGER PRIMARY KEY)")
+    if nova:
+        # Pacientes já cadastrados entram na fila uma vez
+        cursor.execute("INSERT OR IGNORE INTO pacientes_chaves_pendentes SELECT id FROM pacientes")
+    for evento in ('INSERT', 'UPDATE OF nome_completo, data_nascimento, telefone, ativo'):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_pacientes_chaves_{evento.split()[0].lower()}
+            AFTER {evento} ON pacientes
+            BEGIN
+                INSERT OR IGNORE INTO pacientes_chaves_pendentes (paciente_id) VALUES (NEW.id);
+            END
+        """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_pacientes_chaves_delete
+        AFTER DELETE ON pacientes
+        BEGIN
+            DELETE FROM pacientes_chaves WHERE paciente_id = OLD.id;
+            DELETE FROM pacientes_chaves_pendentes WHERE paciente_id = OLD.id;
+        END
+    """)
+
+
+def refresh_patient_keys(conn, limite=None):
+    """Recalcular as chaves dos pacientes da fila (todos, ou os limite mais recentes); devolve quantos"""
+    processados = 0
+    while limite is None or processados < limite:
+        lote = DUPLICADOS_LOTE_CHAVES if limite is None else min(DUPLICADOS_LOTE_CHAVES, limite - processados)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            pacientes = conn.execute("""
+                SELECT p.id, p.nome_completo, p.data_nascimento, p.telefone, p.ativo
+                FROM pacientes_chaves_pendentes f
+                JOIN pacientes p ON p.id = f.paciente_id
+                ORDER BY f.paciente_id DESC
+                LIMIT ?
+            """, (lote,)).fetchall()
+            ids = [(p[0],) for p in pacientes]
+            conn.executemany("DELETE FROM pacientes_chaves WHERE paciente_id = ?", ids)
+            conn.executemany(
+                "INSERT OR IGNORE INTO pacientes_chaves (chave, paciente_id) VALUES (?, ?)",
+                [(chave, paciente_id) for paciente_id, nome, nascimento, telefone, ativo in pacientes if ativo
+                 for chave in blocking_keys(nome, nascimento, telefone)]
+            )
+            conn.executemany("DELETE FROM pacientes_chaves_pendentes WHERE paciente_id = ?", ids)
+            # Pendentes de pacientes que não existem mais
+            if len(pacientes) < lote:
+                conn.execute("DELETE FROM pacientes_chaves_pendentes "
+                             "WHERE paciente_id NOT IN (SELECT id FROM pacientes)")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        processados += len(pacientes)
+        if len(pacientes) < lote:
+            break
+    return processados
+
+
+def check_new_patient(db_manager, nome, data_nascimento=None, telefone=None, cpf=None, sexo=None,
+                      limiar=DUPLICADOS_LIMIAR, ignorar_id=None):
+    """
+    Pacientes já cadastrados parecidos com os dados informados
+
+    Retorna dicts (id, nome_completo, cpf, data_nascimento, pontuacao), maior
+    pontuação primeiro.
+    """
+    import numpy as np
+
+    chaves = blocking_keys(nome, data_nascimento, telefone)
+    if not chaves:
+        return []
+    conn = db_manager.get_connection()
+    try:
+        refresh_patient_keys(conn, DUPLICADOS_LOTE_CHAVES)
+        cursor = conn.execute(f"""
+            SELECT id, nome_completo, cpf, data_nascimento, sexo, telefone
+            FROM pacientes
+            WHERE ativo = 1 AND id IN (
+                SELECT paciente_id FROM pacientes_chaves WHERE chave IN ({', '.join('?' for _ in chaves)})
+            )
+        """, chaves)
+        colunas = [c[0] for c in cursor.description]
+        candidatos = [dict(zip(colunas, row)) for row in cursor if row[0] != ignorar_id]
+    finally:
+        conn.close()
+    if not candidatos:
+        return []
+
+    novo = {'id': 0, 'nome_completo': nome, 'cpf': cpf, 'data_nascimento': data_nascimento,
+            'sexo': sexo, 'telefone': telefone}
+    registros = _Registros([novo] + candidatos)
+    pontuacao = _score(registros, np.array([0]), np.arange(1, len(candidatos) + 1))[0]
+    parecidos = [
+        {**{c: candidato[c] for c in ('id', 'nome_completo', 'cpf', 'data_nascimento')},
+         'pontuacao': float(p)}
+        for candidato, p in zip(candidatos, pontuacao) if p >= limiar
+    ]
+    return sorted(parecidos, key=lambda c: c['pontuacao'], reverse=True)
@@ -0,0 +1,209 @@
+"""
+Gráficos Plotly com cache por impressão digital dos dados
+
+Os gráficos são identificados por um hash do DataFrame de entrada mais a
+especificação do gráfico. Em um acerto de cache a figura já construída vai
+para st.plotly_chart, sem passar de novo pelo plotly express.
+
+Séries temporais longas são reduzidas no servidor (MinMax + LTTB) para o
+número de pontos que a largura do gráfico consegue mostrar.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Limites do cache de figuras (por processo)
+FIGURE_CACHE_MAX_ENTRIES = int(os.getenv('FIGURE_CACHE_MAX_ENTRIES', '256'))
+FIGURE_CACHE_MAX_BYTES = int(os.getenv('FIGURE_CACHE_MAX_MB', '32')) * 1024 * 1024
+
+# Redução de séries temporais
+DEFAULT_CHART_WIDTH_PX = 700    # largura típica de um gráfico em meia coluna
+PIXELS_PER_POINT = 2            # densidade máxima útil de pontos na tela
+MINMAX_PRESELECT_RATIO = 8      # acima de N x o alvo, pré-seleciona com MinMax
+
+
+class FigureCache:
+    """Cache LRU de figuras com limite de entradas e de bytes (tamanho dos dados de cada figura)"""
+
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES, max_bytes=FIGURE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Obter a figura (ou None) e marcá-la como usada"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, figure, size):
+        """Guardar a figura com o seu tamanho em bytes, descartando as menos usadas"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (figure, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+
+    def clear(self):
+        """Esvaziar o cache"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Estatísticas de uso do cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+figure_cache = FigureCache()
+
+
+def data_fingerprint(df):
+    """Hash do conteúdo, colunas e tipos do DataFrame"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+def _build_figure(kind, df, layout, hlines, px_kwargs):
+    """Construir a figura com plotly express"""
+    import plotly.express as px
+
+    fig = getattr(px, kind)(df, **px_kwargs)
+    if layout:
+        fig.update_layout(**layout)
+    for hline in hlines or []:
+        fig.add_hline(**hline)
+    return fig
+
+
+def show_chart(kind, df, layout=None, hlines=None, **px_kwargs):
+    """
+    Exibir um gráfico plotly express (px.<kind>) usando o cache de figuras
+
+    layout: argumentos para fig.update_layout
+    hlines: lista de argumentos para fig.add_hline
+    """
+    spec_key = json.dumps([kind, layout, hlines, px_kwargs], sort_keys=True, default=str)
+    key = (data_fingerprint(df), spec_key)
+
+    fig = figure_cache.get(key)
+    if fig is None:
+        fig = _build_figure(kind, df, layout, hlines, px_kwargs)
+        # A figura guarda uma cópia das colunas usadas: o tamanho do DataFrame estima o dela
+        figure_cache.put(key, fig, int(df.memory_usage(deep=True).sum()))
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Índices escolhidos pelo Largest-Triangle-Three-Buckets
+
+    Mantém o primeiro e o último ponto e, em cada bucket intermediário, o
+    ponto que forma o maior triângulo com o ponto anterior escolhido e a
+    média do bucket seguinte.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    sampled = np.empty(threshold, dtype=np.int64)
+    sampled[0] = 0
+    sampled[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        sampled[i + 1] = a
+
+    return sampled
+
+
+def minmax_indices(y, n_buckets):
+    """Índices do mínimo e do máximo de cada bucket (preserva picos e vales)"""
+    n = len(y)
+    if n_buckets * 2 >= n:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    indices = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        bucket = y[start:end]
+        indices.append(start + int(np.argmin(bucket)))
+        indices.append(start + int(np.argmax(bucket)))
+    return np.unique(np.asarray(indices, dtype=np.int64))
+
+
+def downsample_series(df, x, y, width_px=DEFAULT_CHART_WIDTH_PX):
+    """
+    Reduzir uma série para o número de pontos visíveis na largura do gráfico
+
+    Séries curtas são devolvidas intactas; séries longas passam por LTTB e,
+    quando muito longas (ex.: vários anos de dados diários), por uma
+    pré-seleção MinMax antes do LTTB.
+    """
+    target = max(int(width_px / PIXELS_PER_POINT), 3)
+    n = len(df)
+    if n <= target:
+        return df
+
+    df = df.sort_values(x, kind='stable').reset_index(drop=True)
+    if pd.api.types.is_numeric_dtype(df[x]):
+        x_values = df[x].to_numpy(dtype=float)
+    else:
+        x_values = pd.to_datetime(df[x]).to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(float)
+    y_values = df[y].to_numpy(dtype=float)
+
+    candidates = np.arange(n)
+    if n > target * MINMAX_PRESELECT_RATIO:
+        candidates = minmax_indices(y_values, target * 2)
+
+    selected = candidates[lttb_indices(x_values[candidates], y_values[candidates], target)]
+    return df.iloc[selected].reset_index(drop=True)
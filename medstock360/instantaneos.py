@@ -0,0 +1,280 @@
+"""
+Relatórios padrão pré-calculados (instantâneos)
+
+Os relatórios de Medicamentos e Pacientes da página de relatórios respondem
+às mesmas perguntas para todos os usuários. SnapshotScheduler (uma thread
+por processo e banco) os recalcula todas as noites (SNAPSHOT_HOUR) e depois
+de escritas grandes: gatilhos contam as alterações em cada tabela de origem
+(instantaneos_fontes) e um relatório cujas fontes somam
+SNAPSHOT_REFRESH_CHANGES alterações desde o último cálculo é refeito.
+
+Cada resultado fica em uma tabela instantaneo_<relatorio>, com a hora do
+cálculo em relatorios_instantaneos; a página só lê essa tabela. O cálculo lê
+fora de transação de escrita e grava o resultado em uma transação curta.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from medstock360.vencimentos import FAIXA_ATE_60_DIAS, expiry_buckets_stale, refresh_expiry_buckets
+
+SNAPSHOT_HOUR = int(os.getenv('SNAPSHOT_HOUR', '2'))
+SNAPSHOT_REFRESH_CHANGES = int(os.getenv('SNAPSHOT_REFRESH_CHANGES', '500'))
+SNAPSHOT_CHECK_SECONDS = 60
+
+# relatorio: tabelas de origem e consulta
+RELATORIOS_INSTANTANEOS = {
+    'medicamentos_categoria': {
+        'fontes': ['medicamentos'],
+        'sql': """
+            SELECT
+                categoria,
+                COUNT(*) as quantidade,
+                SUM(CASE WHEN controlado = 1 THEN 1 ELSE 0 END) as controlados
+            FROM medicamentos
+            WHERE ativo = 1 AND categoria IS NOT NULL
+            GROUP BY categoria
+            ORDER BY quantidade DESC
+        """,
+    },
+    'estoque_atual': {
+        'fontes': ['lotes', 'medicamentos'],
+        'sql': """
+            SELECT
+                m.nome as medicamento,
+                m.categoria,
+                l.numero_lote,
+                l.quantidade_atual,
+                l.data_validade,
+                l.local_armazenamento
+            FROM lotes l
+            JOIN medicamentos m ON l.medicamento_id = m.id
+            WHERE l.ativo = 1 AND m.ativo = 1 AND l.quantidade_atual > 0
+            ORDER BY m.nome, l.data_validade
+        """,
+    },
+    'vencimento_proximo': {
+        'fontes': ['lotes', 'medicamentos'],
+        'sql': f"""
+            SELECT
+                m.nome as medicamento,
+                l.numero_lote,
+                v.quantidade_atual,
+                v.data_validade,
+                v.dias_para_vencer,
+                v.valor_em_risco
+            FROM lotes_vencimento v
+            JOIN lotes l ON v.lote_id = l.id
+            JOIN medicamentos m ON v.medicamento_id = m.id
+            WHERE m.ativo = 1
+            AND v.quantidade_atual > 0
+            AND v.faixa <= {FAIXA_ATE_60_DIAS}
+            ORDER BY v.faixa, v.data_validade
+        """,
+    },
+    'mais_prescritos': {
+        'fontes': ['receitas', 'receita_itens', 'medicamentos'],
+        'sql': """
+            SELECT
+                m.nome as medicamento,
+                m.principio_ativo,
+                COUNT(*) as vezes_prescrito,
+                SUM(ri.quantidade) as quantidade_total
+            FROM receita_itens ri
+            JOIN medicamentos m ON ri.medicamento_id = m.id
+            JOIN receitas r ON ri.receita_id = r.id
+            WHERE r.data_emissao >= DATE('now', '-3 months')
+            GROUP BY m.id, m.nome, m.principio_ativo
+            ORDER BY vezes_prescrito DESC
+            LIMIT 20
+        """,
+    },
+    'pacientes_total': {
+        'fontes': ['pacientes'],
+        'sql': "SELECT COUNT(*) as count FROM pacientes WHERE ativo = 1",
+    },
+    'pacientes_sexo': {
+        'fontes': ['pacientes'],
+        'sql': """
+            SELECT sexo, COUNT(*) as quantidade
+            FROM pacientes
+            WHERE ativo = 1 AND sexo IS NOT NULL
+            GROUP BY sexo
+        """,
+    },
+    'pacientes_idade': {
+        'fontes': ['pacientes'],
+        'sql': """
+            SELECT
+                CASE
+                    WHEN (julianday('now') - julianday(data_nascimento))/365.25 < 18 THEN 'Menor de 18'
+                    WHEN (julianday('now') - julianday(data_nascimento))/365.25 < 65 THEN '18-64 anos'
+                    ELSE '65+ anos'
+                END as faixa_etaria,
+                COUNT(*) as quantidade
+            FROM pacientes
+            WHERE ativo = 1 AND data_nascimento IS NOT NULL
+            GROUP BY faixa_etaria
+        """,
+    },
+}
+
+FONTES_INSTANTANEOS = sorted({f for r in RELATORIOS_INSTANTANEOS.values() for f in r['fontes']})
+
+
+def init_snapshot_schema(cursor):
+    """Criar as tabelas de controle e os gatilhos que contam as alterações nas fontes"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS relatorios_instantaneos (
+            relatorio TEXT PRIMARY KEY,
+            calculado_em TIMESTAMP NOT NULL,
+            duracao_ms REAL,
+            linhas INTEGER,
+            alteracoes INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS instantaneos_fontes (
+            tabela TEXT PRIMARY KEY,
+            alteracoes INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for tabela in FONTES_INSTANTANEOS:
+        cursor.execute("INSERT OR IGNORE INTO instantaneos_fontes (tabela) VALUES (?)", (tabela,))
+        for evento in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_instantaneos_{tabela}_{evento.lower()}
+                AFTER {evento} ON {tabela}
+                BEGIN
+                    UPDATE instantaneos_fontes SET alteracoes = alteracoes + 1 WHERE tabela = '{tabela}';
+                END
+            """)
+
+
+def _source_changes(conn):
+    """{tabela: alterações acumuladas}"""
+    return dict(conn.execute("SELECT tabela, alteracoes FROM instantaneos_fontes").fetchall())
+
+
+def refresh_snapshots(conn, relatorios=None):
+    """Recalcular os relatórios (todos por padrão); devolve {relatorio: ms}"""
+    relatorios = list(RELATORIOS_INSTANTANEOS) if relatorios is None else relatorios
+    if any('lotes' in RELATORIOS_INSTANTANEOS[r]['fontes'] for r in relatorios) and expiry_buckets_stale(conn):
+        refresh_expiry_buckets(conn)
+
+    duracoes = {}
+    for relatorio in relatorios:
+        inicio = time.perf_counter()
+        alteracoes = _source_changes(conn)
+        cursor = conn.execute(RELATORIOS_INSTANTANEOS[relatorio]['sql'])
+        colunas = [c[0] for c in cursor.description]
+        linhas = cursor.fetchall()
+
+        # Troca em uma transação curta: quem lê vê o resultado antigo ou o novo
+        tabela = f"instantaneo_{relatorio}"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DROP TABLE IF EXISTS {tabela}")
+            conn.execute(f"CREATE TABLE {tabela} ({', '.join(colunas)})")
+            conn.executemany(f"INSERT INTO {tabela} VALUES ({', '.join('?' for _ in colunas)})", linhas)
+            duracoes[relatorio] = (time.perf_counter() - inicio) * 1000
+            conn.execute("""
+                INSERT INTO relatorios_instantaneos (relatorio, calculado_em, duracao_ms, linhas, alteracoes)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (relatorio) DO UPDATE SET
+                    calculado_em = excluded.calculado_em,
+                    duracao_ms = excluded.duracao_ms,
+                    linhas = excluded.linhas,
+                    alteracoes = excluded.alteracoes
+            """, (relatorio, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), duracoes[relatorio], len(linhas),
+                  sum(alteracoes.get(f, 0) for f in RELATORIOS_INSTANTANEOS[relatorio]['fontes'])))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return duracoes
+
+
+def stale_snapshots(conn, agora=None):
+    """Relatórios a recalcular: nunca calculados, da noite anterior ou com muitas alterações"""
+    agora = agora or datetime.now()
+    alteracoes = _source_changes(conn)
+    calculados = {
+        relatorio: (datetime.strptime(calculado_em, '%Y-%m-%d %H:%M:%S'), base)
+        for relatorio, calculado_em, base in conn.execute(
+            "SELECT relatorio, calculado_em, alteracoes FROM relatorios_instantaneos"
+        )
+    }
+    # Cálculo noturno: último horário SNAPSHOT_HOUR já passado
+    virada = agora.replace(hour=SNAPSHOT_HOUR, minute=0, second=0, microsecond=0)
+    if virada > agora:
+        virada -= timedelta(days=1)
+    velhos = []
+    for relatorio, definicao in RELATORIOS_INSTANTANEOS.items():
+        if relatorio not in calculados:
+            velhos.append(relatorio)
+            continue
+        calculado_em, base = calculados[relatorio]
+        mudancas = sum(alteracoes.get(f, 0) for f in definicao['fontes']) - base
+        if calculado_em < virada or mudancas >= SNAPSHOT_REFRESH_CHANGES:
+            velhos.append(relatorio)
+    return velhos
+
+
+def load_snapshot(conn, relatorio):
+    """(DataFrame, calculado_em) do relatório, calculando-o se ainda não existir"""
+    import pandas as pd
+
+    row = conn.execute("SELECT calculado_em FROM relatorios_instantaneos WHERE relatorio = ?",
+                       (relatorio,)).fetchone()
+    if row is None:
+        refresh_snapshots(conn, [relatorio])
+        row = conn.execute("SELECT calculado_em FROM relatorios_instantaneos WHERE relatorio = ?",
+                           (relatorio,)).fetchone()
+    return pd.read_sql(f"SELECT * FROM instantaneo_{relatorio}", conn), row[0]
+
+
+class SnapshotScheduler(threading.Thread):
+    """Thread que recalcula os relatórios padrão à noite e após escritas grandes"""
+
+    def __init__(self, db_manager, interval=SNAPSHOT_CHECK_SECONDS):
+        super().__init__(name="medstock360-instantaneos", daemon=True)
+        self.db = db_manager
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run_once(self):
+        """Recalcular os relatórios velhos; devolve {relatorio: ms}"""
+        conn = self.db.get_connection()
+        try:
+            return refresh_snapshots(conn, stale_snapshots(conn))
+        finally:
+            conn.close()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[instantaneos] Erro ao recalcular relatórios: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# Um agendador por banco (unidade) no processo
+_schedulers = {}
+_scheduler_lock = threading.Lock()
+
+
+def start_snapshot_scheduler(db_manager):
+    """Iniciar (uma vez por processo e banco) o recálculo dos relatórios padrão"""
+    with _scheduler_lock:
+        scheduler = _schedulers.get(db_manager.db_path)
+        if scheduler is None or not scheduler.is_alive():
+            scheduler = _schedulers[db_manager.db_path] = SnapshotScheduler(db_manager)
+            scheduler.start()
+    return scheduler
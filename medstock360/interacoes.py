@@ -0,0 +1,270 @@
+"""
+Verificação de interações medicamentosas na prescrição
+
+A tabela interacoes_medicamentosas guarda pares de princípios ativos
+(normalizados: minúsculas, sem acentos) com a gravidade e a descrição. O
+índice em memória (InteractionIndex) codifica cada princípio ativo como um
+inteiro e guarda, para cada um, os vizinhos em um array ordenado (formato
+CSR: inicio/vizinhos/gravidades): verificar um par é uma busca binária.
+
+Gatilhos incrementam a versão em interacoes_controle a cada alteração na
+tabela de interações ou no princípio ativo de um medicamento; o índice do
+processo é recarregado na próxima verificação, sem reiniciar o servidor.
+
+Uso (carga da tabela a partir de CSV principio_a,principio_b,gravidade,descricao):
+    python -m medstock360.interacoes interacoes.csv
+"""
+
+import csv
+import re
+import sys
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import combinations
+
+# Gravidades, da mais grave para a mais leve
+GRAVIDADES = ['grave', 'moderada', 'leve']
+ICONES_GRAVIDADE = {'grave': '🔴', 'moderada': '🟠', 'leve': '🟡'}
+
+# Receitas dispensadas nestes dias contam como tratamento em andamento
+INTERACAO_JANELA_DIAS = 30
+
+_SEPARADORES = re.compile(r"\s*(?:\+|/|;|,|\be\b)\s*")
+
+
+def normalize_ingredient(texto):
+    """'Ácido Acetilsalicílico ' -> 'acido acetilsalicilico'"""
+    texto = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode()
+    return " ".join(texto.lower().split())
+
+
+def split_ingredients(principio_ativo):
+    """Princípios ativos de uma associação ('Paracetamol + Codeína' -> 2)"""
+    return [p for p in (normalize_ingredient(parte) for parte in _SEPARADORES.split(principio_ativo or '')) if p]
+
+
+def init_interaction_schema(cursor):
+    """Criar a tabela de interações, a versão do índice e os gatilhos que a incrementam"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interacoes_medicamentosas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            principio_a TEXT NOT NULL,
+            principio_b TEXT NOT NULL,
+            gravidade TEXT NOT NULL CHECK (gravidade IN ('grave', 'moderada', 'leve')),
+            descricao TEXT,
+            UNIQUE (principio_a, principio_b),
+            CHECK (principio_a < principio_b)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS interacoes_controle (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            versao INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO interacoes_controle (id, versao) VALUES (1, 0)")
+    gatilhos = {
+        'interacoes_medicamentosas': ['INSERT', 'UPDATE', 'DELETE'],
+        'medicamentos': ['INSERT', 'UPDATE OF principio_ativo, ativo', 'DELETE'],
+    }
+    for tabela, eventos in gatilhos.items():
+        for evento in eventos:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_interacoes_versao_{tabela}_{evento.split()[0].lower()}
+                AFTER {evento} ON {tabela}
+                BEGIN
+                    UPDATE interacoes_controle SET versao = versao + 1 WHERE id = 1;
+                END
+            """)
+
+
+class InteractionIndex:
+    """Pares de princípios ativos que interagem, codificados em arrays ordenados"""
+
+    def __init__(self, interacoes, medicamentos, versao=None):
+        """
+        interacoes: [(principio_a, principio_b, gravidade, descricao)]
+        medicamentos: [(medicamento_id, principio_ativo)]
+        """
+        self.versao = versao
+        self.codigos = {}
+        pares = {}
+        for principio_a, principio_b, gravidade, descricao in interacoes:
+            a = self.codigos.setdefault(normalize_ingredient(principio_a), len(self.codigos))
+            b = self.codigos.setdefault(normalize_ingredient(principio_b), len(self.codigos))
+            if a != b:
+                pares[(a, b)] = pares[(b, a)] = (GRAVIDADES.index(gravidade), descricao)
+
+        # CSR: vizinhos de c em vizinhos[inicio[c]:inicio[c + 1]], em ordem crescente
+        self.inicio = array('I', [0] * (len(self.codigos) + 1))
+        for a, _ in pares:
+            self.inicio[a + 1] += 1
+        for c in range(len(self.codigos)):
+            self.inicio[c + 1] += self.inicio[c]
+        ordenados = sorted(pares)
+        self.vizinhos = array('I', (b for _, b in ordenados))
+        self.gravidades = array('B', (pares[par][0] for par in ordenados))
+        self.descricoes = [pares[par][1] for par in ordenados]
+
+        # Medicamento -> códigos dos seus princípios ativos (só os que têm interações)
+        self.medicamentos = {
+            medicamento_id: tuple(sorted({self.codigos[p] for p in split_ingredients(principio_ativo)
+                                          if p in self.codigos}))
+            for medicamento_id, principio_ativo in medicamentos
+        }
+        self.nomes = {codigo: nome for nome, codigo in self.codigos.items()}
+
+    def check_pair(self, a, b):
+        """(gravidade, descrição) da interação entre os códigos a e b, ou None"""
+        inicio, fim = self.inicio[a], self.inicio[a + 1]
+        i = bisect_left(self.vizinhos, b, inicio, fim)
+        if i < fim and self.vizinhos[i] == b:
+            return GRAVIDADES[self.gravidades[i]], self.descricoes[i]
+        return None
+
+    def check(self, novos, em_uso=()):
+        """
+        Interações entre os medicamentos novos e deles com os em uso
+
+        novos/em_uso: ids de medicamentos. Retorna dicts com os dois ids, os
+        princípios ativos, a gravidade e a descrição, dos mais graves primeiro.
+        Um medicamento não é comparado com ele mesmo: os princípios de uma
+        associação em dose fixa (Paracetamol + Codeína) não geram alerta.
+        """
+        alertas = []
+        vistos = set()
+
+        def compare(id_a, id_b, em_uso_b):
+            if id_a == id_b:
+                return
+            for a in self.medicamentos.get(id_a, ()):
+                for b in self.medicamentos.get(id_b, ()):
+                    chave = (min(id_a, id_b), max(id_a, id_b), min(a, b), max(a, b))
+                    if chave in vistos:
+                        continue
+                    interacao = self.check_pair(a, b)
+                    if interacao:
+                        vistos.add(chave)
+                        alertas.append({
+                            'medicamento_a': id_a, 'medicamento_b': id_b,
+                            'principio_a': self.nomes[a], 'principio_b': self.nomes[b],
+                            'gravidade': interacao[0], 'descricao': interacao[1], 'em_uso': em_uso_b,
+                        })
+
+        novos = list(dict.fromkeys(novos))
+        for id_a, id_b in combinations(novos, 2):
+            compare(id_a, id_b, False)
+        for id_a in novos:
+            for id_b in em_uso:
+                compare(id_a, id_b, True)
+        return sorted(alertas, key=lambda alerta: GRAVIDADES.index(alerta['gravidade']))
+
+
+def interaction_version(conn):
+    """Versão atual das interações (incrementada pelos gatilhos)"""
+    row = conn.execute("SELECT versao FROM interacoes_controle WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+# Índice por banco (unidade) no processo
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+def get_interaction_index(db_manager, conn=None):
+    """Índice do banco, recarregado se a tabela ou os medicamentos mudaram"""
+    proprio = conn is None
+    conn = conn or db_manager.get_connection()
+    try:
+        versao = interaction_version(conn)
+        indice = _indices.get(db_manager.db_path)
+        if indice is not None and indice.versao == versao:
+            return indice
+        with _indices_lock:
+            indice = _indices.get(db_manager.db_path)
+            if indice is None or indice.versao != versao:
+                indice = _indices[db_manager.db_path] = InteractionIndex(
+                    conn.execute("SELECT principio_a, principio_b, gravidade, descricao FROM interacoes_medicamentosas"),
+                    conn.execute("SELECT id, principio_ativo FROM medicamentos WHERE ativo = 1"),
+                    versao,
+                )
+        return indice
+    finally:
+        if proprio:
+            conn.close()
+
+
+def active_medications(conn, paciente_id, hoje=None):
+    """Medicamentos das receitas ativas do paciente e das dispensadas nos últimos INTERACAO_JANELA_DIAS"""
+    inicio = (hoje or date.today()) - timedelta(days=INTERACAO_JANELA_DIAS)
+    return [row[0] for row in conn.execute("""
+        SELECT DISTINCT ri.medicamento_id
+        FROM receitas r
+        JOIN receita_itens ri ON ri.receita_id = r.id
+        WHERE r.paciente_id = ?
+        AND (r.status = 'Ativa' OR (r.status = 'Dispensada' AND r.data_emissao >= ?))
+    """, (int(paciente_id), inicio.isoformat()))]
+
+
+def check_prescription(db_manager, medicamento_ids, paciente_id=None):
+    """Interações entre os itens da receita e com os medicamentos em uso pelo paciente"""
+    conn = db_manager.get_connection()
+    try:
+        indice = get_interaction_index(db_manager, conn)
+        em_uso = active_medications(conn, paciente_id) if paciente_id is not None else []
+    finally:
+        conn.close()
+    return indice.check(medicamento_ids, [m for m in em_uso if m not in set(medicamento_ids)])
+
+
+def load_interactions(conn, linhas):
+    """Gravar (ou atualizar) interações [(principio_a, principio_b, gravidade, descricao)]; devolve quantas"""
+    registros = []
+    for principio_a, principio_b, gravidade, descricao in linhas:
+        a, b = sorted((normalize_ingredient(principio_a), normalize_ingredient(principio_b)))
+        gravidade = normalize_ingredient(gravidade)
+        if not a or not b or a == b or gravidade not in GRAVIDADES:
+            raise ValueError(f"Interação inválida: {principio_a} / {principio_b} ({gravidade})")
+        registros.append((a, b, gravidade, descricao))
+    conn.executemany("""
+        INSERT INTO interacoes_medicamentosas (principio_a, principio_b, gravidade, descricao)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (principio_a, principio_b) DO UPDATE SET
+            gravidade = excluded.gravidade,
+            descricao = excluded.descricao
+    """, registros)
+    conn.commit()
+    return len(registros)
+
+
+def read_interactions_csv(arquivo):
+    """Linhas de um CSV com cabeçalho principio_a,principio_b,gravidade,descricao"""
+    return [
+        (linha['principio_a'], linha['principio_b'], linha['gravidade'], linha.get('descricao'))
+        for linha in csv.DictReader(arquivo)
+    ]
+
+
+def main():
+    """Carregar interações de um CSV no banco (o app recarrega o índice sozinho)"""
+    from medstock360.unidades import get_shard_router
+
+    if len(sys.argv) != 2:
+        print("Uso: python -m medstock360.interacoes interacoes.csv")
+        return 1
+    with open(sys.argv[1], newline='', encoding='utf-8') as arquivo:
+        linhas = read_interactions_csv(arquivo)
+    for unidade, db_manager in get_shard_router().managers().items():
+        conn = db_manager.get_connection()
+        try:
+            print(f"[interacoes] {unidade}: {load_interactions(conn, linhas)} interações carregadas")
+        finally:
+            conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
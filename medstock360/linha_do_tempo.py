@@ -0,0 +1,211 @@
+"""
+Linha do tempo clínica do paciente
+
+Consultas, receitas (com os itens) e movimentações de estoque ligadas às
+receitas do paciente vêm de uma única consulta UNION ALL; cada ramo usa um
+índice (paciente_id, data) e lê no máximo uma página, do mais recente para o
+mais antigo. As páginas seguintes continuam a partir da última linha
+(paginação por chave, sem OFFSET).
+
+Gatilhos incrementam a versão do paciente (pacientes_versao) a cada escrita
+que o envolve; as páginas ficam em cache até a versão mudar.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+TIMELINE_PAGE_SIZE = 50
+TIMELINE_CACHE_MAX_ENTRIES = int(os.getenv('TIMELINE_CACHE_MAX_ENTRIES', '500'))
+
+# Antes de qualquer evento: início da primeira página
+_INICIO = ('9999-12-31 23:59:59', '~', 0)
+
+_BUMP_SQL = """
+    INSERT INTO pacientes_versao (paciente_id, versao) SELECT {paciente}, 1 WHERE {condicao}
+    ON CONFLICT (paciente_id) DO UPDATE SET versao = versao + 1;
+"""
+
+# Eventos em ordem decrescente de (data, tipo, ref_id)
+_TIMELINE_SQL = """
+    SELECT * FROM (
+        SELECT * FROM (
+            SELECT
+                c.data_consulta as data, 'consulta' as tipo, c.id as ref_id,
+                COALESCE(c.tipo_consulta, 'Consulta') as titulo, c.status,
+                c.motivo as detalhe, c.diagnostico as observacao,
+                u.nome_completo as profissional
+            FROM consultas c
+            LEFT JOIN usuarios u ON u.id = c.medico_id
+            WHERE c.paciente_id = :paciente AND c.data_consulta <= :data
+            AND (c.data_consulta, 'consulta', c.id) < (:data, :tipo, :ref_id)
+            ORDER BY c.data_consulta DESC, c.id DESC
+            LIMIT :limite
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT
+                r.data_emissao, 'receita', r.id,
+                'Receita #' || r.id, r.status,
+                (SELECT group_concat(m.nome || COALESCE(' ' || ri.dosagem, ''), '; ')
+                 FROM receita_itens ri JOIN medicamentos m ON m.id = ri.medicamento_id
+                 WHERE ri.receita_id = r.id),
+                r.observacoes,
+                u.nome_completo
+            FROM receitas r
+            LEFT JOIN usuarios u ON u.id = r.medico_id
+            WHERE r.paciente_id = :paciente AND r.data_emissao <= :data
+            AND (r.data_emissao, 'receita', r.id) < (:data, :tipo, :ref_id)
+            ORDER BY r.data_emissao DESC, r.id DESC
+            LIMIT :limite
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT
+                mv.data_movimento, 'movimentacao', mv.id,
+                mv.tipo_movimento, NULL,
+                med.nome || ' - ' || mv.quantidade || ' un. (receita #' || r.id || ')',
+                mv.motivo,
+                u.nome_completo
+            FROM receitas r
+            JOIN movimentacoes mv ON mv.receita_id = r.id
+            JOIN lotes l ON l.id = mv.lote_id
+            JOIN medicamentos med ON med.id = l.medicamento_id
+            LEFT JOIN usuarios u ON u.id = mv.responsavel
+            WHERE r.paciente_id = :paciente AND mv.data_movimento <= :data
+            AND (mv.data_movimento, 'movimentacao', mv.id) < (:data, :tipo, :ref_id)
+            ORDER BY mv.data_movimento DESC, mv.id DESC
+            LIMIT :limite
+        )
+    )
+    ORDER BY data DESC, tipo DESC, ref_id DESC
+    LIMIT :limite
+"""
+
+
+def init_timeline_schema(cursor):
+    """Criar os índices por paciente, a versão por paciente e os gatilhos que a incrementam"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_consultas_paciente_data ON consultas (paciente_id, data_consulta)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_receitas_paciente_data ON receitas (paciente_id, data_emissao)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_receita_itens_receita ON receita_itens (receita_id)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_movimentacoes_receita_data
+        ON movimentacoes (receita_id, data_movimento) WHERE receita_id IS NOT NULL
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pacientes_versao (
+            paciente_id INTEGER PRIMARY KEY,
+            versao INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    # Paciente afetado por cada tabela (NEW/OLD), e quando a linha o envolve
+    paciente_por_tabela = {
+        'consultas': ("{linha}.paciente_id", "1"),
+        'receitas': ("{linha}.paciente_id", "1"),
+        'receita_itens': ("(SELECT paciente_id FROM receitas WHERE id = {linha}.receita_id)", "1"),
+        'movimentacoes': ("(SELECT paciente_id FROM receitas WHERE id = {linha}.receita_id)",
+                          "{linha}.receita_id IS NOT NULL"),
+    }
+    for tabela, (paciente, condicao) in paciente_por_tabela.items():
+        for evento, linhas in (('INSERT', ['NEW']), ('UPDATE', ['NEW', 'OLD']), ('DELETE', ['OLD'])):
+            corpo = "".join(
+                _BUMP_SQL.format(paciente=paciente.format(linha=linha),
+                                 condicao=f"({condicao.format(linha=linha)}) AND "
+                                          f"{paciente.format(linha=linha)} IS NOT NULL")
+                for linha in linhas
+            )
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_pacientes_versao_{tabela}_{evento.lower()}
+                AFTER {evento} ON {tabela}
+                BEGIN
+                    {corpo}
+                END
+            """)
+
+
+class TimelineCache:
+    """Cache LRU das páginas da linha do tempo, válido para uma versão do paciente"""
+
+    def __init__(self, max_entries=TIMELINE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, versao):
+        """Obter a página (ou None se ausente ou de outra versão do paciente)"""
+        with self._lock:
+            entrada = self._entries.get(key)
+            if entrada is None or entrada[0] != versao:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entrada[1]
+
+    def put(self, key, versao, pagina):
+        with self._lock:
+            self._entries[key] = (versao, pagina)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Esvaziar o cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Estatísticas de uso do cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+timeline_cache = TimelineCache()
+
+
+def patient_version(conn, paciente_id):
+    """Versão atual do paciente (incrementada a cada escrita que o envolve)"""
+    row = conn.execute("SELECT versao FROM pacientes_versao WHERE paciente_id = ?", (paciente_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def load_timeline_page(db_manager, paciente_id, cursor=None, limite=TIMELINE_PAGE_SIZE):
+    """
+    Uma página de eventos do paciente, do mais recente para o mais antigo
+
+    cursor: None (primeira página) ou o cursor devolvido pela página
+    anterior. Retorna (eventos, próximo cursor ou None na última página).
+    """
+    paciente_id = int(paciente_id)
+    cursor = tuple(cursor) if cursor else _INICIO
+    key = (db_manager.db_path, paciente_id, cursor, limite)
+
+    conn = db_manager.get_connection()
+    try:
+        versao = patient_version(conn, paciente_id)
+        pagina = timeline_cache.get(key, versao)
+        if pagina is not None:
+            return pagina
+
+        resultado = conn.execute(_TIMELINE_SQL, {
+            'paciente': paciente_id, 'data': cursor[0], 'tipo': cursor[1], 'ref_id': cursor[2],
+            'limite': limite,
+        })
+        colunas = [col[0] for col in resultado.description]
+        eventos = [dict(zip(colunas, row)) for row in resultado]
+    finally:
+        conn.close()
+
+    ultimo = eventos[-1] if len(eventos) == limite else None
+    pagina = (eventos, (ultimo['data'], ultimo['tipo'], ultimo['ref_id']) if ultimo else None)
+    timeline_cache.put(key, versao, pagina)
+    return pagina
@@ -0,0 +1,176 @@
+"""
+Orçamento de tempo e controle de admissão para consultas pesadas
+
+Relatórios de período longo (Relatórios > Consultas, listagem de receitas de
+90 dias ou personalizada) rodam dentro de heavy_query:
+
+- admissão: no máximo HEAVY_QUERIES_PER_PROCESS consultas pesadas ao mesmo
+  tempo no processo e HEAVY_QUERIES_PER_USER por usuário; quem não consegue
+  vaga em ADMISSION_WAIT_SECONDS recebe uma mensagem em vez de ficar na fila;
+- orçamento: um progress handler do sqlite3 interrompe o comando que passar
+  de HEAVY_QUERY_BUDGET_MS, ou cuja sessão do Streamlit já pediu para parar
+  (usuário mudou de página ou de filtro). A interrupção vira TimeoutError com
+  uma mensagem para o usuário, a transação é desfeita e a conexão volta
+  limpa para o pool.
+
+Prescrição e dispensação não passam por aqui (faixa rápida): não esperam
+vaga e, com o banco em WAL, não ficam bloqueadas pelas leituras longas.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+HEAVY_QUERY_BUDGET_MS = float(os.getenv('HEAVY_QUERY_BUDGET_MS', '5000'))
+HEAVY_QUERIES_PER_PROCESS = int(os.getenv('HEAVY_QUERIES_PER_PROCESS', '2'))
+HEAVY_QUERIES_PER_USER = int(os.getenv('HEAVY_QUERIES_PER_USER', '1'))
+ADMISSION_WAIT_SECONDS = float(os.getenv('ADMISSION_WAIT_SECONDS', '3'))
+
+# Instruções da VM do SQLite entre duas verificações do orçamento
+PROGRESS_HANDLER_OPCODES = 10000
+
+
+class AdmissionController:
+    """Limita as consultas pesadas simultâneas no processo e por usuário"""
+
+    def __init__(self, por_processo=HEAVY_QUERIES_PER_PROCESS, por_usuario=HEAVY_QUERIES_PER_USER):
+        self.por_processo = por_processo
+        self.por_usuario = por_usuario
+        self._ativas = 0
+        self._por_usuario = Counter()
+        self._recusadas = 0
+        self._cond = threading.Condition()
+
+    def _livre(self, usuario_id):
+        return (self._ativas < self.por_processo
+                and self._por_usuario[usuario_id] < self.por_usuario)
+
+    def acquire(self, usuario_id, timeout=ADMISSION_WAIT_SECONDS):
+        """Reservar uma vaga (espera até timeout segundos); False se não houver"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._livre(usuario_id), timeout):
+                self._recusadas += 1
+                return False
+            self._ativas += 1
+            self._por_usuario[usuario_id] += 1
+            return True
+
+    def release(self, usuario_id):
+        with self._cond:
+            self._ativas -= 1
+            self._por_usuario[usuario_id] -= 1
+            if not self._por_usuario[usuario_id]:
+                del self._por_usuario[usuario_id]
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {'ativas': self._ativas, 'limite': self.por_processo,
+                    'usuarios': len(self._por_usuario), 'recusadas': self._recusadas}
+
+
+# Controlador do processo
+admission_controller = AdmissionController()
+
+
+# Versão do Streamlit em que session_stop_requested foi verificado (requirements.txt)
+STREAMLIT_VERSAO_CANCELAMENTO = "1.28.0"
+
+_aviso_cancelamento = []
+
+
+def _cancellation_unavailable(motivo):
+    """Avisar uma vez que o cancelamento está desligado (só vale o prazo)"""
+    if not _aviso_cancelamento:
+        _aviso_cancelamento.append(motivo)
+        print(f"[orcamento] Cancelamento por sessão desligado ({motivo}); "
+              f"consultas pesadas só são interrompidas pelo prazo")
+    return False
+
+
+def session_stop_requested():
+    """
+    True se a execução atual do Streamlit já recebeu pedido de parar/reexecutar
+
+    O Streamlit não tem API pública para isso: o estado vem de
+    ScriptRunContext.script_requests._state (interno), verificado só na
+    versão STREAMLIT_VERSAO_CANCELAMENTO. Em outra versão, ou se o atributo
+    sumir, o cancelamento fica desligado com um aviso no log.
+    """
+    if _aviso_cancelamento:
+        return False
+    try:
+        import streamlit
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        from streamlit.runtime.scriptrunner.script_requests import ScriptRequestType
+    except ImportError as e:
+        return _cancellation_unavailable(f"import: {e}")
+    if streamlit.__version__ != STREAMLIT_VERSAO_CANCELAMENTO:
+        return _cancellation_unavailable(f"streamlit {streamlit.__version__}, "
+                                         f"verificado em {STREAMLIT_VERSAO_CANCELAMENTO}")
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return False
+    try:
+        return ctx.script_requests._state != ScriptRequestType.CONTINUE
+    except AttributeError as e:
+        return _cancellation_unavailable(f"API interna mudou: {e}")
+
+
+def _interrupted(erro):
+    """O erro (ou a sua causa, no pd.read_sql) é uma interrupção do SQLite?"""
+    while erro is not None:
+        if isinstance(erro, sqlite3.OperationalError) and "interrupted" in str(erro):
+            return True
+        erro = erro.__cause__
+    return False
+
+
+@contextmanager
+def query_budget(conn, orcamento_ms=HEAVY_QUERY_BUDGET_MS, cancelar=session_stop_requested):
+    """Interromper os comandos da conexão após orcamento_ms (ou se cancelar())"""
+    prazo = time.perf_counter() + orcamento_ms / 1000
+    motivo = []
+
+    def handler():
+        if time.perf_counter() > prazo:
+            motivo.append('tempo')
+            return 1
+        if cancelar is not None and cancelar():
+            motivo.append('cancelada')
+            return 1
+        return 0
+
+    conn.set_progress_handler(handler, PROGRESS_HANDLER_OPCODES)
+    try:
+        yield conn
+    except Exception as e:
+        if not _interrupted(e):
+            raise
+        if conn.in_transaction:
+            conn.rollback()
+        if motivo and motivo[-1] == 'cancelada':
+            raise TimeoutError("Consulta cancelada: a página foi atualizada") from e
+        raise TimeoutError(
+            f"A consulta passou do limite de {orcamento_ms / 1000:g} s e foi cancelada; "
+            "reduza o período ou os filtros"
+        ) from e
+    finally:
+        conn.set_progress_handler(None, 0)
+
+
+@contextmanager
+def heavy_query(conn, usuario=None, orcamento_ms=HEAVY_QUERY_BUDGET_MS):
+    """Admissão + orçamento de tempo para uma consulta pesada (TimeoutError se não couber)"""
+    usuario_id = usuario.get('id') if usuario else None
+    if not admission_controller.acquire(usuario_id):
+        raise TimeoutError("Há muitos relatórios pesados em execução; tente novamente em instantes")
+    try:
+        with query_budget(conn, orcamento_ms):
+            yield conn
+    finally:
+        admission_controller.release(usuario_id)
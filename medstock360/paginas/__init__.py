@@ -0,0 +1,47 @@
+"""
+Registro de páginas do MedStock360
+
+Cada página vive no seu próprio módulo e só é importada (junto com pandas e
+plotly) quando é aberta pela primeira vez.
+"""
+
+import importlib
+
+from medstock360.desempenho import track_page
+
+# Páginas do menu: módulo, função de renderização e permissão exigida
+PAGINAS = {
+    "🏠 Dashboard": {'modulo': 'dashboard', 'funcao': 'show_dashboard', 'permissao': None},
+    "💊 Medicamentos": {'modulo': 'medicamentos', 'funcao': 'show_medicamentos', 'permissao': 'medicamentos'},
+    "📦 Estoque": {'modulo': 'estoque', 'funcao': 'show_estoque', 'permissao': 'estoque'},
+    "🔮 Análise Preditiva": {'modulo': 'analise_preditiva', 'funcao': 'show_analise_preditiva', 'permissao': 'estoque'},
+    "👥 Pacientes": {'modulo': 'pacientes', 'funcao': 'show_pacientes', 'permissao': 'pacientes'},
+    "🩺 Linha do Tempo": {'modulo': 'linha_do_tempo', 'funcao': 'show_linha_do_tempo', 'permissao': 'pacientes'},
+    "📅 Consultas": {'modulo': 'consultas', 'funcao': 'show_consultas', 'permissao': 'consultas'},
+    "📝 Receitas": {'modulo': 'receitas', 'funcao': 'show_receitas', 'permissao': 'receitas'},
+    "👤 Usuários": {'modulo': 'usuarios', 'funcao': 'show_usuarios', 'permissao': 'usuarios'},
+    "📊 Relatórios": {'modulo': 'relatorios', 'funcao': 'show_relatorios', 'permissao': 'relatorios'},
+    "🛡️ Auditoria": {'modulo': 'auditoria', 'funcao': 'show_auditoria', 'permissao': 'auditoria'},
+    "⚡ Performance": {'modulo': 'desempenho', 'funcao': 'show_desempenho', 'permissao': 'desempenho'},
+}
+
+
+def get_menu_options(permissions):
+    """Obter as opções de menu liberadas para as permissões do usuário"""
+    return [
+        nome for nome, pagina in PAGINAS.items()
+        if pagina['permissao'] is None or pagina['permissao'] in permissions
+    ]
+
+
+def load_page(modulo, funcao):
+    """Importar o módulo da página (apenas na primeira vez) e obter a função"""
+    module = importlib.import_module(f"{__name__}.{modulo}")
+    return getattr(module, funcao)
+
+
+def render_page(nome):
+    """Renderizar a página selecionada no menu (com medição de tempo)"""
+    pagina = PAGINAS[nome]
+    with track_page(nome):
+        load_page(pagina['modulo'], pagina['funcao'])()
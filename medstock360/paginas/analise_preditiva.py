@@ -0,0 +1,286 @@
+"""Página de análise preditiva de consumo"""
+
+import streamlit as st
+import pandas as pd
+from datetime import date, datetime, timedelta
+
+from medstock360.auditoria import audit_event
+from medstock360.compras import (
+    COMPRAS_COBERTURA_DIAS, COMPRAS_JANELA_DIAS, COMPRAS_NIVEL_SERVICO,
+    lead_times, procurement_plan, purchase_order_drafts, save_lead_times
+)
+from medstock360.datas import SEGUNDOS_DIA, from_integer
+from medstock360.graficos import show_chart
+from medstock360.orcamento import heavy_query
+
+
+def show_analise_preditiva():
+    """Módulo de análise preditiva"""
+    st.markdown("## 🔮 Análise Preditiva de Medicamentos")
+    
+    # Plano de compras do formulário para quem dá entrada no estoque
+    if 'editar' in st.session_state.permissions.get('estoque', []):
+        tab1, tab2 = st.tabs(["📈 Por Medicamento", "🛒 Plano de Compras"])
+    else:
+        tab1, tab2 = st.container(), None
+    
+    with tab1:
+        show_previsao_medicamento()
+    
+    if tab2 is not None:
+        with tab2:
+            show_plano_compras()
+
+
+def show_previsao_medicamento():
+    """Consumo e previsão de fim de estoque de um medicamento"""
+    conn = st.session_state.db_manager.get_connection()
+    
+    # Buscar medicamentos com movimentação
+    query = """
+        SELECT 
+            m.id,
+            m.nome as medicamento,
+            m.principio_ativo,
+            SUM(l.quantidade_atual) as estoque_atual,
+            SUM(mov.total) as total_movimentacoes
+        FROM medicamentos m
+        JOIN lotes l ON m.id = l.medicamento_id
+        LEFT JOIN (
+            SELECT lote_id, COUNT(*) as total FROM movimentacoes GROUP BY lote_id
+        ) mov ON l.id = mov.lote_id
+        WHERE m.ativo = 1 AND l.ativo = 1 AND l.quantidade_atual > 0
+        GROUP BY m.id, m.nome, m.principio_ativo
+        HAVING total_movimentacoes > 0
+        ORDER BY m.nome
+    """
+    
+    df_medicamentos_pred = pd.read_sql(query, conn)
+    
+    if df_medicamentos_pred.empty:
+        st.info("Nenhum medicamento com histórico de movimentação encontrado.")
+        st.markdown("""
+        ### 💡 Como usar a análise preditiva:
+        1. **Cadastre medicamentos** no sistema
+        2. **Registre entradas** de lotes no estoque
+        3. **Registre saídas** (dispensações, receitas)
+        4. **Aguarde alguns dias** para acumular histórico
+        5. **Volte aqui** para ver as previsões!
+        """)
+        conn.close()
+        return
+    
+    # Seletor de medicamento
+    medicamento_options = {f"{row['medicamento']} (Estoque: {row['estoque_atual']})": row['id'] for _, row in df_medicamentos_pred.iterrows()}
+    medicamento_selecionado = st.selectbox("🔍 Selecione um medicamento para análise:", list(medicamento_options.keys()))
+    
+    if medicamento_selecionado:
+        medicamento_id = medicamento_options[medicamento_selecionado]
+        
+        # Calcular consumo médio dos últimos 30 dias
+        query_consumo = f"""
+            SELECT 
+                mov.data_movimento_ts / {SEGUNDOS_DIA} as dia,
+                SUM(CASE WHEN mov.tipo_movimento = 'Saída' THEN mov.quantidade ELSE 0 END) as consumo_diario
+            FROM movimentacoes mov
+            JOIN lotes l ON mov.lote_id = l.id
+            WHERE l.medicamento_id = ? 
+            AND mov.data_movimento_ts >= unixepoch('now', 'start of day', '-30 days')
+            AND mov.tipo_movimento = 'Saída'
+            GROUP BY dia
+            ORDER BY dia DESC
+        """
+        
+        df_consumo = pd.read_sql(query_consumo, conn, params=[medicamento_id])
+        df_consumo['data'] = from_integer(df_consumo['dia'], 'D')
+        
+        if not df_consumo.empty:
+            # Calcular métricas
+            consumo_medio_diario = df_consumo['consumo_diario'].mean()
+            consumo_total_30dias = df_consumo['consumo_diario'].sum()
+            estoque_atual = df_medicamentos_pred[df_medicamentos_pred['id'] == medicamento_id]['estoque_atual'].iloc[0]
+            
+            # Previsões
+            dias_para_acabar = estoque_atual / consumo_medio_diario if consumo_medio_diario > 0 else float('inf')
+            data_previsao_fim = datetime.now() + timedelta(days=int(dias_para_acabar))
+            
+            # Exibir métricas
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("📦 Estoque Atual", f"{estoque_atual} unidades")
+            
+            with col2:
+                st.metric("📊 Consumo Médio Diário", f"{consumo_medio_diario:.1f} unidades")
+            
+            with col3:
+                st.metric("📅 Dias para Acabar", f"{int(dias_para_acabar)} dias" if dias_para_acabar != float('inf') else "∞")
+            
+            with col4:
+                if dias_para_acabar != float('inf'):
+                    st.metric("⚠️ Previsão de Fim", data_previsao_fim.strftime('%d/%m/%Y'))
+                else:
+                    st.metric("⚠️ Previsão de Fim", "Sem consumo")
+            
+            # Alertas
+            if dias_para_acabar < 7:
+                st.markdown("""
+                <div class="alert-danger">
+                    🚨 <strong>ALERTA CRÍTICO!</strong> Medicamento pode acabar em menos de 7 dias!
+                </div>
+                """, unsafe_allow_html=True)
+            elif dias_para_acabar < 15:
+                st.markdown("""
+                <div class="alert-warning">
+                    ⚠️ <strong>Atenção!</strong> Medicamento pode acabar em menos de 15 dias.
+                </div>
+                """, unsafe_allow_html=True)
+            elif dias_para_acabar < 30:
+                st.markdown("""
+                <div class="alert-success">
+                    ✅ <strong>OK!</strong> Estoque suficiente para os próximos 30 dias.
+                </div>
+                """, unsafe_allow_html=True)
+            
+            # Gráfico de consumo
+            if len(df_consumo) > 1:
+                st.markdown("### 📈 Histórico de Consumo (Últimos 30 dias)")
+                
+                show_chart('line', df_consumo, x='data', y='consumo_diario',
+                           title="Consumo Diário", markers=True,
+                           hlines=[{'y': consumo_medio_diario, 'line_dash': "dash",
+                                    'annotation_text': f"Média: {consumo_medio_diario:.1f}"}])
+            
+            # Sugestões de reposição (ponto de pedido, estoque de segurança e fornecedor mais barato)
+            st.markdown("### 💡 Sugestões de Reposição")
+            
+            plano = procurement_plan(conn, medicamento_id=medicamento_id).iloc[0]
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("🛡️ Estoque de Segurança", f"{plano['estoque_seguranca']} unidades")
+            
+            with col2:
+                st.metric("📍 Ponto de Pedido", f"{plano['ponto_pedido']} unidades",
+                          help=f"Estoque utilizável (lotes não vencidos): {plano['estoque']} unidades")
+            
+            with col3:
+                st.metric("🏭 Fornecedor", plano['fornecedor'],
+                          help=f"Prazo de entrega: {plano['prazo_entrega_dias']} dias")
+            
+            if plano['quantidade_sugerida'] > 0:
+                preco = f", R$ {plano['preco_unitario']:.2f}/un." if pd.notna(plano['preco_unitario']) else ""
+                st.info(f"📋 **Sugestão:** Comprar {plano['quantidade_sugerida']} unidades de "
+                        f"{plano['fornecedor']}{preco} (entrega em {plano['prazo_entrega_dias']} dias) "
+                        f"para cobrir {COMPRAS_COBERTURA_DIAS} dias após a entrega.")
+            else:
+                st.success(f"✅ Estoque acima do ponto de pedido ({plano['ponto_pedido']} unidades); "
+                           f"nenhuma compra necessária agora.")
+            
+            # Tabela detalhada de consumo
+            st.markdown("### 📊 Detalhamento do Consumo")
+            st.dataframe(df_consumo.sort_values('data', ascending=False), use_container_width=True)
+            
+        else:
+            st.info("Não há histórico de consumo (saídas) para este medicamento nos últimos 30 dias.")
+    
+    conn.close()
+
+
+def show_plano_compras():
+    """Plano de compras do formulário e rascunhos de pedido por fornecedor"""
+    st.markdown("### 🛒 Plano de Compras")
+    st.caption(f"Consumo dos últimos {COMPRAS_JANELA_DIAS} dias, nível de serviço de {COMPRAS_NIVEL_SERVICO:.0%} "
+               f"e cobertura de {COMPRAS_COBERTURA_DIAS} dias após a entrega.")
+    
+    conn = st.session_state.db_manager.get_connection()
+    try:
+        with heavy_query(conn, st.session_state.user):
+            plano = procurement_plan(conn)
+        prazos = lead_times(conn)
+    except TimeoutError as e:
+        st.warning(f"⏱️ {e}")
+        return
+    finally:
+        conn.close()
+    
+    rascunhos = purchase_order_drafts(plano)
+    sugeridos = plano[plano['quantidade_sugerida'] > 0]
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📍 Abaixo do Ponto de Pedido", f"{len(sugeridos)} de {len(plano)}")
+    with col2:
+        st.metric("🧾 Pedidos (Fornecedores)", len(rascunhos))
+    with col3:
+        st.metric("💰 Valor Estimado", f"R$ {sugeridos['valor_estimado'].sum():,.2f}")
+    
+    if rascunhos:
+        st.markdown("#### 🧾 Rascunhos de Pedido por Fornecedor")
+        for rascunho in rascunhos:
+            with st.expander(f"🏭 {rascunho['fornecedor']} - {len(rascunho['itens'])} item(ns) - "
+                             f"R$ {rascunho['total']:,.2f} - entrega prevista em "
+                             f"{rascunho['entrega_prevista'].strftime('%d/%m/%Y')}"):
+                st.dataframe(
+                    rascunho['itens'].drop(columns=['medicamento_id']),
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "medicamento": "Medicamento",
+                        "concentracao": "Concentração",
+                        "apresentacao": "Apresentação",
+                        "quantidade_sugerida": "Quantidade",
+                        "preco_unitario": st.column_config.NumberColumn("Preço Unitário", format="R$ %.2f"),
+                        "valor_estimado": st.column_config.NumberColumn("Valor", format="R$ %.2f"),
+                    }
+                )
+        
+        pedidos = pd.concat([r['itens'].assign(fornecedor=r['fornecedor'], entrega_prevista=r['entrega_prevista'])
+                             for r in rascunhos], ignore_index=True)
+        st.download_button(
+            "📥 Exportar Rascunhos (CSV)",
+            pedidos.to_csv(index=False),
+            file_name=f"pedidos_compra_{date.today().strftime('%Y%m%d')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+    else:
+        st.success("✅ Nenhum medicamento abaixo do ponto de pedido.")
+    
+    # Prazos de entrega usados no ponto de pedido
+    with st.expander("⏱️ Prazos de Entrega por Fornecedor"):
+        if prazos.empty:
+            st.info("Nenhum fornecedor no histórico de lotes.")
+            return
+        st.caption("Fornecedores sem prazo cadastrado usam o prazo padrão.")
+        editados = st.data_editor(
+            prazos,
+            use_container_width=True,
+            hide_index=True,
+            disabled=['fornecedor', 'cadastrado'],
+            column_config={
+                "fornecedor": "Fornecedor",
+                "prazo_entrega_dias": st.column_config.NumberColumn("Prazo (dias)", min_value=1, step=1, required=True),
+                "cadastrado": "Cadastrado",
+            },
+            key="prazos_fornecedores"
+        )
+        if st.button("💾 Salvar Prazos", use_container_width=True):
+            # Células apagadas no editor voltam como NaN e não são gravadas
+            editados = editados.dropna(subset=['prazo_entrega_dias'])
+            alterados = editados[editados['prazo_entrega_dias'] != prazos.loc[editados.index, 'prazo_entrega_dias']]
+            if alterados.empty:
+                st.info("Nenhum prazo alterado.")
+            else:
+                conn = st.session_state.db_manager.get_connection()
+                try:
+                    save_lead_times(conn, dict(zip(alterados['fornecedor'], alterados['prazo_entrega_dias'])))
+                finally:
+                    conn.close()
+                for _, row in alterados.iterrows():
+                    audit_event(st.session_state.user, 'alterar_prazo', 'fornecedores_prazos',
+                                antes={'fornecedor': row['fornecedor'],
+                                       'prazo_entrega_dias': int(prazos.loc[row.name, 'prazo_entrega_dias'])},
+                                depois={'fornecedor': row['fornecedor'], 'prazo_entrega_dias': int(row['prazo_entrega_dias'])})
+                st.success(f"✅ {len(alterados)} prazo(s) salvo(s)!")
+                st.rerun()
@@ -0,0 +1,76 @@
+"""Página de consulta do log de auditoria"""
+
+import streamlit as st
+from datetime import date, timedelta
+
+from medstock360.auditoria import flush_audit_events, verify_chain
+from medstock360.comandos import read_arrow, read_sql, run
+from medstock360.unidades import get_shard_router
+
+
+def show_auditoria():
+    """Módulo de auditoria"""
+    st.markdown("## 🛡️ Log de Auditoria")
+    
+    # Verificar permissões
+    if 'auditoria' not in st.session_state.permissions:
+        st.error("❌ Você não tem permissão para acessar esta área!")
+        return
+    
+    # O log da rede fica no banco da unidade principal
+    conn = get_shard_router().principal.get_connection()
+    
+    # Mostrar também os eventos ainda no buffer
+    flush_audit_events(conn)
+    
+    usuarios = read_sql(conn, 'auditoria.usuarios')
+    entidades = [row[0] for row in run(conn, 'auditoria.entidades')]
+    
+    # Filtros
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        usuario_options = {"Todos": None}
+        usuario_options.update({row['nome_completo']: row['id'] for _, row in usuarios.iterrows()})
+        usuario_filter = st.selectbox("👤 Usuário", list(usuario_options.keys()))
+    
+    with col2:
+        entidade_filter = st.selectbox("📁 Entidade", ["Todas"] + entidades)
+        entidade_id = st.number_input("🔢 ID do registro (0 = todos)", min_value=0, step=1)
+    
+    with col3:
+        data_inicio = st.date_input("📅 De", value=date.today() - timedelta(days=30))
+        data_fim = st.date_input("📅 Até", value=date.today())
+    
+    params = {'inicio': data_inicio.isoformat(), 'fim': (data_fim + timedelta(days=1)).isoformat()}
+    filtros = []
+    
+    if usuario_options[usuario_filter] is not None:
+        params['usuario_id'] = int(usuario_options[usuario_filter])
+        filtros.append('usuario')
+    
+    if entidade_filter != "Todas":
+        params['entidade'] = entidade_filter
+        filtros.append('entidade')
+        if entidade_id:
+            params['entidade_id'] = int(entidade_id)
+            filtros.append('entidade_id')
+    
+    eventos = read_arrow(conn, 'auditoria.eventos', params, filtros)
+    
+    if eventos.num_rows:
+        eventos = eventos.rename_columns(['ID', 'Data/Hora', 'Usuário', 'Ação', 'Entidade', 'Registro', 'Antes', 'Depois'])
+        st.dataframe(eventos, use_container_width=True, hide_index=True)
+        st.caption(f"{eventos.num_rows} evento(s) (máximo de 500, mais recentes primeiro)")
+    else:
+        st.info("Nenhum evento de auditoria encontrado para os filtros selecionados.")
+    
+    # Integridade da cadeia de hashes
+    if st.button("🔗 Verificar Integridade"):
+        ok, linha_invalida, verificadas = verify_chain(conn)
+        if ok:
+            st.success(f"✅ Cadeia íntegra: {verificadas} evento(s) verificados.")
+        else:
+            st.error(f"❌ Cadeia quebrada no evento {linha_invalida} (após {verificadas} evento(s) válidos).")
+    
+    conn.close()
@@ -0,0 +1,421 @@
+"""Página de gestão de consultas"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime, date, timedelta
+from html import escape
+import time
+
+from medstock360.auditoria import audit_event
+from medstock360.comandos import read_sql
+from medstock360.datas import epoch_range, from_integer
+from medstock360.agenda import (
+    schedule_appointment, find_free_slots, get_working_hours, set_doctor_profile,
+    parse_time_windows, format_time_windows, load_calendar,
+    DURACOES_MINUTOS, DURACAO_PADRAO_MINUTOS, DIAS_SEMANA
+)
+
+STATUS_CONSULTA = ["Agendada", "Confirmada", "Em andamento", "Concluída", "Cancelada"]
+
+# Classes CSS da grade da agenda por status
+STATUS_CLASSES = {
+    'Agendada': 'agenda-agendada',
+    'Confirmada': 'agenda-confirmada',
+    'Em andamento': 'agenda-andamento',
+    'Concluída': 'agenda-concluida',
+    'Cancelada': 'agenda-cancelada'
+}
+
+
+def show_consultas():
+    """Módulo de consultas"""
+    st.markdown("## 📅 Gestão de Consultas")
+    
+    # Verificar permissões
+    if 'criar' in st.session_state.permissions.get('consultas', []):
+        tab1, tab2, tab3 = st.tabs(["📋 Agenda de Consultas", "➕ Agendar Consulta", "🔎 Horários Livres"])
+    else:
+        tab1, tab3 = st.tabs(["📋 Agenda de Consultas", "🔎 Horários Livres"])
+    
+    with tab1:
+        st.markdown("### 📋 Agenda de Consultas")
+        
+        visualizacao = st.radio("🗓️ Visualização", ["Dia", "Semana", "Mês"], horizontal=True)
+        
+        if visualizacao == "Dia":
+            show_agenda_dia()
+        else:
+            show_calendario(visualizacao)
+    
+    if 'criar' in st.session_state.permissions.get('consultas', []):
+        with tab2:
+            st.markdown("### ➕ Agendar Nova Consulta")
+            
+            # Buscar pacientes e médicos
+            conn = st.session_state.db_manager.get_connection()
+            pacientes = read_sql(conn, 'pacientes.ativos')
+            medicos = read_sql(conn, 'consultas.medicos')
+            conn.close()
+            
+            if pacientes.empty:
+                st.warning("⚠️ Nenhum paciente cadastrado. Cadastre pacientes primeiro.")
+            elif medicos.empty:
+                st.warning("⚠️ Nenhum médico cadastrado. Cadastre médicos primeiro.")
+            else:
+                with st.form("form_consulta"):
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        paciente_options = {f"{row['nome_completo']}": row['id'] for _, row in pacientes.iterrows()}
+                        paciente_selecionado = st.selectbox("Paciente *", list(paciente_options.keys()))
+                        
+                        medico_options = {f"{row['nome_completo']}": row['id'] for _, row in medicos.iterrows()}
+                        medico_selecionado = st.selectbox("Médico *", list(medico_options.keys()))
+                        
+                        data_consulta_agendamento = st.date_input("Data da Consulta *", value=date.today())
+                        hora_consulta = st.time_input("Horário da Consulta *")
+                        duracao_minutos = st.selectbox(
+                            "Duração (minutos) *", DURACOES_MINUTOS,
+                            index=DURACOES_MINUTOS.index(DURACAO_PADRAO_MINUTOS)
+                        )
+                    
+                    with col2:
+                        tipo_consulta = st.selectbox("Tipo de Consulta", [
+                            "", "Consulta inicial", "Retorno", "Emergência", "Exame",
+                            "Procedimento", "Teleconsulta", "Outros"
+                        ])
+                        
+                        valor = st.number_input("Valor da Consulta (R$)", min_value=0.0, step=0.01, format="%.2f")
+                        
+                        motivo = st.text_area("Motivo da Consulta", placeholder="Descreva o motivo da consulta...")
+                    
+                    observacoes = st.text_area("Observações", placeholder="Informações adicionais...")
+                    
+                    submitted = st.form_submit_button("📅 Agendar Consulta", use_container_width=True)
+                    
+                    if submitted:
+                        if not paciente_selecionado or not medico_selecionado or not data_consulta_agendamento or not hora_consulta:
+                            st.error("❌ Preencha todos os campos obrigatórios!")
+                        else:
+                            try:
+                                # Combinar data e hora
+                                data_hora_consulta = datetime.combine(data_consulta_agendamento, hora_consulta)
+                                
+                                # Verificar sobreposição e agendar na mesma transação
+                                consulta_id, conflitos = schedule_appointment(
+                                    st.session_state.db_manager,
+                                    paciente_id=paciente_options[paciente_selecionado],
+                                    medico_id=medico_options[medico_selecionado],
+                                    inicio=data_hora_consulta,
+                                    duracao_minutos=duracao_minutos,
+                                    tipo_consulta=tipo_consulta,
+                                    motivo=motivo,
+                                    valor=valor if valor > 0 else None,
+                                    observacoes=observacoes,
+                                    agendado_por=st.session_state.user['id']
+                                )
+                                
+                                if conflitos:
+                                    st.error("❌ O horário se sobrepõe a consultas já agendadas para este médico:")
+                                    for _, inicio, fim, paciente_nome in conflitos:
+                                        st.write(f"• {inicio[11:16]}–{fim[11:16]} - {paciente_nome or 'N/A'}")
+                                else:
+                                    st.success("✅ Consulta agendada com sucesso!")
+                                    time.sleep(2)
+                                    st.rerun()
+                                
+                            except Exception as e:
+                                st.error(f"❌ Erro ao agendar consulta: {str(e)}")
+    
+    with tab3:
+        show_horarios_livres()
+
+
+def show_agenda_dia():
+    """Consultas de um dia, com as ações de cada consulta"""
+    # Filtros
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        data_consulta = st.date_input("📅 Data", value=date.today())
+    
+    with col2:
+        conn = st.session_state.db_manager.get_connection()
+        medicos = read_sql(conn, 'consultas.medicos')
+        medico_options = ["Todos"] + [f"{row['nome_completo']}" for _, row in medicos.iterrows()]
+        medico_filter = st.selectbox("👨‍⚕️ Médico", medico_options)
+    
+    with col3:
+        status_filter = st.selectbox("📊 Status", ["Todos"] + STATUS_CONSULTA)
+    
+    # Buscar consultas
+    params, filtros = dict(zip(('inicio', 'fim'), epoch_range(data_consulta))), []
+    
+    if medico_filter != "Todos":
+        # Encontrar o ID do médico selecionado
+        if not medicos.empty:
+            medico_selecionado = medicos[medicos['nome_completo'] == medico_filter]
+            if not medico_selecionado.empty:
+                params['medico_id'] = int(medico_selecionado.iloc[0]['id'])
+                filtros.append('medico')
+    
+    if status_filter != "Todos":
+        params['status'] = status_filter
+        filtros.append('status')
+    
+    df_consultas = read_sql(conn, 'consultas.do_dia', params, filtros)
+    conn.close()
+    df_consultas['data_hora'] = from_integer(df_consultas['data_consulta_ts'])
+    
+    if not df_consultas.empty:
+        for _, cons in df_consultas.iterrows():
+            # Definir cor baseada no status
+            status_color = {
+                'Agendada': '🟡',
+                'Confirmada': '🟢',
+                'Em andamento': '🔵',
+                'Concluída': '✅',
+                'Cancelada': '🔴'
+            }.get(cons['status'], '⚪')
+            
+            data_hora = cons['data_hora']
+            
+            with st.expander(f"{status_color} {data_hora.strftime('%H:%M')} - {cons['paciente_nome']} - Dr(a). {cons['medico_nome']}"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.write(f"**Paciente:** {cons['paciente_nome']}")
+                    st.write(f"**Médico:** Dr(a). {cons['medico_nome']}")
+                    st.write(f"**Data/Hora:** {data_hora.strftime('%d/%m/%Y %H:%M')}")
+                    st.write(f"**Tipo:** {cons['tipo_consulta'] or 'N/A'}")
+                    st.write(f"**Status:** {cons['status']}")
+                
+                with col2:
+                    st.write(f"**Motivo:** {cons['motivo'] or 'N/A'}")
+                    st.write(f"**Valor:** R$ {cons['valor']:.2f}" if cons['valor'] else "Valor: N/A")
+                    st.write(f"**Agendado por:** {cons['agendado_por_nome'] or 'N/A'}")
+                
+                if cons['diagnostico']:
+                    st.write(f"**Diagnóstico:** {cons['diagnostico']}")
+                if cons['observacoes']:
+                    st.write(f"**Observações:** {cons['observacoes']}")
+                
+                # Ações para a consulta
+                if 'editar' in st.session_state.permissions.get('consultas', []):
+                    col1, col2, col3 = st.columns(3)
+                    
+                    with col1:
+                        if st.button("✅ Concluir", key=f"concluir_{cons['id']}"):
+                            try:
+                                conn = st.session_state.db_manager.get_connection()
+                                cursor = conn.cursor()
+                                cursor.execute("UPDATE consultas SET status = 'Concluída' WHERE id = ?", (cons['id'],))
+                                conn.commit()
+                                audit_event(st.session_state.user, 'alterar_status', 'consultas', cons['id'],
+                                            antes={'status': cons['status']}, depois={'status': 'Concluída'})
+                                conn.close()
+                                st.success("Consulta marcada como concluída!")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Erro: {e}")
+                    
+                    with col2:
+                        if st.button("❌ Cancelar", key=f"cancelar_{cons['id']}"):
+                            try:
+                                conn = st.session_state.db_manager.get_connection()
+                                cursor = conn.cursor()
+                                cursor.execute("UPDATE consultas SET status = 'Cancelada' WHERE id = ?", (cons['id'],))
+                                conn.commit()
+                                audit_event(st.session_state.user, 'alterar_status', 'consultas', cons['id'],
+                                            antes={'status': cons['status']}, depois={'status': 'Cancelada'})
+                                conn.close()
+                                st.success("Consulta cancelada!")
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Erro: {e}")
+    else:
+        st.info(f"Nenhuma consulta agendada para {data_consulta.strftime('%d/%m/%Y')}.")
+
+
+def show_calendario(visualizacao):
+    """Agenda da semana ou do mês com uma raia por médico"""
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        data_referencia = st.date_input("📅 Data", value=date.today(), key="calendario_data")
+    
+    with col2:
+        conn = st.session_state.db_manager.get_connection()
+        medicos = read_sql(conn, 'consultas.medicos')
+        conn.close()
+        medico_options = {"Todos": None}
+        medico_options.update({row['nome_completo']: row['id'] for _, row in medicos.iterrows()})
+        medico_filter = st.selectbox("👨‍⚕️ Médico", list(medico_options.keys()), key="calendario_medico")
+    
+    with col3:
+        status_filter = st.selectbox("📊 Status", ["Todos"] + STATUS_CONSULTA, key="calendario_status")
+    
+    if visualizacao == "Semana":
+        inicio = data_referencia - timedelta(days=data_referencia.weekday())
+        fim = inicio + timedelta(days=7)
+    else:
+        inicio = data_referencia.replace(day=1)
+        fim = (inicio + timedelta(days=32)).replace(day=1)
+    
+    conn = st.session_state.db_manager.get_connection()
+    consultas = load_calendar(
+        conn, datetime.combine(inicio, datetime.min.time()), datetime.combine(fim, datetime.min.time()),
+        medico_id=medico_options[medico_filter],
+        status=None if status_filter == "Todos" else status_filter
+    )
+    conn.close()
+    
+    periodo = f"{inicio.strftime('%d/%m/%Y')} a {(fim - timedelta(days=1)).strftime('%d/%m/%Y')}"
+    if not consultas:
+        st.info(f"Nenhuma consulta agendada de {periodo}.")
+        return
+    
+    dias = [inicio + timedelta(days=i) for i in range((fim - inicio).days)]
+    st.markdown(render_calendar_grid(consultas, dias, compacto=visualizacao == "Mês"), unsafe_allow_html=True)
+    st.caption(f"{len(consultas)} consulta(s) de {periodo}")
+
+
+def render_calendar_grid(consultas, dias, compacto=False):
+    """HTML da grade da agenda: uma linha por médico e uma coluna por dia"""
+    raias = {}
+    for cons in consultas:
+        raia = raias.setdefault(cons['medico_id'], {'nome': cons['medico_nome'], 'dias': {}})
+        raia['dias'].setdefault(cons['data_consulta'][:10], []).append(cons)
+    
+    hoje = date.today()
+    cabecalho = "".join(
+        f'<th class="{"agenda-hoje" if dia == hoje else ""}">{DIAS_SEMANA[dia.weekday()][:3]}<br>{dia.strftime("%d/%m")}</th>'
+        for dia in dias
+    )
+    
+    linhas = []
+    for raia in raias.values():
+        celulas = []
+        for dia in dias:
+            itens = []
+            for cons in raia['dias'].get(dia.isoformat(), []):
+                hora = cons['data_consulta'][11:16]
+                paciente = cons['paciente_nome'] or 'N/A'
+                titulo = f"{hora}–{(cons['data_fim'] or '')[11:16]} {paciente} ({cons['status']})"
+                texto = hora if compacto else f"{hora} {paciente}"
+                itens.append(
+                    f'<span class="agenda-item {STATUS_CLASSES.get(cons["status"], "")}" '
+                    f'title="{escape(titulo)}">{escape(texto)}</span>'
+                )
+            celulas.append(f"<td>{''.join(itens)}</td>")
+        linhas.append(f"<tr><th>{escape(raia['nome'])}</th>{''.join(celulas)}</tr>")
+    
+    return (
+        f'<div class="agenda-grid"><table><thead><tr><th>Médico</th>{cabecalho}</tr></thead>'
+        f'<tbody>{"".join(linhas)}</tbody></table></div>'
+    )
+
+
+def show_horarios_livres():
+    """Busca dos próximos horários livres de todos os médicos"""
+    st.markdown("### 🔎 Próximos Horários Livres")
+    
+    conn = st.session_state.db_manager.get_connection()
+    medicos = read_sql(conn, 'consultas.medicos')
+    conn.close()
+    
+    if medicos.empty:
+        st.warning("⚠️ Nenhum médico cadastrado. Cadastre médicos primeiro.")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        data_inicio = st.date_input("📅 A partir de", value=date.today(), key="livres_inicio")
+        data_fim = st.date_input("📅 Até", value=date.today() + timedelta(days=30), key="livres_fim")
+    
+    with col2:
+        especialidades = sorted(medicos['especialidade'].dropna().unique())
+        especialidade = st.selectbox("🩺 Especialidade", ["Todas"] + especialidades, key="livres_especialidade")
+        medico_options = {"Todos": None}
+        medico_options.update({row['nome_completo']: row['id'] for _, row in medicos.iterrows()})
+        especialidade_medico = {row['id']: row['especialidade'] if pd.notna(row['especialidade']) else None
+                                for _, row in medicos.iterrows()}
+        medico = st.selectbox("👨‍⚕️ Médico", list(medico_options.keys()), key="livres_medico")
+    
+    with col3:
+        duracao_minutos = st.selectbox(
+            "⏱️ Duração (minutos)", DURACOES_MINUTOS,
+            index=DURACOES_MINUTOS.index(DURACAO_PADRAO_MINUTOS), key="livres_duracao"
+        )
+        limite = st.number_input("🔢 Quantidade", min_value=1, max_value=100, value=10, key="livres_limite")
+    
+    if data_fim < data_inicio:
+        st.error("❌ A data final deve ser posterior à data inicial!")
+        return
+    
+    # Nunca sugerir horários que já passaram
+    inicio = max(datetime.combine(data_inicio, datetime.min.time()), datetime.now())
+    fim = datetime.combine(data_fim + timedelta(days=1), datetime.min.time())
+    
+    conn = st.session_state.db_manager.get_connection()
+    slots = find_free_slots(
+        conn, inicio, fim, duracao_minutos, limite=int(limite),
+        especialidade=None if especialidade == "Todas" else especialidade,
+        medico_id=medico_options[medico]
+    )
+    conn.close()
+    
+    if slots:
+        df_slots = pd.DataFrame([{
+            'Data': slot['inicio'].strftime('%d/%m/%Y'),
+            'Horário': f"{slot['inicio'].strftime('%H:%M')}–{slot['fim'].strftime('%H:%M')}",
+            'Médico': slot['medico_nome'],
+            'Especialidade': slot['especialidade'] or 'N/A'
+        } for slot in slots])
+        st.dataframe(df_slots, use_container_width=True, hide_index=True)
+    else:
+        st.info("Nenhum horário livre no período selecionado.")
+    
+    # Modelo semanal de atendimento
+    if 'editar' in st.session_state.permissions.get('consultas', []):
+        with st.expander("⚙️ Especialidade e Horários de Atendimento"):
+            medico_horario = st.selectbox(
+                "Médico", [nome for nome in medico_options if nome != "Todos"], key="horarios_medico"
+            )
+            medico_id = medico_options[medico_horario]
+            
+            conn = st.session_state.db_manager.get_connection()
+            horarios = get_working_hours(conn, medico_id)
+            conn.close()
+            
+            especialidade_atual = especialidade_medico[medico_id]
+            
+            with st.form(f"form_horarios_{medico_id}"):
+                nova_especialidade = st.text_input("🩺 Especialidade", value=especialidade_atual or "")
+                st.caption("Janelas no formato 08:00-12:00, 13:00-18:00 (todos os dias vazios = sem atendimento)")
+                janelas_texto = {
+                    dia: st.text_input(nome, value=format_time_windows(horarios.get(dia, [])))
+                    for dia, nome in enumerate(DIAS_SEMANA)
+                }
+                
+                if st.form_submit_button("💾 Salvar"):
+                    try:
+                        novos_horarios = {dia: parse_time_windows(texto) for dia, texto in janelas_texto.items()}
+                        nova_especialidade = nova_especialidade.strip() or None
+                        conn = st.session_state.db_manager.get_connection()
+                        try:
+                            set_doctor_profile(conn, medico_id, novos_horarios, nova_especialidade,
+                                               alterar_especialidade=nova_especialidade != especialidade_atual)
+                        finally:
+                            conn.close()
+                        if nova_especialidade != especialidade_atual:
+                            audit_event(st.session_state.user, 'alterar_especialidade', 'usuarios', medico_id,
+                                        antes={'especialidade': especialidade_atual},
+                                        depois={'especialidade': nova_especialidade})
+                        st.success("✅ Especialidade e horários atualizados!")
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(f"❌ Horário inválido: {e}")
+                    except Exception as e:
+                        st.error(f"❌ Erro ao salvar horários: {e}")
@@ -0,0 +1,187 @@
+"""Página do dashboard principal"""
+
+import streamlit as st
+import pandas as pd
+from datetime import date, timedelta
+
+from medstock360.config import ENVIRONMENT
+from medstock360.datas import SEGUNDOS_DIA, epoch_range, from_integer
+from medstock360.graficos import show_chart
+from medstock360.vencimentos import FAIXA_ATE_30_DIAS
+
+
+def show_dashboard():
+    """Dashboard principal otimizado para Railway"""
+    st.markdown("## 🏠 Dashboard")
+    
+    # Informações da versão cloud
+    if ENVIRONMENT == 'production':
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown("""
+            <div class="metric-card">
+                <h3>☁️</h3>
+                <h2>CLOUD</h2>
+                <p>Sistema Online</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown("""
+            <div class="metric-card">
+                <h3>🌐</h3>
+                <h2>24/7</h2>
+                <p>Disponibilidade</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown("""
+            <div class="metric-card">
+                <h3>🔒</h3>
+                <h2>HTTPS</h2>
+                <p>Conexão Segura</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("---")
+    
+    # Métricas principais
+    col1, col2, col3, col4 = st.columns(4)
+    
+    conn = st.session_state.db_manager.get_connection()
+    
+    # Total de medicamentos
+    total_medicamentos = pd.read_sql("SELECT COUNT(*) as count FROM medicamentos WHERE ativo = 1", conn).iloc[0]['count']
+    
+    # Total de pacientes
+    total_pacientes = pd.read_sql("SELECT COUNT(*) as count FROM pacientes WHERE ativo = 1", conn).iloc[0]['count']
+    
+    # Consultas hoje
+    hoje = date.today()
+    consultas_hoje = pd.read_sql("""
+        SELECT COUNT(*) as count FROM consultas 
+        WHERE data_consulta_ts >= ? AND data_consulta_ts < ? AND status != 'Cancelada'
+    """, conn, params=epoch_range(hoje)).iloc[0]['count']
+    
+    # Medicamentos próximos ao vencimento (30 dias), a partir das faixas pré-calculadas
+    df_vencimento = pd.read_sql("""
+        SELECT 
+            COUNT(DISTINCT v.medicamento_id) as count,
+            COALESCE(SUM(v.valor_em_risco), 0) as valor_em_risco
+        FROM lotes_vencimento v
+        WHERE v.faixa <= ? AND v.quantidade_atual > 0
+    """, conn, params=[FAIXA_ATE_30_DIAS])
+    vencimento_proximo = df_vencimento['count'].iloc[0]
+    valor_em_risco = df_vencimento['valor_em_risco'].iloc[0]
+    
+    # Alertas ativos (avaliados em segundo plano pelo ciclo de alertas)
+    total_alertas = pd.read_sql("SELECT COUNT(*) as count FROM alertas_ativos", conn).iloc[0]['count']
+    df_alertas = pd.read_sql("""
+        SELECT severidade, mensagem FROM alertas_ativos
+        ORDER BY severidade = 'critico' DESC, desde DESC
+        LIMIT 50
+    """, conn)
+    
+    conn.close()
+    
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>💊</h3>
+            <h2>{total_medicamentos}</h2>
+            <p>Medicamentos</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>👥</h3>
+            <h2>{total_pacientes}</h2>
+            <p>Pacientes</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>📅</h3>
+            <h2>{consultas_hoje}</h2>
+            <p>Consultas Hoje</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>⚠️</h3>
+            <h2>{vencimento_proximo}</h2>
+            <p>Próximos ao Vencimento</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Alertas importantes
+    if vencimento_proximo > 0:
+        st.markdown(f"""
+        <div class="alert-warning">
+            ⚠️ <strong>Atenção!</strong> Existem {vencimento_proximo} medicamentos com vencimento em 30 dias ou menos
+            (R$ {valor_em_risco:,.2f} em risco).
+        </div>
+        """, unsafe_allow_html=True)
+    
+    if total_alertas > 0:
+        with st.expander(f"🔔 Alertas ativos ({total_alertas})"):
+            for _, alerta in df_alertas.iterrows():
+                st.write(f"{'🚨' if alerta['severidade'] == 'critico' else '⚠️'} {alerta['mensagem']}")
+    
+    # Informações de sucesso para versão cloud
+    if ENVIRONMENT == 'production':
+        st.markdown("""
+        <div class="alert-success">
+            🌟 <strong>Sistema funcionando perfeitamente na nuvem!</strong> 
+            Seus dados estão seguros e acessíveis 24/7 de qualquer lugar do mundo.
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Gráficos
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 📊 Medicamentos por Categoria")
+        conn = st.session_state.db_manager.get_connection()
+        df_categorias = pd.read_sql("""
+            SELECT categoria, COUNT(*) as quantidade
+            FROM medicamentos 
+            WHERE ativo = 1 AND categoria IS NOT NULL
+            GROUP BY categoria
+            ORDER BY quantidade DESC
+        """, conn)
+        conn.close()
+        
+        if not df_categorias.empty:
+            show_chart('pie', df_categorias, values='quantidade', names='categoria')
+        else:
+            st.info("Nenhum medicamento cadastrado ainda.")
+    
+    with col2:
+        st.markdown("### 📈 Consultas dos Últimos 7 Dias")
+        conn = st.session_state.db_manager.get_connection()
+        df_consultas = pd.read_sql(f"""
+            SELECT data_consulta_ts / {SEGUNDOS_DIA} as dia, COUNT(*) as quantidade
+            FROM consultas 
+            WHERE data_consulta_ts >= ?
+            AND status != 'Cancelada'
+            GROUP BY dia
+            ORDER BY dia
+        """, conn, params=[epoch_range(date.today() - timedelta(days=7))[0]])
+        conn.close()
+        df_consultas['data'] = from_integer(df_consultas['dia'], 'D')
+        
+        if not df_consultas.empty:
+            show_chart('line', df_consultas, x='data', y='quantidade', markers=True)
+        else:
+            st.info("Nenhuma consulta nos últimos 7 dias.")
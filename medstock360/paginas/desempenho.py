@@ -0,0 +1,132 @@
+"""Página de desempenho: tempos de páginas, consultas lentas e caches"""
+
+import io
+from datetime import datetime
+
+import streamlit as st
+import pandas as pd
+
+from medstock360.comandos import registered_statements
+from medstock360.desempenho import performance_stats
+from medstock360.graficos import figure_cache
+from medstock360.agenda import calendar_cache
+from medstock360.linha_do_tempo import timeline_cache
+from medstock360.aquecimento import estado_aquecimento
+from medstock360.orcamento import HEAVY_QUERY_BUDGET_MS, admission_controller
+
+
+def show_desempenho():
+    """Módulo de desempenho"""
+    st.markdown("## ⚡ Performance")
+
+    # Verificar permissões
+    if 'desempenho' not in st.session_state.permissions:
+        st.error("❌ Você não tem permissão para acessar esta área!")
+        return
+
+    st.caption(f"Dados deste processo desde o início ou a última limpeza "
+               f"(consultas lentas: ≥ {performance_stats.slow_ms:.0f} ms).")
+
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📄 Páginas", "🗄️ Consultas", "📇 Comandos", "🐢 Consultas Lentas", "🧠 Caches"])
+
+    with tab1:
+        st.markdown("### 📄 Tempo de Renderização por Página")
+
+        df_paginas = pd.DataFrame(performance_stats.page_summary())
+        if not df_paginas.empty:
+            df_paginas.columns = ['Página', 'Renderizações', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Máx (ms)']
+            st.dataframe(df_paginas.round(1), use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhuma página renderizada ainda.")
+
+    with tab2:
+        st.markdown("### 🗄️ Consultas por Impressão Digital")
+
+        df_consultas = pd.DataFrame(performance_stats.query_summary())
+        if not df_consultas.empty:
+            limite = st.slider("Mostrar as N consultas de maior tempo total", 5, 100, 20)
+            df_consultas = df_consultas.head(limite)
+            df_consultas.columns = [
+                'ID', 'SQL', 'Chamadas', 'Total (ms)', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)',
+                'Máx (ms)', 'Linhas (média)', 'Páginas'
+            ]
+            st.dataframe(df_consultas.round(2), use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhuma consulta registrada ainda.")
+
+    with tab3:
+        st.markdown("### 📇 Comandos Registrados")
+
+        registrados = {nome: comando.max_variantes for nome, comando in registered_statements().items()}
+        df_comandos = pd.DataFrame(performance_stats.statement_summary(registrados))
+        if not df_comandos.empty:
+            df_comandos.columns = [
+                'Comando', 'Chamadas', 'Variantes usadas', 'Variantes possíveis', 'Total (ms)',
+                'p50 (ms)', 'p95 (ms)', 'Variantes mais usadas'
+            ]
+            st.dataframe(df_comandos.round(2), use_container_width=True, hide_index=True)
+            st.caption(f"{(df_comandos['Chamadas'] == 0).sum()} de {len(df_comandos)} comando(s) sem chamadas neste processo.")
+        else:
+            st.info("Nenhum comando registrado.")
+
+    with tab4:
+        st.markdown("### 🐢 Consultas Mais Lentas")
+
+        lentas = performance_stats.slow_queries(limite=50)
+        if lentas:
+            df_lentas = pd.DataFrame([{
+                'Quando': datetime.fromtimestamp(r['quando']).strftime('%d/%m/%Y %H:%M:%S'),
+                'Duração (ms)': round(r['duracao_ms'], 1),
+                'Linhas': r['linhas'],
+                'Página': r['pagina'],
+                'Parâmetros': r['parametros'],
+                'SQL': r['sql']
+            } for r in lentas])
+            st.dataframe(df_lentas, use_container_width=True, hide_index=True)
+        else:
+            st.success("✅ Nenhuma consulta lenta registrada.")
+
+    with tab5:
+        st.markdown("### 🧠 Taxa de Acerto dos Caches")
+
+        caches = {"Figuras (gráficos)": figure_cache.stats(), "Agenda (semana/mês)": calendar_cache.stats(),
+                  "Linha do tempo (pacientes)": timeline_cache.stats()}
+        colunas = st.columns(len(caches))
+        for coluna, (nome, stats) in zip(colunas, caches.items()):
+            with coluna:
+                st.metric(nome, f"{stats['hit_rate']:.0%}",
+                          help=f"{stats['hits']} acertos, {stats['misses']} faltas, {stats['entries']} entradas")
+
+        if estado_aquecimento['pronto']:
+            etapas = ", ".join(f"{nome} {ms:.0f} ms" for nome, ms in estado_aquecimento['etapas'].items())
+            st.caption(f"🔥 Aquecimento concluído em "
+                       f"{datetime.fromtimestamp(estado_aquecimento['concluido_em']).strftime('%d/%m/%Y %H:%M:%S')}"
+                       f" ({etapas})")
+        elif estado_aquecimento['erro']:
+            st.warning(f"⚠️ Falha no aquecimento: {estado_aquecimento['erro']}")
+        else:
+            st.caption("🔥 Aquecimento em andamento...")
+
+        admissao = admission_controller.stats()
+        st.caption(f"⏱️ Consultas pesadas: {admissao['ativas']}/{admissao['limite']} em execução, "
+                   f"{admissao['recusadas']} recusadas por falta de vaga "
+                   f"(orçamento de {HEAVY_QUERY_BUDGET_MS / 1000:.0f} s por consulta)")
+
+    # Exportação e limpeza
+    col1, col2 = st.columns(2)
+
+    with col1:
+        buffer = io.StringIO()
+        total = performance_stats.export_jsonl(buffer)
+        st.download_button(
+            f"📥 Exportar {total} registros (JSON lines)",
+            buffer.getvalue(),
+            file_name=f"consultas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+            mime="application/x-ndjson",
+            use_container_width=True
+        )
+
+    with col2:
+        if st.button("🧹 Limpar Registros", use_container_width=True):
+            performance_stats.clear()
+            st.rerun()
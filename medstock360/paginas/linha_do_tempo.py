@@ -0,0 +1,86 @@
+"""Página da linha do tempo clínica do paciente"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+from medstock360.linha_do_tempo import load_timeline_page
+
+# Ícone de cada tipo de evento
+ICONES_EVENTO = {'consulta': '📅', 'receita': '📝', 'movimentacao': '💊'}
+
+
+def _load_more():
+    """Mostrar mais uma página (on_click)"""
+    st.session_state.linha_do_tempo['paginas'] += 1
+
+
+def show_linha_do_tempo():
+    """Módulo da linha do tempo do paciente"""
+    st.markdown("## 🩺 Linha do Tempo do Paciente")
+
+    search_term = st.text_input("🔍 Buscar paciente", placeholder="Nome ou CPF", key="linha_do_tempo_busca")
+    if not search_term:
+        st.info("Digite o nome ou o CPF do paciente.")
+        return
+
+    conn = st.session_state.db_manager.get_connection()
+    pacientes = pd.read_sql("""
+        SELECT id, nome_completo, cpf, data_nascimento
+        FROM pacientes
+        WHERE ativo = 1 AND (nome_completo LIKE ? OR cpf LIKE ?)
+        ORDER BY nome_completo
+        LIMIT 50
+    """, conn, params=[f"%{search_term}%", f"%{search_term}%"])
+    conn.close()
+
+    if pacientes.empty:
+        st.warning("Nenhum paciente encontrado.")
+        return
+
+    paciente_options = {
+        f"{row['nome_completo']} - {row['cpf'] or 'CPF não informado'}": int(row['id'])
+        for _, row in pacientes.iterrows()
+    }
+    paciente_id = paciente_options[st.selectbox("Paciente", list(paciente_options.keys()))]
+
+    # Páginas já abertas para este paciente (mais recentes primeiro)
+    estado = st.session_state.setdefault('linha_do_tempo', {'paciente_id': None, 'paginas': 1})
+    if estado['paciente_id'] != paciente_id:
+        estado.update(paciente_id=paciente_id, paginas=1)
+
+    eventos, cursor = [], None
+    for _ in range(estado['paginas']):
+        pagina, cursor = load_timeline_page(st.session_state.db_manager, paciente_id, cursor)
+        eventos.extend(pagina)
+        if cursor is None:
+            break
+
+    if not eventos:
+        st.info("Nenhum evento registrado para este paciente.")
+        return
+
+    st.caption(f"{len(eventos)} eventos, do mais recente para o mais antigo")
+
+    mes_atual = None
+    for evento in eventos:
+        data = datetime.strptime(evento['data'][:19], '%Y-%m-%d %H:%M:%S')
+
+        # Separador por mês
+        if data.strftime('%m/%Y') != mes_atual:
+            mes_atual = data.strftime('%m/%Y')
+            st.markdown(f"#### {mes_atual}")
+
+        linha = f"{ICONES_EVENTO.get(evento['tipo'], '•')} **{data.strftime('%d/%m/%Y %H:%M')}** — {evento['titulo']}"
+        if evento['status']:
+            linha += f" ({evento['status']})"
+        if evento['profissional']:
+            linha += f" · {evento['profissional']}"
+        st.markdown(linha)
+
+        for texto in (evento['detalhe'], evento['observacao']):
+            if texto:
+                st.caption(texto)
+
+    if cursor is not None:
+        st.button("⬇️ Carregar eventos anteriores", on_click=_load_more)
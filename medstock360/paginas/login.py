@@ -0,0 +1,91 @@
+"""Página de login"""
+
+import streamlit as st
+import time
+
+from medstock360.auth import AuthManager
+from medstock360.config import ENVIRONMENT
+from medstock360.unidades import get_shard_router
+
+
+def show_login_page():
+    """Página de login otimizada para Railway"""
+    
+    # Badge de ambiente cloud
+    cloud_badge = ""
+    if ENVIRONMENT == 'production':
+        cloud_badge = '<span class="cloud-badge">☁️ CLOUD</span>'
+    
+    st.markdown(f"""
+    <div class="main-header">
+        <h1>🏥 MedStock360 Advanced{cloud_badge}</h1>
+        <p>Sistema Hospitalar Completo Multi-usuário</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Informações da versão cloud
+    if ENVIRONMENT == 'production':
+        st.markdown("""
+        <div class="cloud-info">
+            ☁️ <strong>Versão Cloud</strong> | 🌐 Acesso Global 24/7 | 🔒 Dados Seguros | 💾 Backup Automático
+        </div>
+        """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        st.markdown("### 🔐 Acesso ao Sistema")
+        
+        router = get_shard_router()
+        
+        with st.form("login_form"):
+            # Cada unidade tem o seu banco (e os seus usuários)
+            unidade = router.unidades[0]
+            if router.multi_unidade:
+                unidade = st.selectbox("🏥 Unidade", router.unidades)
+            
+            username = st.text_input("👤 Usuário", placeholder="Digite seu usuário")
+            password = st.text_input("🔒 Senha", type="password", placeholder="Digite sua senha")
+            
+            submitted = st.form_submit_button("🚀 Entrar", use_container_width=True)
+            
+            if submitted:
+                if not username or not password:
+                    st.error("❌ Por favor, preencha todos os campos!")
+                else:
+                    if router.multi_unidade:
+                        st.session_state.db_manager = router.manager(unidade)
+                        st.session_state.auth_manager = AuthManager(st.session_state.db_manager)
+                    
+                    user = st.session_state.auth_manager.authenticate(username, password)
+                    if user:
+                        if router.multi_unidade:
+                            user['unidade'] = unidade
+                        st.session_state.authenticated = True
+                        st.session_state.user = user
+                        st.session_state.permissions = st.session_state.auth_manager.get_user_permissions(user['perfil'])
+                        st.success(f"✅ Bem-vindo, {user['nome_completo']}!")
+                        time.sleep(1)
+                        st.rerun()
+                    else:
+                        st.error("❌ Usuário ou senha incorretos!")
+        
+        st.markdown("---")
+        st.info("""
+        **Usuário Padrão:**
+        - Usuário: `admin`
+        - Senha: `admin123`
+        
+        ⚠️ **IMPORTANTE:** Mude a senha após o primeiro login!
+        """)
+        
+        # Informações adicionais para versão cloud
+        if ENVIRONMENT == 'production':
+            st.markdown("---")
+            st.success("""
+            🌟 **Sistema na Nuvem Ativo!**
+            - ✅ Acesso de qualquer lugar
+            - ✅ Múltiplos usuários simultâneos  
+            - ✅ Dados sincronizados em tempo real
+            - ✅ Backup automático
+            """)
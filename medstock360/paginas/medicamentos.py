@@ -0,0 +1,143 @@
+"""Página de gestão de medicamentos"""
+
+import streamlit as st
+import time
+
+from medstock360.comandos import read_sql
+
+
+def show_medicamentos():
+    """Módulo de medicamentos"""
+    st.markdown("## 💊 Gestão de Medicamentos")
+    
+    # Verificar permissões
+    if 'criar' in st.session_state.permissions.get('medicamentos', []):
+        tab1, tab2 = st.tabs(["📋 Lista de Medicamentos", "➕ Cadastrar Medicamento"])
+    else:
+        tab1, tab2 = st.tabs(["📋 Lista de Medicamentos", ""])
+    
+    with tab1:
+        st.markdown("### 📋 Medicamentos Cadastrados")
+        
+        # Filtros
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            search_term = st.text_input("🔍 Buscar medicamento", placeholder="Nome ou princípio ativo")
+        
+        with col2:
+            conn = st.session_state.db_manager.get_connection()
+            categorias = read_sql(conn, 'medicamentos.categorias')['categoria'].tolist()
+            categoria_filter = st.selectbox("📂 Categoria", ["Todas"] + categorias)
+        
+        with col3:
+            controlado_filter = st.selectbox("🎯 Tipo", ["Todos", "Controlados", "Não Controlados"])
+        
+        # Buscar medicamentos
+        params, filtros = {}, []
+        
+        if search_term:
+            params['busca'] = f"%{search_term}%"
+            filtros.append('busca')
+        
+        if categoria_filter != "Todas":
+            params['categoria'] = categoria_filter
+            filtros.append('categoria')
+        
+        if controlado_filter != "Todos":
+            params['controlado'] = 1 if controlado_filter == "Controlados" else 0
+            filtros.append('controlado')
+        
+        df_medicamentos = read_sql(conn, 'medicamentos.lista', params, filtros)
+        conn.close()
+        
+        if not df_medicamentos.empty:
+            # Exibir tabela
+            for _, med in df_medicamentos.iterrows():
+                with st.expander(f"💊 {med['nome']} {'🔒' if med['controlado'] else ''}"):
+                    col1, col2, col3 = st.columns(3)
+                    
+                    with col1:
+                        st.write(f"**Princípio Ativo:** {med['principio_ativo'] or 'N/A'}")
+                        st.write(f"**Fabricante:** {med['fabricante'] or 'N/A'}")
+                        st.write(f"**Categoria:** {med['categoria'] or 'N/A'}")
+                    
+                    with col2:
+                        st.write(f"**Apresentação:** {med['apresentacao'] or 'N/A'}")
+                        st.write(f"**Concentração:** {med['concentracao'] or 'N/A'}")
+                        st.write(f"**Via de Administração:** {med['via_administracao'] or 'N/A'}")
+                    
+                    with col3:
+                        st.write(f"**Registro ANVISA:** {med['registro_anvisa'] or 'N/A'}")
+                        st.write(f"**Controlado:** {'Sim' if med['controlado'] else 'Não'}")
+                        st.write(f"**Cadastrado por:** {med['cadastrado_por_nome'] or 'N/A'}")
+                    
+                    if med['observacoes']:
+                        st.write(f"**Observações:** {med['observacoes']}")
+        else:
+            st.info("Nenhum medicamento encontrado com os filtros aplicados.")
+    
+    if 'criar' in st.session_state.permissions.get('medicamentos', []):
+        with tab2:
+            st.markdown("### ➕ Cadastrar Novo Medicamento")
+            
+            with st.form("form_medicamento"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    nome = st.text_input("Nome do Medicamento *", placeholder="Ex: Dipirona Sódica")
+                    principio_ativo = st.text_input("Princípio Ativo", placeholder="Ex: Dipirona Sódica")
+                    fabricante = st.text_input("Fabricante", placeholder="Ex: EMS")
+                    categoria = st.selectbox("Categoria", [
+                        "", "Analgésicos", "Anti-inflamatórios", "Antibióticos", 
+                        "Antidepressivos", "Anti-hipertensivos", "Vitaminas",
+                        "Controlados", "Outros"
+                    ])
+                    apresentacao = st.text_input("Apresentação", placeholder="Ex: Comprimido, Ampola, Frasco")
+                
+                with col2:
+                    concentracao = st.text_input("Concentração", placeholder="Ex: 500mg")
+                    registro_anvisa = st.text_input("Registro ANVISA", placeholder="Ex: 1.0000.0000")
+                    controlado = st.checkbox("Medicamento Controlado")
+                    temperatura_armazenamento = st.selectbox("Temperatura de Armazenamento", [
+                        "", "Ambiente (15°C a 30°C)", "Refrigerado (2°C a 8°C)", 
+                        "Congelado (-20°C)", "Controlada (20°C a 25°C)"
+                    ])
+                    via_administracao = st.selectbox("Via de Administração", [
+                        "", "Oral", "Intravenosa", "Intramuscular", "Subcutânea",
+                        "Tópica", "Oftálmica", "Nasal", "Retal", "Outras"
+                    ])
+                
+                observacoes = st.text_area("Observações", placeholder="Informações adicionais...")
+                
+                submitted = st.form_submit_button("💾 Cadastrar Medicamento", use_container_width=True)
+                
+                if submitted:
+                    if not nome:
+                        st.error("❌ O nome do medicamento é obrigatório!")
+                    else:
+                        try:
+                            conn = st.session_state.db_manager.get_connection()
+                            cursor = conn.cursor()
+                            
+                            cursor.execute("""
+                                INSERT INTO medicamentos (
+                                    nome, principio_ativo, fabricante, categoria, apresentacao,
+                                    concentracao, registro_anvisa, controlado, temperatura_armazenamento,
+                                    via_administracao, observacoes, cadastrado_por
+                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            """, (
+                                nome, principio_ativo, fabricante, categoria, apresentacao,
+                                concentracao, registro_anvisa, controlado, temperatura_armazenamento,
+                                via_administracao, observacoes, st.session_state.user['id']
+                            ))
+                            
+                            conn.commit()
+                            conn.close()
+                            
+                            st.success("✅ Medicamento cadastrado com sucesso!")
+                            time.sleep(2)
+                            st.rerun()
+                            
+                        except Exception as e:
+                            st.error(f"❌ Erro ao cadastrar medicamento: {str(e)}")
@@ -0,0 +1,219 @@
+"""Página de gestão de pacientes"""
+
+import streamlit as st
+import pandas as pd
+import time
+from pathlib import Path
+
+from medstock360.comandos import read_sql
+from medstock360.duplicados import check_new_patient
+from medstock360.tarefas import STATUS_TAREFA, list_jobs, submit_job
+
+
+def _submit_dedup_report():
+    """Enfileirar o relatório de duplicados (on_click)"""
+    tarefa_id = submit_job(st.session_state.db_manager, 'pacientes_duplicados', {}, st.session_state.user)
+    tarefas = st.session_state.setdefault('tarefas', [])
+    if tarefa_id not in tarefas:
+        tarefas.append(tarefa_id)
+
+
+def _show_dedup_report():
+    """Relatório de pacientes possivelmente duplicados (tarefa em segundo plano)"""
+    st.markdown("### 🔁 Pacientes Possivelmente Duplicados")
+    st.caption("Compara nomes parecidos (fonética e trigramas), data de nascimento e telefone de toda a base.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("🔍 Gerar relatório", key="gerar_duplicados", on_click=_submit_dedup_report)
+    with col2:
+        st.button("🔄 Atualizar", key="atualizar_duplicados")
+    
+    tarefas = [t for t in list_jobs(st.session_state.db_manager, st.session_state.user.get('id'),
+                                    st.session_state.get('tarefas', []))
+               if t['tipo'] == 'pacientes_duplicados']
+    if not tarefas:
+        st.info("Nenhum relatório gerado.")
+        return
+    
+    tarefa = tarefas[0]
+    st.write(f"**#{tarefa['id']}** — {STATUS_TAREFA.get(tarefa['status'], tarefa['status'])}")
+    if tarefa['status'] == 'executando':
+        st.progress(tarefa['progresso'] or 0.0, text=tarefa['mensagem'] or "")
+    elif tarefa['status'] == 'falhou':
+        st.caption(f"Erro: {tarefa['erro']}")
+    elif tarefa['status'] == 'concluida' and tarefa['arquivo'] and Path(tarefa['arquivo']).exists():
+        st.caption(f"{tarefa['linhas']} pares, concluído em {tarefa['concluido_em']}")
+        arquivo = Path(tarefa['arquivo'])
+        st.dataframe(pd.read_csv(arquivo, nrows=100), use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Baixar relatório completo", arquivo.read_bytes(),
+                           file_name=f"pacientes_duplicados_{tarefa['id']}.csv.gz",
+                           mime="application/gzip", key=f"baixar_duplicados_{tarefa['id']}")
+
+
+def show_pacientes():
+    """Módulo de pacientes"""
+    st.markdown("## 👥 Gestão de Pacientes")
+    
+    # Verificar permissões
+    permissoes = st.session_state.permissions.get('pacientes', [])
+    abas = ["📋 Lista de Pacientes", "➕ Cadastrar Paciente" if 'criar' in permissoes else ""]
+    if 'editar' in permissoes:
+        abas.append("🔁 Duplicados")
+    tab1, tab2, *tab_duplicados = st.tabs(abas)
+    
+    with tab1:
+        st.markdown("### 📋 Pacientes Cadastrados")
+        
+        # Filtros
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            search_term = st.text_input("🔍 Buscar paciente", placeholder="Nome ou CPF")
+        
+        with col2:
+            conn = st.session_state.db_manager.get_connection()
+            planos = read_sql(conn, 'pacientes.planos')['plano_saude'].tolist()
+            plano_filter = st.selectbox("🏥 Plano de Saúde", ["Todos"] + planos)
+        
+        # Buscar pacientes
+        params, filtros = {}, []
+        
+        if search_term:
+            params['busca'] = f"%{search_term}%"
+            filtros.append('busca')
+        
+        if plano_filter != "Todos":
+            params['plano'] = plano_filter
+            filtros.append('plano')
+        
+        df_pacientes = read_sql(conn, 'pacientes.lista', params, filtros)
+        conn.close()
+        
+        if not df_pacientes.empty:
+            for _, pac in df_pacientes.iterrows():
+                with st.expander(f"👤 {pac['nome_completo']} - {pac['cpf'] or 'CPF não informado'}"):
+                    col1, col2, col3 = st.columns(3)
+                    
+                    with col1:
+                        st.write(f"**Nome:** {pac['nome_completo']}")
+                        st.write(f"**CPF:** {pac['cpf'] or 'N/A'}")
+                        st.write(f"**RG:** {pac['rg'] or 'N/A'}")
+                        st.write(f"**Data de Nascimento:** {pac['data_nascimento'] or 'N/A'}")
+                        st.write(f"**Sexo:** {pac['sexo'] or 'N/A'}")
+                    
+                    with col2:
+                        st.write(f"**Telefone:** {pac['telefone'] or 'N/A'}")
+                        st.write(f"**Email:** {pac['email'] or 'N/A'}")
+                        st.write(f"**Cidade:** {pac['cidade'] or 'N/A'}")
+                        st.write(f"**Estado:** {pac['estado'] or 'N/A'}")
+                        st.write(f"**CEP:** {pac['cep'] or 'N/A'}")
+                    
+                    with col3:
+                        st.write(f"**Plano de Saúde:** {pac['plano_saude'] or 'N/A'}")
+                        st.write(f"**Carteirinha:** {pac['numero_carteirinha'] or 'N/A'}")
+                        st.write(f"**Contato de Emergência:** {pac['contato_emergencia'] or 'N/A'}")
+                        st.write(f"**Cadastrado por:** {pac['cadastrado_por_nome'] or 'N/A'}")
+                    
+                    if pac['endereco']:
+                        st.write(f"**Endereço:** {pac['endereco']}")
+                    if pac['observacoes']:
+                        st.write(f"**Observações:** {pac['observacoes']}")
+        else:
+            st.info("Nenhum paciente encontrado com os filtros aplicados.")
+    
+    if 'criar' in st.session_state.permissions.get('pacientes', []):
+        with tab2:
+            st.markdown("### ➕ Cadastrar Novo Paciente")
+            
+            with st.form("form_paciente"):
+                st.markdown("**Dados Pessoais**")
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    nome_completo = st.text_input("Nome Completo *", placeholder="Nome completo do paciente")
+                    cpf = st.text_input("CPF", placeholder="000.000.000-00")
+                    rg = st.text_input("RG", placeholder="00.000.000-0")
+                    data_nascimento = st.date_input("Data de Nascimento")
+                    sexo = st.selectbox("Sexo", ["", "Masculino", "Feminino", "Outro", "Não informar"])
+                
+                with col2:
+                    telefone = st.text_input("Telefone", placeholder="(00) 00000-0000")
+                    email = st.text_input("Email", placeholder="email@exemplo.com")
+                    contato_emergencia = st.text_input("Contato de Emergência", placeholder="Nome e telefone")
+                
+                st.markdown("**Endereço**")
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    endereco = st.text_input("Endereço", placeholder="Rua, número, complemento")
+                    cidade = st.text_input("Cidade", placeholder="Nome da cidade")
+                
+                with col2:
+                    estado = st.selectbox("Estado", [
+                        "", "AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", 
+                        "MA", "MT", "MS", "MG", "PA", "PB", "PR", "PE", "PI", 
+                        "RJ", "RN", "RS", "RO", "RR", "SC", "SP", "SE", "TO"
+                    ])
+                    cep = st.text_input("CEP", placeholder="00000-000")
+                
+                st.markdown("**Convênio/Plano de Saúde**")
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    plano_saude = st.text_input("Plano de Saúde", placeholder="Nome do plano/convênio")
+                
+                with col2:
+                    numero_carteirinha = st.text_input("Número da Carteirinha", placeholder="Número da carteirinha")
+                
+                observacoes = st.text_area("Observações", placeholder="Informações adicionais sobre o paciente...")
+                
+                submitted = st.form_submit_button("💾 Cadastrar Paciente", use_container_width=True)
+                
+                if submitted:
+                    # Pacientes parecidos: o cadastro só segue se o usuário enviar de novo
+                    parecidos = check_new_patient(st.session_state.db_manager, nome_completo, data_nascimento,
+                                                  telefone, cpf, sexo) if nome_completo else []
+                    confirmado = st.session_state.get('pacientes_parecidos') == [p['id'] for p in parecidos]
+                    
+                    if not nome_completo:
+                        st.error("❌ O nome completo é obrigatório!")
+                    elif parecidos and not confirmado:
+                        st.session_state.pacientes_parecidos = [p['id'] for p in parecidos]
+                        st.warning("⚠️ Já existem pacientes parecidos. Confira antes de cadastrar; "
+                                   "para cadastrar mesmo assim, clique em Cadastrar Paciente novamente.")
+                        for parecido in parecidos:
+                            st.write(f"• {parecido['nome_completo']} — nascimento "
+                                     f"{parecido['data_nascimento'] or 'N/A'} — CPF {parecido['cpf'] or 'N/A'} "
+                                     f"({parecido['pontuacao']:.0%})")
+                    else:
+                        try:
+                            conn = st.session_state.db_manager.get_connection()
+                            cursor = conn.cursor()
+                            
+                            cursor.execute("""
+                                INSERT INTO pacientes (
+                                    nome_completo, cpf, rg, data_nascimento, sexo, telefone, email,
+                                    endereco, cidade, estado, cep, plano_saude, numero_carteirinha,
+                                    contato_emergencia, observacoes, cadastrado_por
+                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            """, (
+                                nome_completo, cpf or None, rg, data_nascimento, sexo, telefone, email,
+                                endereco, cidade, estado, cep, plano_saude, numero_carteirinha,
+                                contato_emergencia, observacoes, st.session_state.user['id']
+                            ))
+                            
+                            conn.commit()
+                            conn.close()
+                            
+                            st.session_state.pop('pacientes_parecidos', None)
+                            st.success("✅ Paciente cadastrado com sucesso!")
+                            time.sleep(2)
+                            st.rerun()
+                            
+                        except Exception as e:
+                            st.error(f"❌ Erro ao cadastrar paciente: {str(e)}")
+    
+    if tab_duplicados:
+        with tab_duplicados[0]:
+            _show_dedup_report()
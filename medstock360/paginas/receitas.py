@@ -0,0 +1,315 @@
+"""Página de gestão de receitas"""
+
+import streamlit as st
+from datetime import timedelta, date
+import json
+import time
+from contextlib import nullcontext
+
+from medstock360.auditoria import audit_event
+from medstock360.comandos import read_sql
+from medstock360.datas import epoch_range, from_integer
+from medstock360.interacoes import ICONES_GRAVIDADE, check_prescription
+from medstock360.orcamento import heavy_query
+
+
+def _update_status(receita_id, status_anterior, novo_status, acao):
+    """
+    Dispensar/cancelar uma receita (faixa rápida)
+
+    Roda no on_click, no início da próxima execução: não espera a listagem
+    (que pode ser uma consulta pesada) nem a admissão de consultas pesadas.
+    """
+    conn = st.session_state.db_manager.get_connection()
+    try:
+        conn.execute("UPDATE receitas SET status = ? WHERE id = ?", (novo_status, receita_id))
+        conn.commit()
+        audit_event(st.session_state.user, acao, 'receitas', receita_id,
+                    antes={'status': status_anterior}, depois={'status': novo_status})
+        st.session_state.receitas_mensagem = ('success', f"Receita {novo_status.lower()}!")
+    except Exception as e:
+        st.session_state.receitas_mensagem = ('error', f"Erro: {e}")
+    finally:
+        conn.close()
+
+
+def _show_interactions(alertas, nomes):
+    """Alertas de interação da receita em montagem"""
+    for alerta in alertas:
+        origem = " (em uso pelo paciente)" if alerta['em_uso'] else ""
+        st.warning(
+            f"{ICONES_GRAVIDADE[alerta['gravidade']]} Interação {alerta['gravidade']}: "
+            f"**{nomes.get(alerta['medicamento_a'], alerta['principio_a'])}** × "
+            f"**{nomes.get(alerta['medicamento_b'], alerta['principio_b'])}**{origem}"
+            + (f" — {alerta['descricao']}" if alerta['descricao'] else "")
+        )
+
+
+def show_receitas():
+    """Módulo de receitas"""
+    st.markdown("## 📝 Gestão de Receitas")
+    
+    # Verificar permissões
+    if 'criar' in st.session_state.permissions.get('receitas', []):
+        tab1, tab2 = st.tabs(["📋 Receitas", "➕ Nova Receita"])
+    else:
+        tab1, tab2 = st.tabs(["📋 Receitas", ""])
+    
+    with tab1:
+        st.markdown("### 📋 Receitas Emitidas")
+        
+        # Resultado da última dispensação/cancelamento
+        if 'receitas_mensagem' in st.session_state:
+            tipo, mensagem = st.session_state.pop('receitas_mensagem')
+            getattr(st, tipo)(mensagem)
+        
+        # Filtros
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            search_term = st.text_input("🔍 Buscar", placeholder="Nome do paciente")
+        
+        with col2:
+            periodo = st.selectbox("📅 Período", ["Últimos 7 dias", "Últimos 30 dias", "Últimos 90 dias", "Personalizado"])
+        
+        with col3:
+            status_filter = st.selectbox("📊 Status", ["Todas", "Ativa", "Dispensada", "Cancelada"])
+        
+        # Definir período de busca
+        if periodo == "Últimos 7 dias":
+            data_inicio = date.today() - timedelta(days=7)
+            data_fim = date.today()
+        elif periodo == "Últimos 30 dias":
+            data_inicio = date.today() - timedelta(days=30)
+            data_fim = date.today()
+        elif periodo == "Últimos 90 dias":
+            data_inicio = date.today() - timedelta(days=90)
+            data_fim = date.today()
+        else:  # Personalizado
+            col1, col2 = st.columns(2)
+            with col1:
+                data_inicio = st.date_input("Data Início", value=date.today() - timedelta(days=30))
+            with col2:
+                data_fim = st.date_input("Data Fim", value=date.today())
+        
+        # Buscar receitas
+        params, filtros = dict(zip(('inicio', 'fim'), epoch_range(data_inicio, data_fim))), []
+        
+        if search_term:
+            params['busca'] = f"%{search_term}%"
+            filtros.append('busca')
+        
+        if status_filter != "Todas":
+            params['status'] = status_filter
+            filtros.append('status')
+        
+        # Períodos longos são consultas pesadas: admissão e orçamento de tempo
+        pesada = periodo in ("Últimos 90 dias", "Personalizado")
+        conn = st.session_state.db_manager.get_connection()
+        try:
+            with heavy_query(conn, st.session_state.user) if pesada else nullcontext():
+                df_receitas = read_sql(conn, 'receitas.lista', params, filtros)
+                
+                # Itens de todas as receitas listadas em uma única consulta
+                df_itens = read_sql(conn, 'receitas.itens', {'receitas': json.dumps(df_receitas['id'].tolist())})
+        except TimeoutError as e:
+            st.warning(f"⏱️ {e}")
+            df_receitas = df_itens = None
+        finally:
+            conn.close()
+        
+        itens_por_receita = dict(tuple(df_itens.groupby('receita_id'))) if df_itens is not None else {}
+        if df_receitas is not None:
+            df_receitas['data_emissao_dt'] = from_integer(df_receitas['data_emissao_ts'])
+        
+        if df_receitas is not None and not df_receitas.empty:
+            for _, rec in df_receitas.iterrows():
+                status_icon = {'Ativa': '🟢', 'Dispensada': '✅', 'Cancelada': '🔴'}.get(rec['status'], '⚪')
+                data_emissao = rec['data_emissao_dt']
+                
+                with st.expander(f"{status_icon} Receita #{rec['id']} - {rec['paciente_nome']} - {data_emissao.strftime('%d/%m/%Y')}"):
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        st.write(f"**Paciente:** {rec['paciente_nome']}")
+                        st.write(f"**Médico:** Dr(a). {rec['medico_nome']}")
+                        st.write(f"**Data de Emissão:** {data_emissao.strftime('%d/%m/%Y %H:%M')}")
+                        st.write(f"**Status:** {rec['status']}")
+                    
+                    with col2:
+                        st.write(f"**Total de Medicamentos:** {rec['total_medicamentos']}")
+                        if rec['observacoes']:
+                            st.write(f"**Observações:** {rec['observacoes']}")
+                    
+                    # Itens da receita
+                    df_itens_receita = itens_por_receita.get(rec['id'])
+                    
+                    if df_itens_receita is not None:
+                        st.markdown("**Medicamentos Prescritos:**")
+                        for _, item in df_itens_receita.iterrows():
+                            st.write(f"• {item['medicamento_nome']} - {item['dosagem']} - {item['frequencia']} - Qtd: {item['quantidade']}")
+                            if item['duracao_tratamento']:
+                                st.write(f"  Duração: {item['duracao_tratamento']}")
+                            if item['instrucoes_uso']:
+                                st.write(f"  Instruções: {item['instrucoes_uso']}")
+                    
+                    # Ações (gravadas no on_click, antes da listagem ser refeita)
+                    if 'editar' in st.session_state.permissions.get('receitas', []) and rec['status'] == 'Ativa':
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            st.button("💊 Dispensar", key=f"dispensar_{rec['id']}", on_click=_update_status,
+                                      args=(int(rec['id']), rec['status'], 'Dispensada', 'dispensar'))
+                        
+                        with col2:
+                            st.button("❌ Cancelar", key=f"cancelar_rec_{rec['id']}", on_click=_update_status,
+                                      args=(int(rec['id']), rec['status'], 'Cancelada', 'cancelar'))
+        
+        if df_receitas is not None and df_receitas.empty:
+            st.info("Nenhuma receita encontrada com os filtros aplicados.")
+    
+    if 'criar' in st.session_state.permissions.get('receitas', []):
+        with tab2:
+            st.markdown("### ➕ Prescrever Nova Receita")
+            
+            # Buscar pacientes e medicamentos
+            conn = st.session_state.db_manager.get_connection()
+            pacientes = read_sql(conn, 'pacientes.ativos')
+            medicamentos = read_sql(conn, 'medicamentos.ativos')
+            conn.close()
+            
+            if pacientes.empty:
+                st.warning("⚠️ Nenhum paciente cadastrado.")
+            elif medicamentos.empty:
+                st.warning("⚠️ Nenhum medicamento cadastrado.")
+            else:
+                with st.form("form_receita"):
+                    # Dados da receita
+                    paciente_options = {f"{row['nome_completo']}": row['id'] for _, row in pacientes.iterrows()}
+                    paciente_selecionado = st.selectbox("Paciente *", list(paciente_options.keys()))
+                    
+                    observacoes_receita = st.text_area("Observações da Receita", placeholder="Orientações gerais...")
+                    
+                    st.markdown("---")
+                    st.markdown("**Medicamentos Prescritos**")
+                    
+                    # Sistema para adicionar medicamentos
+                    if 'medicamentos_receita' not in st.session_state:
+                        st.session_state.medicamentos_receita = []
+                    
+                    # Interações entre os itens e com o que o paciente já usa
+                    alertas = []
+                    if st.session_state.medicamentos_receita:
+                        alertas = check_prescription(
+                            st.session_state.db_manager,
+                            [med['medicamento_id'] for med in st.session_state.medicamentos_receita],
+                            paciente_options[paciente_selecionado]
+                        )
+                        _show_interactions(alertas, dict(zip(medicamentos['id'], medicamentos['nome'])))
+                    graves = any(alerta['gravidade'] == 'grave' for alerta in alertas)
+                    confirmar_graves = graves and st.checkbox("Prescrever mesmo com interações graves")
+                    
+                    # Formulário para adicionar medicamento
+                    col1, col2, col3 = st.columns(3)
+                    
+                    with col1:
+                        medicamento_options = {f"{row['nome']}": row['id'] for _, row in medicamentos.iterrows()}
+                        medicamento_selecionado = st.selectbox("Medicamento", [""] + list(medicamento_options.keys()))
+                        dosagem = st.text_input("Dosagem", placeholder="Ex: 500mg")
+                    
+                    with col2:
+                        frequencia = st.text_input("Frequência", placeholder="Ex: 8/8h, 2x ao dia")
+                        quantidade = st.number_input("Quantidade", min_value=1, value=1)
+                    
+                    with col3:
+                        duracao_tratamento = st.text_input("Duração do Tratamento", placeholder="Ex: 7 dias")
+                        instrucoes_uso = st.text_input("Instruções de Uso", placeholder="Ex: Após as refeições")
+                    
+                    # Botão para adicionar medicamento à lista
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        if st.form_submit_button("➕ Adicionar Medicamento"):
+                            if medicamento_selecionado and dosagem and frequencia:
+                                novo_medicamento = {
+                                    'medicamento_id': medicamento_options[medicamento_selecionado],
+                                    'medicamento_nome': medicamento_selecionado,
+                                    'dosagem': dosagem,
+                                    'frequencia': frequencia,
+                                    'quantidade': quantidade,
+                                    'duracao_tratamento': duracao_tratamento,
+                                    'instrucoes_uso': instrucoes_uso
+                                }
+                                st.session_state.medicamentos_receita.append(novo_medicamento)
+                                st.success("Medicamento adicionado!")
+                                st.rerun()
+                            else:
+                                st.error("Preencha pelo menos: medicamento, dosagem e frequência!")
+                    
+                    with col2:
+                        if st.form_submit_button("💾 Salvar Receita"):
+                            if not paciente_selecionado:
+                                st.error("❌ Selecione um paciente!")
+                            elif not st.session_state.medicamentos_receita:
+                                st.error("❌ Adicione pelo menos um medicamento!")
+                            elif graves and not confirmar_graves:
+                                st.error("❌ Há interações graves: confirme a prescrição para salvar.")
+                            else:
+                                try:
+                                    conn = st.session_state.db_manager.get_connection()
+                                    cursor = conn.cursor()
+                                    
+                                    # Inserir receita
+                                    cursor.execute("""
+                                        INSERT INTO receitas (
+                                            paciente_id, medico_id, observacoes
+                                        ) VALUES (?, ?, ?)
+                                    """, (
+                                        paciente_options[paciente_selecionado],
+                                        st.session_state.user['id'],
+                                        observacoes_receita
+                                    ))
+                                    
+                                    receita_id = cursor.lastrowid
+                                    
+                                    # Inserir itens da receita
+                                    for medicamento in st.session_state.medicamentos_receita:
+                                        cursor.execute("""
+                                            INSERT INTO receita_itens (
+                                                receita_id, medicamento_id, dosagem, quantidade,
+                                                frequencia, duracao_tratamento, instrucoes_uso
+                                            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                                        """, (
+                                            receita_id,
+                                            medicamento['medicamento_id'],
+                                            medicamento['dosagem'],
+                                            medicamento['quantidade'],
+                                            medicamento['frequencia'],
+                                            medicamento['duracao_tratamento'],
+                                            medicamento['instrucoes_uso']
+                                        ))
+                                    
+                                    conn.commit()
+                                    conn.close()
+                                    
+                                    st.success("✅ Receita criada com sucesso!")
+                                    st.session_state.medicamentos_receita = []  # Limpar lista
+                                    time.sleep(2)
+                                    st.rerun()
+                                    
+                                except Exception as e:
+                                    st.error(f"❌ Erro ao criar receita: {str(e)}")
+                
+                # Exibir medicamentos adicionados
+                if st.session_state.medicamentos_receita:
+                    st.markdown("**Medicamentos Adicionados:**")
+                    for i, med in enumerate(st.session_state.medicamentos_receita):
+                        col1, col2 = st.columns([4, 1])
+                        
+                        with col1:
+                            st.write(f"• {med['medicamento_nome']} - {med['dosagem']} - {med['frequencia']} - Qtd: {med['quantidade']}")
+                        
+                        with col2:
+                            if st.button("🗑️", key=f"remove_{i}"):
+                                st.session_state.medicamentos_receita.pop(i)
+                                st.rerun()
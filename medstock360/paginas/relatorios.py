@@ -0,0 +1,376 @@
+"""Página de relatórios e análises"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta, date
+from pathlib import Path
+
+from medstock360.graficos import show_chart, downsample_series
+from medstock360.arquivamento import get_history_connection
+from medstock360.datas import SEGUNDOS_DIA, add_months, epoch, epoch_range, from_integer, month_range
+from medstock360.instantaneos import load_snapshot, refresh_snapshots
+from medstock360.orcamento import heavy_query
+from medstock360.tarefas import JOB_RESULT_TTL_HOURS, STATUS_TAREFA, list_jobs, submit_job
+from medstock360.unidades import get_shard_router, merge_aggregates
+
+
+def show_relatorios():
+    """Módulo de relatórios"""
+    st.markdown("## 📊 Relatórios e Análises")
+    
+    # Verificar permissões
+    if 'relatorios' not in st.session_state.permissions:
+        st.error("❌ Você não tem permissão para acessar esta área!")
+        return
+    
+    # Exportações (em segundo plano) só para quem pode exportar
+    pode_exportar = 'exportar' in st.session_state.permissions.get('relatorios', [])
+    abas = ["📊 Dashboard", "💊 Medicamentos", "👥 Pacientes", "📅 Consultas"]
+    if pode_exportar:
+        abas.append("📥 Exportações")
+    
+    tab1, tab2, tab3, tab4, *tab_exportacoes = st.tabs(abas)
+    
+    with tab1:
+        st.markdown("### 📊 Dashboard Executivo")
+        
+        # Com várias unidades, os agregados podem vir de toda a rede
+        router = get_shard_router()
+        rede = router.multi_unidade and st.checkbox("🏥 Todas as unidades", key="relatorio_rede")
+        
+        if rede:
+            parciais = list(router.fan_out(_executive_aggregates).values())
+            agregados = {
+                chave: sum(parcial[chave] for parcial in parciais)
+                for chave in ('medicamentos', 'pacientes', 'consultas_mes', 'receitas_mes')
+            }
+            agregados['consultas_por_mes'] = merge_aggregates(
+                [parcial['consultas_por_mes'] for parcial in parciais], ['mes'], ['quantidade']
+            ).sort_values('mes')
+            agregados['consultas_por_medico'] = merge_aggregates(
+                [parcial['consultas_por_medico'] for parcial in parciais], ['medico'], ['quantidade']
+            )
+        else:
+            agregados = _executive_aggregates(st.session_state.db_manager)
+        
+        # Top 10 só depois de juntar as unidades
+        df_consultas_medico = agregados['consultas_por_medico'].sort_values(
+            'quantidade', ascending=False
+        ).head(10)
+        
+        # Métricas principais
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("💊 Medicamentos", agregados['medicamentos'])
+        with col2:
+            st.metric("👥 Pacientes", agregados['pacientes'])
+        with col3:
+            st.metric("📅 Consultas (Mês)", agregados['consultas_mes'])
+        with col4:
+            st.metric("📝 Receitas (Mês)", agregados['receitas_mes'])
+        
+        st.markdown("---")
+        
+        # Gráficos
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("### 📈 Consultas por Mês (Últimos 6 meses)")
+            df_consultas_mes = agregados['consultas_por_mes']
+            
+            if not df_consultas_mes.empty:
+                show_chart('line', df_consultas_mes, x='mes', y='quantidade', markers=True,
+                           layout={'xaxis_title': "Mês", 'yaxis_title': "Quantidade"})
+            else:
+                st.info("Sem dados de consultas.")
+        
+        with col2:
+            st.markdown("### 🏥 Consultas por Médico (Este mês)")
+            
+            if not df_consultas_medico.empty:
+                show_chart('bar', df_consultas_medico, x='quantidade', y='medico', orientation='h',
+                           layout={'xaxis_title': "Quantidade", 'yaxis_title': "Médico"})
+            else:
+                st.info("Sem dados de consultas por médico.")
+    
+    with tab2:
+        st.markdown("### 💊 Relatórios de Medicamentos")
+        
+        # Filtros
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            relatorio_tipo = st.selectbox("Tipo de Relatório", [
+                "Medicamentos por Categoria",
+                "Estoque Atual",
+                "Medicamentos Próximos ao Vencimento",
+                "Medicamentos Mais Prescritos"
+            ])
+        
+        # Relatórios padrão pré-calculados (à noite e após escritas grandes)
+        relatorio = {
+            "Medicamentos por Categoria": 'medicamentos_categoria',
+            "Estoque Atual": 'estoque_atual',
+            "Medicamentos Próximos ao Vencimento": 'vencimento_proximo',
+            "Medicamentos Mais Prescritos": 'mais_prescritos',
+        }[relatorio_tipo]
+        
+        conn = st.session_state.db_manager.get_connection()
+        df_report, calculado_em = load_snapshot(conn, relatorio)
+        conn.close()
+        
+        with col2:
+            _show_snapshot_time(calculado_em, 'medicamentos')
+        
+        if relatorio_tipo == "Medicamentos por Categoria":
+            if not df_report.empty:
+                st.dataframe(df_report, use_container_width=True)
+                
+                show_chart('pie', df_report, values='quantidade', names='categoria', title="Distribuição por Categoria")
+            else:
+                st.info("Nenhum dado encontrado.")
+        
+        elif relatorio_tipo == "Estoque Atual":
+            if not df_report.empty:
+                st.dataframe(df_report, use_container_width=True)
+            else:
+                st.info("Nenhum estoque encontrado.")
+            
+            if pode_exportar and st.button("📥 Exportar estoque (CSV)", key="exportar_estoque"):
+                _submit_export('estoque_atual', {})
+        
+        elif relatorio_tipo == "Medicamentos Próximos ao Vencimento":
+            if not df_report.empty:
+                st.dataframe(df_report, use_container_width=True)
+            else:
+                st.info("Nenhum medicamento próximo ao vencimento.")
+        
+        elif relatorio_tipo == "Medicamentos Mais Prescritos":
+            if not df_report.empty:
+                st.dataframe(df_report, use_container_width=True)
+                
+                show_chart('bar', df_report.head(10), x='vezes_prescrito', y='medicamento', orientation='h',
+                           title="Top 10 Medicamentos Mais Prescritos")
+            else:
+                st.info("Nenhuma prescrição encontrada.")
+    
+    with tab3:
+        st.markdown("### 👥 Relatórios de Pacientes")
+        
+        conn = st.session_state.db_manager.get_connection()
+        
+        # Estatísticas de pacientes (pré-calculadas)
+        df_total, calculado_em = load_snapshot(conn, 'pacientes_total')
+        total_pacientes_rel = df_total.iloc[0]['count']
+        df_sexo, _ = load_snapshot(conn, 'pacientes_sexo')
+        df_idade, _ = load_snapshot(conn, 'pacientes_idade')
+        
+        conn.close()
+        
+        _show_snapshot_time(calculado_em, 'pacientes')
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("👥 Total de Pacientes", total_pacientes_rel)
+        
+        with col2:
+            if not df_sexo.empty:
+                show_chart('pie', df_sexo, values='quantidade', names='sexo', title="Distribuição por Sexo")
+        
+        with col3:
+            if not df_idade.empty:
+                show_chart('bar', df_idade, x='faixa_etaria', y='quantidade', title="Distribuição por Idade")
+    
+    with tab4:
+        st.markdown("### 📅 Relatórios de Consultas")
+        
+        # Filtro de período
+        col1, col2 = st.columns(2)
+        with col1:
+            data_inicio_rel = st.date_input("Data Início", value=date.today() - timedelta(days=30))
+        with col2:
+            data_fim_rel = st.date_input("Data Fim", value=date.today())
+        
+        incluir_historico = st.checkbox("📦 Incluir histórico arquivado")
+        
+        # Histórico: bancos anuais do período anexados somente leitura
+        if incluir_historico:
+            conn, _ = get_history_connection(st.session_state.db_manager.db_path, data_inicio_rel, data_fim_rel)
+            tabela_consultas = "historico_consultas"
+        else:
+            conn = st.session_state.db_manager.get_connection()
+            tabela_consultas = "consultas"
+        
+        # Período longo: admissão e orçamento de tempo (a consulta é cancelada se passar)
+        try:
+            with heavy_query(conn, st.session_state.user):
+                # Consultas por status
+                periodo = list(epoch_range(data_inicio_rel, data_fim_rel))
+                df_status = pd.read_sql(f"""
+                    SELECT status, COUNT(*) as quantidade
+                    FROM {tabela_consultas} 
+                    WHERE data_consulta_ts >= ? AND data_consulta_ts < ?
+                    GROUP BY status
+                """, conn, params=periodo)
+                
+                # Consultas por dia
+                df_dia = pd.read_sql(f"""
+                    SELECT data_consulta_ts / {SEGUNDOS_DIA} as dia, COUNT(*) as quantidade
+                    FROM {tabela_consultas} 
+                    WHERE data_consulta_ts >= ? AND data_consulta_ts < ?
+                    GROUP BY dia
+                    ORDER BY dia
+                """, conn, params=periodo)
+                df_dia['data'] = from_integer(df_dia['dia'], 'D')
+        except TimeoutError as e:
+            st.warning(f"⏱️ {e}")
+            df_status = None
+        finally:
+            conn.close()
+        
+        if df_status is not None and not df_status.empty:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                show_chart('pie', df_status, values='quantidade', names='status', title="Consultas por Status")
+            
+            with col2:
+                if not df_dia.empty:
+                    # Períodos longos são reduzidos no servidor antes do gráfico
+                    df_dia = downsample_series(df_dia, 'data', 'quantidade')
+                    show_chart('line', df_dia, x='data', y='quantidade', title="Consultas por Dia", markers=True)
+        
+        # Lista completa do período: gerada em segundo plano
+        if pode_exportar and st.button("📥 Exportar consultas do período (CSV)", key="exportar_consultas"):
+            _submit_export('consultas_periodo', {'inicio': data_inicio_rel, 'fim': data_fim_rel,
+                                                 'historico': incluir_historico})
+    
+    if tab_exportacoes:
+        with tab_exportacoes[0]:
+            _show_exports()
+
+
+def _recompute_snapshots():
+    """Recalcular agora todos os relatórios padrão (on_click, antes da nova execução)"""
+    conn = st.session_state.db_manager.get_connection()
+    try:
+        refresh_snapshots(conn)
+    finally:
+        conn.close()
+
+
+def _show_snapshot_time(calculado_em, aba):
+    """Hora do cálculo do relatório pré-calculado e, para administradores, o recálculo"""
+    st.caption(f"🕒 Calculado em {datetime.strptime(calculado_em, '%Y-%m-%d %H:%M:%S').strftime('%d/%m/%Y %H:%M')}")
+    if st.session_state.user.get('perfil') == 'Administrador':
+        st.button("🔄 Recalcular agora", key=f"recalcular_relatorios_{aba}", on_click=_recompute_snapshots)
+
+
+def _submit_export(tipo, parametros):
+    """Enfileirar uma exportação e lembrar o id na sessão (pedidos idênticos compartilham a tarefa)"""
+    tarefa_id = submit_job(st.session_state.db_manager, tipo, parametros, st.session_state.user)
+    tarefas = st.session_state.setdefault('tarefas', [])
+    if tarefa_id not in tarefas:
+        tarefas.append(tarefa_id)
+    st.success(f"📥 Exportação #{tarefa_id} na fila; acompanhe na aba Exportações")
+
+
+def _describe_params(parametros):
+    """Parâmetros de uma exportação em texto"""
+    if 'inicio' not in parametros:
+        return ""
+    periodo = " a ".join(date.fromisoformat(parametros[c]).strftime('%d/%m/%Y') for c in ('inicio', 'fim'))
+    return periodo + (" (com histórico)" if parametros.get('historico') else "")
+
+
+def _show_exports():
+    """Exportações do usuário: situação, progresso e download"""
+    st.markdown("### 📥 Exportações")
+    st.caption(f"Os arquivos ficam disponíveis por {JOB_RESULT_TTL_HOURS:g} h após a conclusão.")
+    st.button("🔄 Atualizar", key="atualizar_exportacoes")
+    
+    tarefas = list_jobs(st.session_state.db_manager, st.session_state.user.get('id'),
+                        st.session_state.get('tarefas', []))
+    if not tarefas:
+        st.info("Nenhuma exportação solicitada.")
+        return
+    
+    for tarefa in tarefas:
+        col1, col2 = st.columns([3, 1])
+        
+        with col1:
+            st.write(f"**#{tarefa['id']} {tarefa['titulo']}** {_describe_params(tarefa['parametros'])} — "
+                     f"{STATUS_TAREFA.get(tarefa['status'], tarefa['status'])}")
+            if tarefa['status'] == 'executando':
+                st.progress(tarefa['progresso'] or 0.0, text=tarefa['mensagem'] or "")
+            elif tarefa['status'] == 'falhou':
+                st.caption(f"Erro: {tarefa['erro']}")
+            elif tarefa['status'] == 'concluida':
+                st.caption(f"{tarefa['linhas']} linhas, concluída em {tarefa['concluido_em']}")
+        
+        with col2:
+            arquivo = Path(tarefa['arquivo']) if tarefa['arquivo'] else None
+            if tarefa['status'] == 'concluida' and arquivo is not None and arquivo.exists():
+                st.download_button("⬇️ Baixar", arquivo.read_bytes(), file_name=f"{tarefa['tipo']}_{tarefa['id']}.csv.gz",
+                                   mime="application/gzip", key=f"baixar_tarefa_{tarefa['id']}")
+
+
+def _executive_aggregates(db_manager):
+    """Agregados do dashboard executivo de uma unidade (somáveis entre unidades)"""
+    hoje = date.today()
+    mes = dict(zip(('inicio', 'fim'), month_range(hoje)))
+    conn = db_manager.get_connection()
+    try:
+        agregados = {
+            # Medicamentos cadastrados
+            'medicamentos': int(pd.read_sql(
+                "SELECT COUNT(*) as count FROM medicamentos WHERE ativo = 1", conn
+            ).iloc[0]['count']),
+            
+            # Pacientes ativos
+            'pacientes': int(pd.read_sql(
+                "SELECT COUNT(*) as count FROM pacientes WHERE ativo = 1", conn
+            ).iloc[0]['count']),
+            
+            # Consultas este mês
+            'consultas_mes': int(pd.read_sql("""
+                SELECT COUNT(*) as count FROM consultas 
+                WHERE data_consulta_ts >= :inicio AND data_consulta_ts < :fim
+                AND status != 'Cancelada'
+            """, conn, params=mes).iloc[0]['count']),
+            
+            # Receitas emitidas este mês
+            'receitas_mes': int(pd.read_sql("""
+                SELECT COUNT(*) as count FROM receitas 
+                WHERE data_emissao_ts >= :inicio AND data_emissao_ts < :fim
+            """, conn, params=mes).iloc[0]['count']),
+        }
+        
+        # Intervalo pelo índice; o mês só é calculado para as linhas do período
+        agregados['consultas_por_mes'] = pd.read_sql("""
+            SELECT 
+                strftime('%Y-%m', data_consulta_ts, 'unixepoch') as mes,
+                COUNT(*) as quantidade
+            FROM consultas 
+            WHERE data_consulta_ts >= :desde
+            AND status != 'Cancelada'
+            GROUP BY mes
+            ORDER BY mes
+        """, conn, params={'desde': epoch(add_months(hoje, -6))})
+        
+        # Todos os médicos (o top 10 da rede sai da soma das unidades)
+        agregados['consultas_por_medico'] = pd.read_sql("""
+            SELECT 
+                u.nome_completo as medico,
+                COUNT(*) as quantidade
+            FROM consultas c
+            JOIN usuarios u ON c.medico_id = u.id
+            WHERE c.data_consulta_ts >= :inicio AND c.data_consulta_ts < :fim
+            AND c.status != 'Cancelada'
+            GROUP BY u.nome_completo
+        """, conn, params=mes)
+    finally:
+        conn.close()
+    return agregados
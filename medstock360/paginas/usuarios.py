@@ -0,0 +1,176 @@
+"""Página de gestão de usuários"""
+
+import streamlit as st
+import pandas as pd
+import time
+
+from medstock360.auditoria import audit_event
+
+
+def show_usuarios():
+    """Módulo de usuários"""
+    st.markdown("## 👤 Gestão de Usuários")
+    
+    # Verificar se tem permissão para usuários
+    if 'usuarios' not in st.session_state.permissions:
+        st.error("❌ Você não tem permissão para acessar esta área!")
+        return
+    
+    tab1, tab2 = st.tabs(["📋 Lista de Usuários", "➕ Novo Usuário"])
+    
+    with tab1:
+        st.markdown("### 📋 Usuários do Sistema")
+        
+        # Buscar usuários
+        conn = st.session_state.db_manager.get_connection()
+        df_usuarios = pd.read_sql("""
+            SELECT 
+                u.*,
+                c.nome_completo as criado_por_nome
+            FROM usuarios u
+            LEFT JOIN usuarios c ON u.criado_por = c.id
+            ORDER BY u.nome_completo
+        """, conn)
+        conn.close()
+        
+        if not df_usuarios.empty:
+            for _, user in df_usuarios.iterrows():
+                status_icon = "🟢" if user['ativo'] else "🔴"
+                perfil_icon = {
+                    'Administrador': '👑',
+                    'Médico': '👨‍⚕️',
+                    'Farmacêutico': '💊',
+                    'Enfermeiro': '👩‍⚕️'
+                }.get(user['perfil'], '👤')
+                
+                with st.expander(f"{status_icon} {perfil_icon} {user['nome_completo']} - {user['perfil']}"):
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        st.write(f"**Nome:** {user['nome_completo']}")
+                        st.write(f"**Usuário:** {user['username']}")
+                        st.write(f"**Perfil:** {user['perfil']}")
+                        st.write(f"**Email:** {user['email'] or 'N/A'}")
+                    
+                    with col2:
+                        st.write(f"**CRM/CRF:** {user['crm_crf'] or 'N/A'}")
+                        if user['perfil'] == 'Médico':
+                            st.write(f"**Especialidade:** {user['especialidade'] or 'N/A'}")
+                        st.write(f"**Status:** {'Ativo' if user['ativo'] else 'Inativo'}")
+                        st.write(f"**Data de Criação:** {user['data_criacao']}")
+                        st.write(f"**Criado por:** {user['criado_por_nome'] or 'Sistema'}")
+                    
+                    # Ações
+                    if 'editar' in st.session_state.permissions.get('usuarios', []):
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            if user['ativo']:
+                                if st.button("❌ Desativar", key=f"desativar_{user['id']}"):
+                                    try:
+                                        conn = st.session_state.db_manager.get_connection()
+                                        cursor = conn.cursor()
+                                        cursor.execute("UPDATE usuarios SET ativo = 0 WHERE id = ?", (user['id'],))
+                                        conn.commit()
+                                        audit_event(st.session_state.user, 'desativar', 'usuarios', user['id'],
+                                                    antes={'ativo': 1}, depois={'ativo': 0})
+                                        conn.close()
+                                        st.success("Usuário desativado!")
+                                        st.rerun()
+                                    except Exception as e:
+                                        st.error(f"Erro: {e}")
+                            else:
+                                if st.button("✅ Ativar", key=f"ativar_{user['id']}"):
+                                    try:
+                                        conn = st.session_state.db_manager.get_connection()
+                                        cursor = conn.cursor()
+                                        cursor.execute("UPDATE usuarios SET ativo = 1 WHERE id = ?", (user['id'],))
+                                        conn.commit()
+                                        audit_event(st.session_state.user, 'ativar', 'usuarios', user['id'],
+                                                    antes={'ativo': 0}, depois={'ativo': 1})
+                                        conn.close()
+                                        st.success("Usuário ativado!")
+                                        st.rerun()
+                                    except Exception as e:
+                                        st.error(f"Erro: {e}")
+                        
+                        with col2:
+                            if st.button("🔑 Resetar Senha", key=f"reset_{user['id']}"):
+                                try:
+                                    nova_senha = "123456"
+                                    password_hash = st.session_state.auth_manager.hash_password(nova_senha)
+                                    conn = st.session_state.db_manager.get_connection()
+                                    cursor = conn.cursor()
+                                    cursor.execute("UPDATE usuarios SET password_hash = ? WHERE id = ?", (password_hash, user['id']))
+                                    conn.commit()
+                                    # Nunca registrar senhas ou hashes, apenas o fato
+                                    audit_event(st.session_state.user, 'resetar_senha', 'usuarios', user['id'],
+                                                depois={'senha_resetada': True})
+                                    conn.close()
+                                    st.success(f"Senha resetada para: {nova_senha}")
+                                except Exception as e:
+                                    st.error(f"Erro: {e}")
+        else:
+            st.info("Nenhum usuário encontrado.")
+    
+    with tab2:
+        st.markdown("### ➕ Cadastrar Novo Usuário")
+        
+        with st.form("form_usuario"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                nome_completo = st.text_input("Nome Completo *", placeholder="Nome completo do usuário")
+                username = st.text_input("Nome de Usuário *", placeholder="Username para login")
+                email = st.text_input("Email", placeholder="email@exemplo.com")
+                perfil = st.selectbox("Perfil *", ["", "Administrador", "Médico", "Farmacêutico", "Enfermeiro"])
+            
+            with col2:
+                password = st.text_input("Senha *", type="password", placeholder="Senha inicial")
+                confirm_password = st.text_input("Confirmar Senha *", type="password", placeholder="Confirme a senha")
+                crm_crf = st.text_input("CRM/CRF", placeholder="Número do registro profissional")
+                especialidade = st.text_input("Especialidade", placeholder="Somente para médicos")
+            
+            submitted = st.form_submit_button("💾 Cadastrar Usuário", use_container_width=True)
+            
+            if submitted:
+                if not nome_completo or not username or not password or not perfil:
+                    st.error("❌ Preencha todos os campos obrigatórios!")
+                elif password != confirm_password:
+                    st.error("❌ As senhas não coincidem!")
+                elif len(password) < 6:
+                    st.error("❌ A senha deve ter pelo menos 6 caracteres!")
+                else:
+                    try:
+                        conn = st.session_state.db_manager.get_connection()
+                        cursor = conn.cursor()
+                        
+                        # Verificar se username já existe
+                        cursor.execute("SELECT id FROM usuarios WHERE username = ?", (username,))
+                        if cursor.fetchone():
+                            st.error("❌ Nome de usuário já existe!")
+                        else:
+                            password_hash = st.session_state.auth_manager.hash_password(password)
+                            
+                            cursor.execute("""
+                                INSERT INTO usuarios (
+                                    username, password_hash, nome_completo, email, perfil, crm_crf,
+                                    especialidade, criado_por
+                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                            """, (
+                                username, password_hash, nome_completo, email, perfil, crm_crf,
+                                especialidade if perfil == 'Médico' and especialidade else None,
+                                st.session_state.user['id']
+                            ))
+                            
+                            conn.commit()
+                            audit_event(st.session_state.user, 'criar', 'usuarios', cursor.lastrowid,
+                                        depois={'username': username, 'perfil': perfil})
+                            conn.close()
+                            
+                            st.success("✅ Usuário cadastrado com sucesso!")
+                            time.sleep(2)
+                            st.rerun()
+                            
+                    except Exception as e:
+                        st.error(f"❌ Erro ao cadastrar usuário: {str(e)}")
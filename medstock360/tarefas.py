@@ -0,0 +1,412 @@
+"""
+Tarefas em segundo plano para relatórios e exportações longas
+
+submit_job grava o pedido na tabela tarefas e devolve o seu id: a tarefa
+sobrevive à queda do websocket e a reinícios do processo. Um pedido idêntico
+(mesmo tipo e parâmetros) a outro ainda pendente ou em execução recebe o id
+do primeiro.
+
+JobRunner (uma thread por processo e banco) reserva as tarefas pendentes e
+as executa em um pool de JOB_WORKERS threads. Cada tarefa informa o
+progresso na própria linha e grava o resultado (CSV comprimido) em
+JOB_RESULTS_DIR; o arquivo é apagado após JOB_RESULT_TTL_HOURS. Enquanto a
+tarefa executa, uma thread de batimento renova a reserva a cada
+JOB_HEARTBEAT_SECONDS, inclusive durante um passo longo sem aviso de
+progresso (COUNT inicial, um lote sobre o histórico arquivado); uma tarefa
+cuja reserva não é renovada em JOB_LEASE_SECONDS (processo reiniciado) volta
+para a fila.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from medstock360.datas import epoch_range
+from medstock360.duplicados import find_duplicate_candidates
+from medstock360.orcamento import query_budget
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '2'))
+JOB_RESULT_TTL_HOURS = float(os.getenv('JOB_RESULT_TTL_HOURS', '24'))
+JOB_TIMEOUT_SECONDS = float(os.getenv('JOB_TIMEOUT_SECONDS', '1800'))
+JOB_RESULTS_DIR = os.getenv('JOB_RESULTS_DIR')
+JOB_LEASE_SECONDS = 120
+JOB_HEARTBEAT_SECONDS = JOB_LEASE_SECONDS / 4
+
+# Linhas lidas por vez nas exportações
+JOB_CHUNK_ROWS = 20000
+
+STATUS_TAREFA = {
+    'pendente': "⏳ Na fila",
+    'executando': "⚙️ Executando",
+    'concluida': "✅ Concluída",
+    'falhou': "❌ Falhou",
+    'expirada': "🗑️ Expirada",
+}
+
+
+def init_job_schema(cursor):
+    """Criar a tabela de tarefas"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tarefas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo TEXT NOT NULL,
+            chave TEXT NOT NULL,
+            parametros TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pendente',
+            progresso REAL DEFAULT 0,
+            mensagem TEXT,
+            arquivo TEXT,
+            linhas INTEGER,
+            erro TEXT,
+            usuario_id INTEGER,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            iniciado_em TIMESTAMP,
+            reservada_ate TIMESTAMP,
+            concluido_em TIMESTAMP,
+            expira_em TIMESTAMP,
+            FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
+        )
+    """)
+    # Um único pedido em andamento por chave (deduplicação)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_tarefas_em_andamento
+        ON tarefas (chave) WHERE status IN ('pendente', 'executando')
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tarefas_status ON tarefas (status, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tarefas_usuario ON tarefas (usuario_id, id)")
+
+
+# ---------------------------------------------------------------------------
+# Tipos de tarefa: geradores de DataFrames (lidos em partes)
+# ---------------------------------------------------------------------------
+
+def _read_in_chunks(conn, sql, params, total, progresso):
+    """pd.read_sql em partes de JOB_CHUNK_ROWS, informando o progresso"""
+    import pandas as pd
+
+    lidas = 0
+    for parte in pd.read_sql(sql, conn, params=params, chunksize=JOB_CHUNK_ROWS):
+        lidas += len(parte)
+        progresso(lidas / total if total else 1.0, f"{lidas} de {total} linhas")
+        yield parte
+
+
+def _export_consultas(conn, parametros, progresso):
+    """Consultas do período (com paciente e médico)"""
+    tabela = "historico_consultas" if parametros.get('historico') else "consultas"
+    filtro = "c.data_consulta_ts >= ? AND c.data_consulta_ts < ?"
+    params = list(epoch_range(parametros['inicio'], parametros['fim']))
+    total = conn.execute(f"SELECT COUNT(*) FROM {tabela} c WHERE {filtro}", params).fetchone()[0]
+    yield from _read_in_chunks(conn, f"""
+        SELECT
+            c.id, c.data_consulta, c.tipo_consulta, c.status, c.valor,
+            p.nome_completo as paciente, p.cpf,
+            u.nome_completo as medico,
+            c.motivo, c.diagnostico
+        FROM {tabela} c
+        LEFT JOIN pacientes p ON c.paciente_id = p.id
+        LEFT JOIN usuarios u ON c.medico_id = u.id
+        WHERE {filtro}
+        ORDER BY c.data_consulta_ts
+    """, params, total, progresso)
+
+
+def _export_estoque(conn, parametros, progresso):
+    """Estoque atual por lote"""
+    filtro = "l.ativo = 1 AND m.ativo = 1 AND l.quantidade_atual > 0"
+    total = conn.execute(f"""
+        SELECT COUNT(*) FROM lotes l JOIN medicamentos m ON l.medicamento_id = m.id WHERE {filtro}
+    """).fetchone()[0]
+    yield from _read_in_chunks(conn, f"""
+        SELECT
+            m.nome as medicamento,
+            m.categoria,
+            l.numero_lote,
+            l.quantidade_atual,
+            l.data_validade,
+            l.local_armazenamento,
+            l.preco_unitario
+        FROM lotes l
+        JOIN medicamentos m ON l.medicamento_id = m.id
+        WHERE {filtro}
+        ORDER BY m.nome, l.data_validade
+    """, [], total, progresso)
+
+
+def _export_duplicados(conn, parametros, progresso):
+    """Pares de pacientes possivelmente duplicados"""
+    yield find_duplicate_candidates(conn, progresso=progresso)
+
+
+# tipo: título exibido e gerador (conn, parametros, progresso) -> DataFrames
+TIPOS_TAREFA = {
+    'consultas_periodo': {'titulo': "Consultas do período", 'funcao': _export_consultas},
+    'estoque_atual': {'titulo': "Estoque atual", 'funcao': _export_estoque},
+    'pacientes_duplicados': {'titulo': "Pacientes possivelmente duplicados", 'funcao': _export_duplicados},
+}
+
+
+# ---------------------------------------------------------------------------
+# Fila
+# ---------------------------------------------------------------------------
+
+def _agora(delta_segundos=0):
+    return (datetime.now() + timedelta(seconds=delta_segundos)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def job_key(tipo, parametros):
+    """Chave de deduplicação: tipo + parâmetros normalizados"""
+    texto = json.dumps([tipo, parametros], sort_keys=True, default=str)
+    return hashlib.sha1(texto.encode()).hexdigest()
+
+
+def results_dir(db_path):
+    """Pasta dos resultados (JOB_RESULTS_DIR ou 'tarefas' ao lado do banco), uma por banco"""
+    base = Path(JOB_RESULTS_DIR) if JOB_RESULTS_DIR else Path(db_path).resolve().parent / "tarefas"
+    return base / Path(db_path).stem
+
+
+def submit_job(db_manager, tipo, parametros, usuario=None):
+    """Enfileirar uma tarefa; devolve o id (o da tarefa idêntica em andamento, se houver)"""
+    if tipo not in TIPOS_TAREFA:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+    parametros = json.loads(json.dumps(parametros, default=str))
+    chave = job_key(tipo, parametros)
+
+    conn = db_manager.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        existente = conn.execute("""
+            SELECT id FROM tarefas WHERE chave = ? AND status IN ('pendente', 'executando')
+        """, (chave,)).fetchone()
+        if existente:
+            conn.rollback()
+            return existente[0]
+        cursor = conn.execute("""
+            INSERT INTO tarefas (tipo, chave, parametros, usuario_id, criado_em)
+            VALUES (?, ?, ?, ?, ?)
+        """, (tipo, chave, json.dumps(parametros), usuario.get('id') if usuario else None, _agora()))
+        conn.commit()
+        tarefa_id = cursor.lastrowid
+    finally:
+        conn.close()
+
+    runner = _runners.get(db_manager.db_path)
+    if runner is not None:
+        runner.wake()
+    return tarefa_id
+
+
+def list_jobs(db_manager, usuario_id=None, ids=(), limite=20):
+    """Tarefas recentes do usuário (e as de ids, ex.: pedidos deduplicados), mais novas primeiro"""
+    ids = list(ids)
+    conn = db_manager.get_connection()
+    try:
+        cursor = conn.execute(f"""
+            SELECT id, tipo, parametros, status, progresso, mensagem, arquivo, linhas, erro,
+                   criado_em, concluido_em, expira_em
+            FROM tarefas
+            WHERE usuario_id IS ? OR id IN ({", ".join("?" for _ in ids) or "NULL"})
+            ORDER BY id DESC
+            LIMIT ?
+        """, [usuario_id] + ids + [limite])
+        colunas = [c[0] for c in cursor.description]
+        tarefas = [dict(zip(colunas, row)) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+    for tarefa in tarefas:
+        tarefa['parametros'] = json.loads(tarefa['parametros'])
+        tarefa['titulo'] = TIPOS_TAREFA.get(tarefa['tipo'], {}).get('titulo', tarefa['tipo'])
+    return tarefas
+
+
+def claim_next_job(db_manager):
+    """Reservar a próxima tarefa pendente (ou abandonada); None se não houver"""
+    conn = db_manager.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("""
+            SELECT id, tipo, parametros FROM tarefas
+            WHERE status = 'pendente' OR (status = 'executando' AND reservada_ate < ?)
+            ORDER BY id
+            LIMIT 1
+        """, (_agora(),)).fetchone()
+        if row is None:
+            conn.rollback()
+            return None
+        conn.execute("""
+            UPDATE tarefas
+            SET status = 'executando', progresso = 0, mensagem = NULL, iniciado_em = ?, reservada_ate = ?
+            WHERE id = ?
+        """, (_agora(), _agora(JOB_LEASE_SECONDS), row[0]))
+        conn.commit()
+        return {'id': row[0], 'tipo': row[1], 'parametros': json.loads(row[2])}
+    finally:
+        conn.close()
+
+
+def _update_job(db_manager, tarefa_id, **campos):
+    conn = db_manager.get_connection()
+    try:
+        conn.execute(
+            f"UPDATE tarefas SET {', '.join(f'{c} = ?' for c in campos)} WHERE id = ?",
+            list(campos.values()) + [tarefa_id],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _open_connection(db_manager, parametros):
+    """Conexão da tarefa (com o histórico arquivado se parametros['historico'])"""
+    if parametros.get('historico'):
+        from medstock360.arquivamento import get_history_connection
+
+        conn, _ = get_history_connection(db_manager.db_path, date.fromisoformat(parametros['inicio']),
+                                         date.fromisoformat(parametros['fim']))
+        return conn
+    return db_manager.get_connection()
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Thread que renova a reserva de uma tarefa até ser parada"""
+
+    def __init__(self, db_manager, tarefa_id, interval=JOB_HEARTBEAT_SECONDS):
+        super().__init__(name=f"medstock360-tarefa-{tarefa_id}-reserva", daemon=True)
+        self.db = db_manager
+        self.tarefa_id = tarefa_id
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                _update_job(self.db, self.tarefa_id, reservada_ate=_agora(JOB_LEASE_SECONDS))
+            except Exception as e:
+                print(f"[tarefas] Erro ao renovar a reserva da tarefa {self.tarefa_id}: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def run_job(db_manager, tarefa):
+    """Executar uma tarefa reservada e gravar o resultado (ou o erro)"""
+    pasta = results_dir(db_manager.db_path)
+    pasta.mkdir(parents=True, exist_ok=True)
+    destino = pasta / f"tarefa_{tarefa['id']}.csv.gz"
+    temporario = destino.with_suffix('.tmp')
+    ultimo_aviso = [0.0]
+
+    def progresso(fracao, mensagem=None):
+        # No máximo uma gravação por segundo (a reserva é renovada pelo batimento)
+        if time.monotonic() - ultimo_aviso[0] < 1 and fracao < 1:
+            return
+        ultimo_aviso[0] = time.monotonic()
+        _update_job(db_manager, tarefa['id'], progresso=min(fracao, 1.0), mensagem=mensagem)
+
+    funcao = TIPOS_TAREFA[tarefa['tipo']]['funcao']
+    conn = None
+    batimento = LeaseHeartbeat(db_manager, tarefa['id'])
+    batimento.start()
+    try:
+        conn = _open_connection(db_manager, tarefa['parametros'])
+        linhas = 0
+        with query_budget(conn, JOB_TIMEOUT_SECONDS * 1000, cancelar=None), \
+                gzip.open(temporario, 'wt', encoding='utf-8', newline='') as arquivo:
+            for i, parte in enumerate(funcao(conn, tarefa['parametros'], progresso)):
+                parte.to_csv(arquivo, index=False, header=i == 0)
+                linhas += len(parte)
+        os.replace(temporario, destino)
+        _update_job(db_manager, tarefa['id'], status='concluida', progresso=1.0, mensagem=None,
+                    arquivo=str(destino), linhas=linhas, concluido_em=_agora(),
+                    expira_em=_agora(JOB_RESULT_TTL_HOURS * 3600))
+    except Exception as e:
+        temporario.unlink(missing_ok=True)
+        _update_job(db_manager, tarefa['id'], status='falhou', erro=str(e), concluido_em=_agora())
+    finally:
+        batimento.stop()
+        if conn is not None:
+            conn.close()
+
+
+def expire_results(db_manager):
+    """Apagar os resultados vencidos (TTL); devolve quantos expiraram"""
+    conn = db_manager.get_connection()
+    try:
+        vencidas = conn.execute("""
+            SELECT id, arquivo FROM tarefas WHERE status = 'concluida' AND expira_em <= ?
+        """, (_agora(),)).fetchall()
+        for _, arquivo in vencidas:
+            if arquivo:
+                Path(arquivo).unlink(missing_ok=True)
+        conn.executemany("UPDATE tarefas SET status = 'expirada', arquivo = NULL WHERE id = ?",
+                         [(tarefa_id,) for tarefa_id, _ in vencidas])
+        conn.commit()
+        return len(vencidas)
+    finally:
+        conn.close()
+
+
+class JobRunner(threading.Thread):
+    """Thread que reserva as tarefas pendentes e as executa em um pool"""
+
+    def __init__(self, db_manager, workers=JOB_WORKERS, interval=JOB_POLL_SECONDS):
+        super().__init__(name="medstock360-tarefas", daemon=True)
+        self.db = db_manager
+        self.interval = interval
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="medstock360-tarefa")
+        self._livres = threading.Semaphore(workers)
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                expire_results(self.db)
+                while self._livres.acquire(blocking=False):
+                    tarefa = claim_next_job(self.db)
+                    if tarefa is None:
+                        self._livres.release()
+                        break
+                    self._pool.submit(self._execute, tarefa)
+            except Exception as e:
+                print(f"[tarefas] Erro ao processar a fila: {e}")
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+    def _execute(self, tarefa):
+        try:
+            run_job(self.db, tarefa)
+        finally:
+            self._livres.release()
+            self.wake()
+
+    def wake(self):
+        """Olhar a fila agora (nova tarefa ou vaga livre)"""
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self.wake()
+
+
+# Um executor por banco (unidade) no processo
+_runners = {}
+_runner_lock = threading.Lock()
+
+
+def start_job_runner(db_manager):
+    """Iniciar (uma vez por processo e banco) o executor de tarefas"""
+    with _runner_lock:
+        runner = _runners.get(db_manager.db_path)
+        if runner is None or not runner.is_alive():
+            runner = _runners[db_manager.db_path] = JobRunner(db_manager)
+            runner.start()
+    return runner
@@ -0,0 +1,289 @@
+"""
+Transferências de estoque entre unidades (registro em duas fases)
+
+Cada banco de unidade tem a tabela transferencias. A origem baixa o estoque
+e registra 'preparada'; o destino registra 'preparada'; a origem grava a
+decisão ('confirmando') e só então o destino dá entrada no lote
+('confirmada') e a origem fecha ('confirmada'). recover_transfers conclui
+as que já têm decisão e desfaz as que não têm.
+"""
+
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+
+from medstock360.auditoria import audit_event
+
+# Transferências paradas há mais que isto são retomadas por recover_transfers
+TRANSFERENCIA_PENDENTE_MINUTOS = 5
+
+STATUS_TRANSFERENCIA = {
+    'preparada': "⏳ Preparada",
+    'confirmando': "⏳ Confirmando",
+    'confirmada': "✅ Confirmada",
+    'abortada': "❌ Desfeita",
+}
+
+
+def init_transfer_schema(cursor):
+    """Registro de transferências entre unidades (um por banco)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transferencias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            uid TEXT NOT NULL,
+            papel TEXT NOT NULL,
+            unidade_origem TEXT NOT NULL,
+            unidade_destino TEXT NOT NULL,
+            lote_id INTEGER,
+            quantidade INTEGER NOT NULL,
+            dados TEXT NOT NULL,
+            status TEXT NOT NULL,
+            responsavel INTEGER,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (uid, papel)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transferencias_status ON transferencias (status, atualizado_em)")
+
+
+def _set_transfer_status(conn, uid, papel, de, para):
+    """Mudar o status apenas se ainda estiver em `de`; True se mudou"""
+    cursor = conn.execute("""
+        UPDATE transferencias SET status = ?, atualizado_em = CURRENT_TIMESTAMP
+        WHERE uid = ? AND papel = ? AND status = ?
+    """, (para, uid, papel, de))
+    return cursor.rowcount == 1
+
+
+def _prepare_source(db, uid, origem, destino, lote_id, quantidade, responsavel):
+    """Fase 1 na origem: baixar o estoque do lote e registrar 'preparada'"""
+    conn = db.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        lote = conn.execute("""
+            SELECT l.numero_lote, l.data_fabricacao, l.data_validade, l.quantidade_atual,
+                   l.preco_unitario, l.fornecedor,
+                   m.nome, m.principio_ativo, m.fabricante, m.categoria, m.apresentacao,
+                   m.concentracao, m.controlado, m.via_administracao
+            FROM lotes l JOIN medicamentos m ON l.medicamento_id = m.id
+            WHERE l.id = ? AND l.ativo = 1
+        """, (lote_id,)).fetchone()
+        if lote is None or lote[3] < quantidade:
+            conn.rollback()
+            raise ValueError("Quantidade indisponível no lote de origem")
+
+        dados = dict(zip([
+            'numero_lote', 'data_fabricacao', 'data_validade', 'quantidade_atual', 'preco_unitario',
+            'fornecedor', 'nome', 'principio_ativo', 'fabricante', 'categoria', 'apresentacao',
+            'concentracao', 'controlado', 'via_administracao'
+        ], lote))
+        del dados['quantidade_atual']
+
+        conn.execute("UPDATE lotes SET quantidade_atual = quantidade_atual - ? WHERE id = ?",
+                     (quantidade, lote_id))
+        conn.execute("""
+            INSERT INTO movimentacoes (lote_id, tipo_movimento, quantidade, motivo, responsavel, observacoes)
+            VALUES (?, 'Saída', ?, ?, ?, ?)
+        """, (lote_id, quantidade, f"Transferência para {destino}", responsavel or 0, uid))
+        conn.execute("""
+            INSERT INTO transferencias (uid, papel, unidade_origem, unidade_destino, lote_id,
+                                        quantidade, dados, status, responsavel)
+            VALUES (?, 'origem', ?, ?, ?, ?, ?, 'preparada', ?)
+        """, (uid, origem, destino, lote_id, quantidade, json.dumps(dados, ensure_ascii=False), responsavel))
+        conn.commit()
+        return dados
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _prepare_destination(db, uid, origem, destino, quantidade, dados, responsavel):
+    """Fase 1 no destino: registrar 'preparada' (ainda sem estoque)"""
+    conn = db.get_connection()
+    try:
+        conn.execute("""
+            INSERT OR IGNORE INTO transferencias (uid, papel, unidade_origem, unidade_destino,
+                                                  quantidade, dados, status, responsavel)
+            VALUES (?, 'destino', ?, ?, ?, ?, 'preparada', ?)
+        """, (uid, origem, destino, quantidade, json.dumps(dados, ensure_ascii=False), responsavel))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _commit_destination(db, uid):
+    """Fase 2 no destino: dar entrada no lote (idempotente)"""
+    conn = db.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("""
+            SELECT unidade_origem, quantidade, dados, status, responsavel FROM transferencias
+            WHERE uid = ? AND papel = 'destino'
+        """, (uid,)).fetchone()
+        if row is None or row[3] != 'preparada':
+            conn.rollback()
+            return row is not None and row[3] == 'confirmada'
+        origem, quantidade, dados, _, responsavel = row
+        dados = json.loads(dados)
+
+        # O mesmo medicamento tem ids diferentes em cada unidade
+        medicamento = conn.execute("""
+            SELECT id FROM medicamentos
+            WHERE nome = ? AND COALESCE(concentracao, '') = COALESCE(?, '')
+              AND COALESCE(apresentacao, '') = COALESCE(?, '') AND ativo = 1
+            ORDER BY id LIMIT 1
+        """, (dados['nome'], dados['concentracao'], dados['apresentacao'])).fetchone()
+        if medicamento is None:
+            medicamento_id = conn.execute("""
+                INSERT INTO medicamentos (nome, principio_ativo, fabricante, categoria, apresentacao,
+                                          concentracao, controlado, via_administracao)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (dados['nome'], dados['principio_ativo'], dados['fabricante'], dados['categoria'],
+                  dados['apresentacao'], dados['concentracao'], dados['controlado'],
+                  dados['via_administracao'])).lastrowid
+        else:
+            medicamento_id = medicamento[0]
+
+        lote_id = conn.execute("""
+            INSERT INTO lotes (medicamento_id, numero_lote, data_fabricacao, data_validade,
+                               quantidade_inicial, quantidade_atual, preco_unitario, fornecedor,
+                               observacoes, responsavel_entrada)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (medicamento_id, dados['numero_lote'], dados['data_fabricacao'], dados['data_validade'],
+              quantidade, quantidade, dados['preco_unitario'], dados['fornecedor'],
+              f"Transferido de {origem}", responsavel)).lastrowid
+        conn.execute("""
+            INSERT INTO movimentacoes (lote_id, tipo_movimento, quantidade, motivo, responsavel, observacoes)
+            VALUES (?, 'Entrada', ?, ?, ?, ?)
+        """, (lote_id, quantidade, f"Transferência de {origem}", responsavel or 0, uid))
+        conn.execute("""
+            UPDATE transferencias SET status = 'confirmada', lote_id = ?, atualizado_em = CURRENT_TIMESTAMP
+            WHERE uid = ? AND papel = 'destino'
+        """, (lote_id, uid))
+        conn.commit()
+        return True
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _abort_source(db, uid):
+    """Desfazer a reserva na origem (somente se ainda 'preparada')"""
+    conn = db.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("""
+            SELECT lote_id, quantidade, unidade_destino, responsavel FROM transferencias
+            WHERE uid = ? AND papel = 'origem'
+        """, (uid,)).fetchone()
+        if row is None or not _set_transfer_status(conn, uid, 'origem', 'preparada', 'abortada'):
+            conn.rollback()
+            return False
+        lote_id, quantidade, destino, responsavel = row
+        conn.execute("UPDATE lotes SET quantidade_atual = quantidade_atual + ? WHERE id = ?",
+                     (quantidade, lote_id))
+        conn.execute("""
+            INSERT INTO movimentacoes (lote_id, tipo_movimento, quantidade, motivo, responsavel, observacoes)
+            VALUES (?, 'Entrada', ?, ?, ?, ?)
+        """, (lote_id, quantidade, f"Estorno de transferência para {destino}", responsavel or 0, uid))
+        conn.commit()
+        return True
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _abort_destination(db, uid):
+    conn = db.get_connection()
+    try:
+        _set_transfer_status(conn, uid, 'destino', 'preparada', 'abortada')
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _set_source_status(db, uid, de, para):
+    conn = db.get_connection()
+    try:
+        mudou = _set_transfer_status(conn, uid, 'origem', de, para)
+        conn.commit()
+        return mudou
+    finally:
+        conn.close()
+
+
+def transfer_stock(router, origem, destino, lote_id, quantidade, usuario=None):
+    """
+    Transferir `quantidade` do lote da unidade de origem para a de destino
+
+    Fase 1: origem baixa o estoque e registra 'preparada'; destino registra
+    'preparada'. Decisão: origem passa a 'confirmando'. Fase 2: destino dá
+    entrada no lote ('confirmada') e a origem fecha ('confirmada'). Uma falha
+    antes da decisão desfaz a reserva; depois dela, recover_transfers conclui.
+    Retorna o uid da transferência.
+    """
+    if origem == destino:
+        raise ValueError("Origem e destino devem ser unidades diferentes")
+    if quantidade <= 0:
+        raise ValueError("A quantidade deve ser positiva")
+
+    db_origem, db_destino = router.manager(origem), router.manager(destino)
+    uid = uuid.uuid4().hex
+    responsavel = usuario['id'] if usuario else None
+
+    dados = _prepare_source(db_origem, uid, origem, destino, lote_id, quantidade, responsavel)
+    try:
+        _prepare_destination(db_destino, uid, origem, destino, quantidade, dados, responsavel)
+    except Exception:
+        _abort_source(db_origem, uid)
+        raise
+
+    # Decisão registrada na origem (falha se a recuperação já abortou)
+    if not _set_source_status(db_origem, uid, 'preparada', 'confirmando'):
+        _abort_destination(db_destino, uid)
+        raise RuntimeError("Transferência abortada antes da confirmação")
+
+    if _commit_destination(db_destino, uid):
+        _set_source_status(db_origem, uid, 'confirmando', 'confirmada')
+
+    audit_event(usuario, 'transferir', 'lotes', lote_id, depois={
+        'uid': uid, 'origem': origem, 'destino': destino, 'quantidade': quantidade
+    })
+    return uid
+
+
+def recover_transfers(router, minutos=TRANSFERENCIA_PENDENTE_MINUTOS):
+    """Concluir ou desfazer transferências paradas; retorna {'concluidas': n, 'desfeitas': n}"""
+    limite = (datetime.utcnow() - timedelta(minutes=minutos)).strftime('%Y-%m-%d %H:%M:%S')
+    resultado = {'concluidas': 0, 'desfeitas': 0}
+    for unidade, db in router.managers().items():
+        conn = db.get_connection()
+        try:
+            pendentes = conn.execute("""
+                SELECT uid, unidade_destino, status FROM transferencias
+                WHERE papel = 'origem' AND status IN ('preparada', 'confirmando') AND atualizado_em <= ?
+            """, (limite,)).fetchall()
+        finally:
+            conn.close()
+
+        for uid, destino, status in pendentes:
+            if destino not in router.unidades:
+                continue
+            db_destino = router.manager(destino)
+            if status == 'preparada':
+                # Sem decisão registrada: desfazer nas duas pontas
+                if _abort_source(db, uid):
+                    _abort_destination(db_destino, uid)
+                    resultado['desfeitas'] += 1
+            elif _commit_destination(db_destino, uid):
+                _set_source_status(db, uid, 'confirmando', 'confirmada')
+                resultado['concluidas'] += 1
+    return resultado
@@ -0,0 +1,115 @@
+"""
+Unidades hospitalares: um banco SQLite por unidade (shard)
+
+UNIDADES=Central,Norte,Sul cria um banco por unidade ao lado de DB_PATH
+(medstock360_central.db, ...), cada um com o seu DatabaseManager e pool de
+conexões: cada unidade tem o seu próprio bloqueio de escrita. Sem UNIDADES
+há uma única unidade no próprio DB_PATH, como antes. O usuário escolhe a
+unidade no login e a sessão usa o banco dela.
+
+Relatórios da rede (fan_out) consultam as unidades em paralelo em um pool de
+threads e juntam os agregados parciais (merge_aggregates). Transferências de
+estoque entre unidades ficam em medstock360.transferencias.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from medstock360.config import DB_PATH
+from medstock360.database import DatabaseManager
+
+UNIDADES = [u.strip() for u in os.getenv('UNIDADES', '').split(',') if u.strip()]
+SHARD_FANOUT_WORKERS = int(os.getenv('SHARD_FANOUT_WORKERS', '8'))
+UNIDADE_PADRAO = "Principal"
+
+
+def _slug(unidade):
+    """'São José' -> 'sao_jose'"""
+    texto = unicodedata.normalize('NFKD', unidade).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '_', texto.lower()).strip('_')
+
+
+def shard_path(unidade, unidades=None):
+    """Arquivo SQLite da unidade (DB_PATH quando há uma só unidade)"""
+    if not (unidades if unidades is not None else UNIDADES):
+        return DB_PATH
+    base = Path(DB_PATH)
+    return str(base.with_name(f"{base.stem}_{_slug(unidade)}{base.suffix}"))
+
+
+class ShardRouter:
+    """Mapeia cada unidade (e a sessão do usuário) para o seu banco"""
+
+    def __init__(self, unidades=None, caminhos=None):
+        """caminhos: {unidade: arquivo} explícito (ex.: benchmarks); senão UNIDADES"""
+        unidades = list(caminhos) if caminhos else (unidades if unidades is not None else UNIDADES)
+        self.unidades = list(unidades) or [UNIDADE_PADRAO]
+        self._caminhos = caminhos or {u: shard_path(u, unidades) for u in self.unidades}
+        self._managers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def multi_unidade(self):
+        return len(self.unidades) > 1
+
+    @property
+    def principal(self):
+        """Banco da primeira unidade (log de auditoria da rede)"""
+        return self.manager(self.unidades[0])
+
+    def manager(self, unidade):
+        """DatabaseManager (com pool) da unidade, criado na primeira vez"""
+        if unidade not in self._caminhos:
+            raise KeyError(f"Unidade desconhecida: {unidade}")
+        with self._lock:
+            if unidade not in self._managers:
+                self._managers[unidade] = DatabaseManager(self._caminhos[unidade])
+            return self._managers[unidade]
+
+    def managers(self):
+        """{unidade: DatabaseManager} de todas as unidades"""
+        return {unidade: self.manager(unidade) for unidade in self.unidades}
+
+    def fan_out(self, funcao, unidades=None):
+        """Rodar funcao(db_manager) em cada unidade em paralelo; {unidade: resultado}"""
+        unidades = unidades or self.unidades
+        managers = {unidade: self.manager(unidade) for unidade in unidades}
+        if len(managers) == 1:
+            return {unidade: funcao(db) for unidade, db in managers.items()}
+        with ThreadPoolExecutor(min(len(managers), SHARD_FANOUT_WORKERS),
+                                thread_name_prefix="medstock360-unidades") as pool:
+            futuros = {unidade: pool.submit(funcao, db) for unidade, db in managers.items()}
+            return {unidade: futuro.result() for unidade, futuro in futuros.items()}
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_shard_router():
+    """Roteador de unidades do processo (configurado por UNIDADES)"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ShardRouter()
+    return _router
+
+
+def merge_aggregates(parciais, chaves, somas):
+    """
+    Juntar agregados parciais das unidades
+
+    parciais: DataFrames com as mesmas colunas; as colunas em `somas` são
+    somadas por `chaves` (contagens e somas se juntam; médias devem ser
+    recalculadas a partir de soma e contagem).
+    """
+    import pandas as pd
+
+    parciais = [df for df in parciais if df is not None and not df.empty]
+    if not parciais:
+        return pd.DataFrame(columns=list(chaves) + list(somas))
+    return pd.concat(parciais, ignore_index=True).groupby(list(chaves), as_index=False)[list(somas)].sum()
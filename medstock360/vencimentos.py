@@ -0,0 +1,215 @@
+"""
+Motor de vencimentos: faixas de validade pré-calculadas por lote
+
+Cada lote ativo recebe uma faixa de vencimento (vencido, até 7, 30, 60, 90
+dias ou mais) e o valor em risco (preco_unitario × quantidade_atual) na
+tabela indexada lotes_vencimento. As telas leem essa tabela em vez de
+aplicar funções de data linha a linha.
+
+A tabela é recalculada por completo uma vez por dia (thread em segundo
+plano) e mantida atualizada nas escritas em lotes por triggers.
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+
+# Faixas de vencimento: (código, rótulo, limite superior em dias)
+FAIXAS_VENCIMENTO = [
+    (0, 'Vencido', -1),
+    (1, 'Até 7 dias', 7),
+    (2, 'Até 30 dias', 30),
+    (3, 'Até 60 dias', 60),
+    (4, 'Até 90 dias', 90),
+    (5, 'Mais de 90 dias', None),
+]
+
+# Códigos usados pelas telas
+FAIXA_ATE_30_DIAS = 2
+FAIXA_ATE_60_DIAS = 3
+
+_DATA_REFERENCIA_SQL = (
+    "COALESCE((SELECT data_referencia FROM vencimentos_controle WHERE id = 1), "
+    "DATE('now', 'localtime'))"
+)
+
+
+def _dias_para_vencer_sql(coluna_validade):
+    """Expressão SQL com os dias inteiros até o vencimento"""
+    return f"CAST(julianday(DATE({coluna_validade})) - julianday({_DATA_REFERENCIA_SQL}) AS INTEGER)"
+
+
+def _faixa_sql(dias):
+    """Expressão SQL CASE que converte dias em código de faixa"""
+    cases = []
+    for codigo, _, limite in FAIXAS_VENCIMENTO:
+        if limite is None:
+            cases.append(f"ELSE {codigo}")
+        elif limite < 0:
+            cases.append(f"WHEN {dias} < 0 THEN {codigo}")
+        else:
+            cases.append(f"WHEN {dias} <= {limite} THEN {codigo}")
+    return "CASE " + " ".join(cases) + " END"
+
+
+def _select_lotes_sql(alias, where):
+    """SELECT que calcula a linha de lotes_vencimento para os lotes filtrados"""
+    dias = _dias_para_vencer_sql(f"{alias}.data_validade")
+    return f"""
+        SELECT
+            {alias}.id,
+            {alias}.medicamento_id,
+            {alias}.data_validade,
+            {dias},
+            {_faixa_sql(dias)},
+            {alias}.quantidade_atual,
+            COALESCE({alias}.preco_unitario, 0) * {alias}.quantidade_atual,
+            CURRENT_TIMESTAMP
+        {where}
+    """
+
+
+_INSERT_SQL = """
+    INSERT OR REPLACE INTO lotes_vencimento (
+        lote_id, medicamento_id, data_validade, dias_para_vencer,
+        faixa, quantidade_atual, valor_em_risco, calculado_em
+    )
+"""
+
+
+def init_expiry_schema(cursor):
+    """Criar a tabela de faixas de vencimento, seus índices e triggers"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS lotes_vencimento (
+            lote_id INTEGER PRIMARY KEY,
+            medicamento_id INTEGER NOT NULL,
+            data_validade DATE NOT NULL,
+            dias_para_vencer INTEGER NOT NULL,
+            faixa INTEGER NOT NULL,
+            quantidade_atual INTEGER NOT NULL,
+            valor_em_risco REAL NOT NULL,
+            calculado_em TIMESTAMP,
+            FOREIGN KEY (lote_id) REFERENCES lotes (id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lotes_vencimento_faixa
+        ON lotes_vencimento (faixa, data_validade)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lotes_vencimento_medicamento
+        ON lotes_vencimento (medicamento_id, faixa)
+    """)
+
+    # Data de referência do último recálculo completo
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vencimentos_controle (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            data_referencia DATE NOT NULL,
+            calculado_em TIMESTAMP
+        )
+    """)
+
+    # Manter as faixas atualizadas nas escritas em lotes
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_lotes_vencimento_insert
+        AFTER INSERT ON lotes WHEN NEW.ativo = 1
+        BEGIN
+            {_INSERT_SQL} {_select_lotes_sql('l', 'FROM lotes l WHERE l.id = NEW.id')};
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_lotes_vencimento_update
+        AFTER UPDATE ON lotes
+        BEGIN
+            DELETE FROM lotes_vencimento WHERE lote_id = NEW.id AND NEW.ativo != 1;
+            {_INSERT_SQL} {_select_lotes_sql('l', 'FROM lotes l WHERE l.id = NEW.id AND l.ativo = 1')};
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_lotes_vencimento_delete
+        AFTER DELETE ON lotes
+        BEGIN
+            DELETE FROM lotes_vencimento WHERE lote_id = OLD.id;
+        END
+    """)
+
+
+def refresh_expiry_buckets(conn, hoje=None):
+    """Recalcular as faixas de vencimento de todos os lotes ativos"""
+    hoje = hoje or date.today()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO vencimentos_controle (id, data_referencia, calculado_em)
+        VALUES (1, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (id) DO UPDATE SET
+            data_referencia = excluded.data_referencia,
+            calculado_em = excluded.calculado_em
+    """, (hoje.isoformat(),))
+    cursor.execute("DELETE FROM lotes_vencimento")
+    cursor.execute(_INSERT_SQL + _select_lotes_sql('l', 'FROM lotes l WHERE l.ativo = 1'))
+    conn.commit()
+    return cursor.rowcount
+
+
+def expiry_buckets_stale(conn, hoje=None):
+    """Verificar se o último recálculo completo não é de hoje"""
+    hoje = hoje or date.today()
+    row = conn.execute("SELECT data_referencia FROM vencimentos_controle WHERE id = 1").fetchone()
+    return row is None or row[0] != hoje.isoformat()
+
+
+def get_faixa_label(codigo):
+    """Rótulo da faixa de vencimento"""
+    for faixa, label, _ in FAIXAS_VENCIMENTO:
+        if faixa == codigo:
+            return label
+    return None
+
+
+class ExpiryScheduler(threading.Thread):
+    """Thread que recalcula as faixas de vencimento uma vez por dia"""
+
+    def __init__(self, db_manager):
+        super().__init__(name="medstock360-vencimentos", daemon=True)
+        self.db = db_manager
+        self._stop_event = threading.Event()
+
+    def run_once(self):
+        """Recalcular as faixas se ainda não foram recalculadas hoje"""
+        conn = self.db.get_connection()
+        try:
+            if expiry_buckets_stale(conn):
+                refresh_expiry_buckets(conn)
+        finally:
+            conn.close()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[vencimentos] Erro ao recalcular faixas: {e}")
+
+            # Dormir até logo após a próxima meia-noite
+            amanha = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+            self._stop_event.wait(max((amanha - datetime.now()).total_seconds() + 5, 60))
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# Um agendador por banco (unidade) no processo
+_schedulers = {}
+_scheduler_lock = threading.Lock()
+
+
+def start_expiry_scheduler(db_manager):
+    """Iniciar (uma vez por processo e banco) o recálculo diário das faixas"""
+    with _scheduler_lock:
+        scheduler = _schedulers.get(db_manager.db_path)
+        if scheduler is None or not scheduler.is_alive():
+            # Primeiro recálculo síncrono: as telas nunca leem faixas velhas
+            scheduler = _schedulers[db_manager.db_path] = ExpiryScheduler(db_manager)
+            scheduler.run_once()
+            scheduler.start()
+    return scheduler